@@ -3,7 +3,7 @@ from pymongo.errors import DuplicateKeyError
 
 from models.user_model import User
 from schemas.user_schema import UserCreateSchema, UserLoginSchema, TokenSchema
-from core.auth import hash_password, verify_password, create_access_token
+from core.auth import hash_password_async, verify_and_update_password_async, create_access_token
 
 router = APIRouter(tags=["auth"])
 
@@ -29,7 +29,7 @@ async def register(user_in: UserCreateSchema):
     user = User(
         username=user_in.username,
         email=user_in.email,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=await hash_password_async(user_in.password),
     )
     try:
         await user.insert()
@@ -60,10 +60,15 @@ async def login(login_data: UserLoginSchema):
     if not user:
         raise HTTPException(status_code=400, detail="Usuario o contraseña incorrectos")
 
-    # 2) Verificar contraseña
-    if not verify_password(login_data.password, user.hashed_password):
+    # 2) Verificar contraseña (en el pool de hashing, fuera del event loop)
+    valid, new_hash = await verify_and_update_password_async(login_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=400, detail="Usuario o contraseña incorrectos")
 
+    # 2.1) Si cambió BCRYPT_ROUNDS, guardar el hash con el costo nuevo
+    if new_hash:
+        await user.set({User.hashed_password: new_hash})
+
     # 3) Generar token con `sub = user.username`
     access_token = create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
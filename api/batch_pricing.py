@@ -0,0 +1,28 @@
+# backend/api/batch_pricing.py
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from services.batch_pricing import price_batch, rows_to_columns, round_column
+from schemas.batch_pricing_schema import PriceBatchInputSchema, PriceBatchOutputSchema
+from core.auth import get_current_user
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+@router.post("/price-batch", response_model=PriceBatchOutputSchema)
+async def price_batch_endpoint(
+    data: PriceBatchInputSchema,
+    current_user = Depends(get_current_user)
+):
+    """
+    Cotiza miles de combinaciones de parámetros en una sola llamada.
+    Devuelve los mismos números que calculate_quote_summary, fila por fila.
+    """
+    try:
+        columns = data.columns if data.columns is not None else rows_to_columns(data.rows)
+        results = price_batch(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    output = {name: round_column(values) for name, values in results.items()}
+    output["count"] = len(output["estimated_total_cost"])
+    return output
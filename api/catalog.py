@@ -0,0 +1,140 @@
+# backend/api/catalog.py
+
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from bson import ObjectId
+
+from schemas.catalog_schema import (
+    PrinterCatalogCreateSchema, PrinterCatalogPatchSchema, PrinterCatalogOutSchema,
+    FilamentCatalogCreateSchema, FilamentCatalogPatchSchema, FilamentCatalogOutSchema,
+)
+from services.catalog_service import (
+    CatalogEntryInUseError, list_user_entries, create_entry, update_entry, delete_entry, catalog_cache,
+)
+from core.auth import get_current_user, get_current_superuser
+from core.responses import ORJSONResponse
+from models.user_model import User
+
+router = APIRouter(prefix="/api/catalog", tags=["Catalog"])
+
+
+def _entry_to_dict(entry: dict) -> dict:
+    out = {key: value for key, value in entry.items() if key != "revision_id"}
+    out["_id"] = str(entry["_id"])
+    out["user_id"] = str(entry["user_id"])
+    return out
+
+
+async def _list(section: str, current_user: User) -> ORJSONResponse:
+    entries = await list_user_entries(section, ObjectId(str(current_user.id)))
+    return ORJSONResponse([_entry_to_dict(entry) for entry in entries])
+
+
+async def _create(section: str, data: Any, current_user: User) -> ORJSONResponse:
+    entry = await create_entry(section, ObjectId(str(current_user.id)), data.model_dump(mode="json"))
+    return ORJSONResponse(_entry_to_dict(entry), status_code=status.HTTP_201_CREATED)
+
+
+async def _update(section: str, entry_id: str, data: Any, current_user: User) -> ORJSONResponse:
+    fields = data.model_dump(exclude_unset=True, mode="json")
+    if not fields:
+        raise HTTPException(status_code=422, detail="Debe enviar al menos un campo a actualizar")
+    entry = await update_entry(section, entry_id, ObjectId(str(current_user.id)), fields)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Entrada del catálogo no encontrada")
+    return ORJSONResponse(_entry_to_dict(entry))
+
+
+async def _delete(section: str, entry_id: str, current_user: User) -> None:
+    try:
+        deleted = await delete_entry(section, entry_id, ObjectId(str(current_user.id)))
+    except CatalogEntryInUseError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Entrada del catálogo no encontrada")
+
+
+# ─── Impresoras ──────────────────────────────────────────────────────────
+
+@router.get("/printers", response_model=List[PrinterCatalogOutSchema])
+async def list_printers(current_user: User = Depends(get_current_user)) -> Any:
+    """
+    Lista las impresoras del catálogo del usuario autenticado.
+    """
+    return await _list("printer", current_user)
+
+
+@router.post("/printers", response_model=PrinterCatalogOutSchema, status_code=status.HTTP_201_CREATED)
+async def create_printer(data: PrinterCatalogCreateSchema, current_user: User = Depends(get_current_user)) -> Any:
+    """
+    Agrega una impresora al catálogo; las cotizaciones la referencian con printer_id.
+    """
+    return await _create("printer", data, current_user)
+
+
+@router.patch("/printers/{entry_id}", response_model=PrinterCatalogOutSchema)
+async def update_printer(
+    entry_id: str,
+    data: PrinterCatalogPatchSchema,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Modifica los campos enviados de la impresora e incrementa su versión.
+    """
+    return await _update("printer", entry_id, data, current_user)
+
+
+@router.delete("/printers/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_printer(entry_id: str, current_user: User = Depends(get_current_user)) -> None:
+    """
+    Elimina la impresora del catálogo (409 si alguna cotización la referencia).
+    """
+    await _delete("printer", entry_id, current_user)
+
+
+# ─── Filamentos ──────────────────────────────────────────────────────────
+
+@router.get("/filaments", response_model=List[FilamentCatalogOutSchema])
+async def list_filaments(current_user: User = Depends(get_current_user)) -> Any:
+    """
+    Lista los filamentos del catálogo del usuario autenticado.
+    """
+    return await _list("filament", current_user)
+
+
+@router.post("/filaments", response_model=FilamentCatalogOutSchema, status_code=status.HTTP_201_CREATED)
+async def create_filament(data: FilamentCatalogCreateSchema, current_user: User = Depends(get_current_user)) -> Any:
+    """
+    Agrega un filamento al catálogo; las cotizaciones lo referencian con filament_id.
+    """
+    return await _create("filament", data, current_user)
+
+
+@router.patch("/filaments/{entry_id}", response_model=FilamentCatalogOutSchema)
+async def update_filament(
+    entry_id: str,
+    data: FilamentCatalogPatchSchema,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Modifica los campos enviados del filamento e incrementa su versión.
+    """
+    return await _update("filament", entry_id, data, current_user)
+
+
+@router.delete("/filaments/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_filament(entry_id: str, current_user: User = Depends(get_current_user)) -> None:
+    """
+    Elimina el filamento del catálogo (409 si alguna cotización lo referencia).
+    """
+    await _delete("filament", entry_id, current_user)
+
+
+@router.get("/cache/stats")
+async def catalog_cache_stats(current_user: User = Depends(get_current_superuser)):
+    """
+    Contadores de la caché del catálogo (aciertos, fallos, expulsiones, tamaño).
+    Solo administradores.
+    """
+    return catalog_cache.stats()
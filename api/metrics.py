@@ -0,0 +1,28 @@
+# backend/api/metrics.py
+
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from core.config import settings
+from core.metrics import registry
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(authorization: str = Header("")) -> PlainTextResponse:
+    """
+    Métricas en formato de texto de Prometheus: latencia por ruta, tiempo por etapa,
+    peticiones en curso y comandos de MongoDB por ruta.
+    Con METRICS_TOKEN definido exige ese token como Bearer (el que configura el scraper).
+    """
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,36 @@
+# backend/api/print_schedule.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from bson import ObjectId
+
+from services.print_scheduler import schedule_user_quotes
+from services.quote_service import CatalogEntryNotFoundError
+from schemas.schedule_schema import ScheduleRequestSchema, ScheduleOutputSchema
+from core.auth import get_current_user
+from core.metrics import span
+from core.responses import ORJSONResponse
+
+router = APIRouter(prefix="/api/schedule", tags=["schedule"])
+
+@router.post("", response_model=ScheduleOutputSchema)
+async def schedule_quotes_endpoint(
+    data: ScheduleRequestSchema,
+    current_user = Depends(get_current_user)
+):
+    """
+    Reparte las cotizaciones del usuario (todas, o las de quote_ids) entre las impresoras
+    de la flota: cada trabajo va a una impresora del mismo tipo y boquilla.
+    objective="makespan" minimiza la hora de término de la granja; objective="cost" elige
+    las impresoras más baratas sin pasar de max_makespan (o del makespan mínimo encontrado).
+    """
+    fleet = [(entry.printer_id, entry.count) for entry in data.fleet]
+    try:
+        with span("schedule_jobs"):
+            result = await schedule_user_quotes(
+                ObjectId(str(current_user.id)), fleet, data.quote_ids, data.objective, data.max_makespan,
+            )
+    except CatalogEntryNotFoundError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(result)
@@ -0,0 +1,48 @@
+# backend/api/quote_analytics.py
+
+import math
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from bson import ObjectId
+
+from repositories.quote_analytics_repository import aggregate_quote_analytics
+from core.auth import get_current_user
+from core.responses import ORJSONResponse
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+
+def parse_cost_buckets(cost_buckets: Optional[str]) -> Optional[List[float]]:
+    """
+    Límites del histograma de costo: números finitos, al menos 2 y estrictamente ascendentes
+    (MongoDB rechaza en $bucket cualquier otra lista). Lanza 400 si no cumplen.
+    """
+    if not cost_buckets:
+        return None
+    try:
+        boundaries = [float(v) for v in cost_buckets.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cost_buckets debe ser una lista de números")
+    if not all(math.isfinite(b) for b in boundaries):
+        raise HTTPException(status_code=400, detail="cost_buckets no admite nan ni inf")
+    if len(boundaries) < 2 or any(a >= b for a, b in zip(boundaries, boundaries[1:])):
+        raise HTTPException(status_code=400, detail="cost_buckets debe tener al menos 2 límites ascendentes")
+    return boundaries
+
+
+@router.get("/analytics")
+async def quote_analytics_endpoint(
+    date_from: Optional[datetime] = Query(None, description="Desde (created_at >=)"),
+    date_to: Optional[datetime] = Query(None, description="Hasta (created_at <)"),
+    cost_buckets: Optional[str] = Query(None, description="Límites del histograma de costo, p.ej. 0,10,50,100"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Estadísticas de costo del usuario agregadas en MongoDB: totales, por tipo de filamento,
+    por tipo de impresora, por mes e histogramas de costo y desperdicio.
+    """
+    boundaries = parse_cost_buckets(cost_buckets)
+    result = await aggregate_quote_analytics(ObjectId(str(current_user.id)), date_from, date_to, boundaries)
+    return ORJSONResponse(result)
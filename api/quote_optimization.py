@@ -1,34 +1,98 @@
 # backend/api/quote_optimization.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
 
-from models.quote_model import Quote
+from services.quote_service import get_owned_quote_document, quote_from_document
 from services.pricing_logic import generate_optimization
+from services.pareto_optimizer import pareto_search, MAX_RESOLUTION
+from services.optimization_cache import (
+    get_cached_optimization, store_optimization, optimization_cache, optimization_etag,
+)
+from services.batch_optimization import stream_user_optimizations
+from services.print_time_model import PrintTimeModel, MODEL_NAME, print_time_model_stats
 from schemas.optimization_schema import OptimizationOutputSchema
-from core.auth import get_current_user # o donde tengas tu dependencia de usuario
+from core.metrics import span
+from core.etag import etag_matches
+from core.responses import etag_headers, not_modified
+from core.auth import get_current_user, get_current_superuser # o donde tengas tu dependencia de usuario
 
 router = APIRouter(prefix="/api/quotes", tags=["quotes"])
 
-@router.get("/{quote_id}/optimize", response_model=OptimizationOutputSchema)
+@router.get("/optimize")
+async def optimize_all_quotes_endpoint(current_user = Depends(get_current_user)) -> StreamingResponse:
+    """
+    Optimiza todas las cotizaciones del usuario en una sola petición y un solo recorrido
+    de la colección: NDJSON con el resultado de cada cotización (tres modos, mejor modo y ahorro)
+    y una línea final con el ahorro potencial de toda la cuenta.
+    """
+    return StreamingResponse(
+        stream_user_optimizations(ObjectId(str(current_user.id))),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{quote_id}/optimize", response_model=OptimizationOutputSchema, response_model_exclude_none=True)
 async def optimize_quote_endpoint(
     quote_id: str,
+    response: Response,
+    resolution: Optional[int] = Query(None, ge=2, le=MAX_RESOLUTION, description="Puntos por eje de la rejilla; activa la búsqueda de Pareto"),
+    w_time: float = Query(1.0, ge=0, description="Peso del tiempo de impresión"),
+    w_cost: float = Query(1.0, ge=0, description="Peso del costo total"),
+    w_waste: float = Query(1.0, ge=0, description="Peso del desperdicio"),
+    if_none_match: Optional[str] = Header(None, description="ETag recibido en la lectura anterior"),
     current_user = Depends(get_current_user)
 ):
-    # 1) Recuperar la cotización de MongoDB
-    try:
-        quote_obj = await Quote.get(ObjectId(quote_id))
-    except:
+    # 1-2) Recuperar la cotización del usuario en una sola consulta (_id + user_id)
+    doc = await get_owned_quote_document(quote_id, ObjectId(str(current_user.id)))
+    if doc is None:
         raise HTTPException(status_code=404, detail="Cotización no encontrada")
 
-    if not quote_obj:
-        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    # Si la cotización y el modelo de tiempo no cambiaron, el cliente ya tiene el resultado
+    etag = optimization_etag(doc["updated_at"])
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+    quote_obj = await quote_from_document(doc)
+
+    # 3) Reutilizar el resultado si la cotización no cambió
+    params = (resolution, w_time, w_cost, w_waste) if resolution is not None else ()
+    cache_key, cached = get_cached_optimization(quote_obj, params)
+    if cached is not None:
+        return cached
 
-    # 2) Verificar que el usuario sea propietario
-    if quote_obj.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="No tienes permiso para ver esta cotización")
+    # 4) Generar las tres propuestas de optimización
+    with span("generate_optimization"):
+        optimization = generate_optimization(quote_obj)
 
-    # 3) Generar las tres propuestas de optimización
-    optimization = generate_optimization(quote_obj)
+    # 5) Búsqueda en rejilla + frente de Pareto (opcional)
+    if resolution is not None:
+        with span("pareto_search"):
+            optimization["pareto"] = pareto_search(quote_obj, resolution, (w_time, w_cost, w_waste))
 
+    store_optimization(quote_obj, cache_key, optimization)
     return optimization
+
+
+@router.get("/optimization-cache/stats")
+async def optimization_cache_stats(current_user = Depends(get_current_superuser)):
+    """
+    Contadores de la caché de optimizaciones (aciertos, fallos, expulsiones, tamaño).
+    Solo administradores.
+    """
+    return optimization_cache.stats()
+
+
+@router.get("/print-time-model/stats")
+async def print_time_model_status(current_user = Depends(get_current_superuser)):
+    """
+    Estado del modelo de tiempo de impresión usado por la optimización
+    (muestras, revisión, RMSE y coeficientes). Solo administradores.
+    """
+    model = await PrintTimeModel.find_one(PrintTimeModel.name == MODEL_NAME)
+    if model is None:
+        return print_time_model_stats()
+    return print_time_model_stats(model)
@@ -0,0 +1,32 @@
+# backend/api/quote_sensitivity.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from bson import ObjectId
+
+from services.quote_service import get_owned_quote
+from services.sensitivity import sensitivity_analysis, DEFAULT_DELTA
+from schemas.sensitivity_schema import SensitivityOutputSchema
+from core.auth import get_current_user
+from core.metrics import span
+from core.responses import ORJSONResponse
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+@router.get("/{quote_id}/sensitivity", response_model=SensitivityOutputSchema)
+async def quote_sensitivity_endpoint(
+    quote_id: str,
+    delta: float = Query(DEFAULT_DELTA, gt=0, le=0.5, description="Perturbación relativa de cada entrada"),
+    current_user = Depends(get_current_user)
+):
+    """
+    Qué entrada determina el precio: elasticidad del costo total respecto a cada entrada
+    numérica del modelo de costo y datos para un gráfico de tornado, calculados en una sola
+    evaluación vectorizada.
+    """
+    quote_obj = await get_owned_quote(quote_id, ObjectId(str(current_user.id)))
+    if not quote_obj:
+        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+
+    with span("sensitivity_analysis"):
+        result = sensitivity_analysis(quote_obj, delta)
+    return ORJSONResponse(result)
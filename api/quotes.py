@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from typing import List, Any
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Request, Header
+from fastapi.responses import StreamingResponse
+from typing import List, Any, Optional
 from bson import ObjectId
 
-from schemas.quote_schema import QuoteCreateSchema, QuoteUpdateSchema, QuoteOutSchema
-from services.quote_service import create_quote, get_user_quotes, update_quote, delete_quote
+from schemas.quote_schema import QuoteCreateSchema, QuoteUpdateSchema, QuoteOutSchema, QuotePageSchema
+from schemas.quote_patch_schema import QuotePatchSchema
+from services.quote_service import (
+    create_quote, get_user_quotes, update_quote, patch_quote, delete_quote, get_duplicate_quotes,
+    get_owned_quote_document, quote_document_output, quote_etag, get_user_quotes_etag,
+    CatalogEntryNotFoundError, CatalogFieldPatchError,
+)
 from core.auth import get_current_user
+from core.pagination import InvalidCursorError
+from core.etag import PreconditionFailedError, parse_if_match, updated_at_etag, etag_matches
+from core.responses import ORJSONResponse, etag_headers, not_modified
+from core.metrics import span
+from schemas.quote_serializer import quote_to_dict
+from services.quote_export import stream_quotes_ndjson, stream_quotes_csv
+from services.quote_import import import_quotes, iter_csv_rows, iter_ndjson_rows, spool_upload
 from models.user_model import User
 
 router = APIRouter(prefix="/api/quotes", tags=["Quotes"])
@@ -16,27 +29,133 @@ async def create_quote_endpoint(
 ) -> Any:
     """
     Crea una cotización asociada al usuario autenticado.
+    Con printer_id / filament_id, las especificaciones salen del catálogo del usuario
+    y basta con enviar los ajustes del trabajo.
     """
     try:
         quote = await create_quote(str(current_user.id), data)
-        return QuoteOutSchema.model_validate(quote)
+        with span("serialize"):
+            return ORJSONResponse(quote_to_dict(quote), status_code=status.HTTP_201_CREATED)
+    except CatalogEntryNotFoundError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al crear la cotización: {str(e)}")
 
 
-@router.get("/", response_model=List[QuoteOutSchema])
+@router.get("/", response_model=QuotePageSchema)
 async def list_user_quotes(
+    limit: int = Query(50, ge=1, le=200, description="Tamaño de página"),
+    after: Optional[str] = Query(None, description="next_cursor devuelto por la página anterior"),
+    if_none_match: Optional[str] = Header(None, description="ETag recibido en la lectura anterior"),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
-    Lista las cotizaciones que pertenecen al usuario autenticado.
+    Lista las cotizaciones que pertenecen al usuario autenticado, paginadas por cursor
+    (orden por fecha de creación).
+    Con If-None-Match responde 304 sin leer la página si ninguna cotización cambió.
     """
+    user_id = ObjectId(str(current_user.id))
     try:
-        return await get_user_quotes(ObjectId(str(current_user.id)))
+        etag = await get_user_quotes_etag(user_id)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        page = await get_user_quotes(user_id, limit, after)
+        return ORJSONResponse(page, headers=etag_headers(etag))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener cotizaciones: {str(e)}")
 
 
+@router.get("/export")
+async def export_user_quotes(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson o csv"),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Exporta todas las cotizaciones del usuario autenticado en streaming
+    (memoria constante, los primeros bytes salen de inmediato).
+    """
+    user_id = ObjectId(str(current_user.id))
+    if export_format == "csv":
+        body, media_type = stream_quotes_csv(user_id), "text/csv"
+    else:
+        body, media_type = stream_quotes_ndjson(user_id), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="quotes.{export_format}"'},
+    )
+
+
+@router.post("/import")
+async def import_user_quotes(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson o csv"),
+    current_user: User = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Importa cotizaciones en lote desde NDJSON o CSV (mismo formato que /export).
+    Valida y cotiza por lotes, inserta con insert_many desordenado y responde
+    en streaming con el progreso y los errores por fila.
+    """
+    user_id = ObjectId(str(current_user.id))
+    text = await spool_upload(request.stream())
+    rows = iter_csv_rows(text) if import_format == "csv" else iter_ndjson_rows(text)
+
+    async def progress():
+        try:
+            async for line in import_quotes(user_id, rows):
+                yield line
+        finally:
+            text.close()
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router.get("/{quote_id}/duplicates", response_model=List[QuoteOutSchema])
+async def list_duplicate_quotes(
+    quote_id: str = Path(..., description="ID de la cotización de referencia"),
+    limit: int = Query(50, ge=1, le=200, description="Máximo de cotizaciones"),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Cotizaciones del usuario con exactamente las mismas entradas (mismo input_hash),
+    las más recientes primero.
+    """
+    duplicates = await get_duplicate_quotes(quote_id, ObjectId(str(current_user.id)), limit)
+    if duplicates is None:
+        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    return ORJSONResponse(duplicates)
+
+
+@router.get("/{quote_id}", response_model=QuoteOutSchema)
+async def get_quote_endpoint(
+    quote_id: str = Path(..., description="ID de la cotización"),
+    if_none_match: Optional[str] = Header(None, description="ETag recibido en la lectura anterior"),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Obtiene la cotización con ID=quote_id, si pertenece al usuario autenticado.
+    Responde con su ETag (sirve también como If-Match de PATCH) y con 304 si
+    If-None-Match coincide.
+    """
+    try:
+        _ = ObjectId(quote_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="ID inválido")
+
+    doc = await get_owned_quote_document(quote_id, ObjectId(str(current_user.id)))
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    etag = await quote_etag(doc)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    quote = await quote_document_output(doc)
+    with span("serialize"):
+        return ORJSONResponse(quote, headers=etag_headers(etag))
+
+
 @router.put("/{quote_id}", response_model=QuoteOutSchema)
 async def update_quote_endpoint(
     data: QuoteUpdateSchema,
@@ -52,33 +171,48 @@ async def update_quote_endpoint(
         raise HTTPException(status_code=400, detail="ID inválido")
 
     try:
-        updated_model = await update_quote(quote_id, data)
-        if not updated_model:
+        updated = await update_quote(quote_id, ObjectId(str(current_user.id)), data)
+        if not updated:
             raise HTTPException(status_code=404, detail="Cotización no encontrada")
     except HTTPException:
         raise
+    except CatalogEntryNotFoundError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al actualizar la cotización: {str(e)}")
 
+    return ORJSONResponse(updated, headers={"ETag": updated_at_etag(updated["updated_at"])})
+
+
+@router.patch("/{quote_id}", response_model=QuoteOutSchema)
+async def patch_quote_endpoint(
+    data: QuotePatchSchema,
+    quote_id: str = Path(..., description="ID de la cotización a modificar"),
+    if_match: Optional[str] = Header(None, description="ETag recibido al leer la cotización"),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Modifica solo los campos enviados de la cotización, si pertenece al usuario autenticado.
+    Con If-Match, falla con 412 si la cotización cambió desde que se leyó.
+    """
+    try:
+        _ = ObjectId(quote_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="ID inválido")
+
     try:
-        return QuoteOutSchema(
-            id=str(updated_model.id),
-            user_id=str(updated_model.user_id),
-            quote_name=updated_model.quote_name,
-            printer=updated_model.printer.model_dump(),
-            filament=updated_model.filament.model_dump(),
-            energy=updated_model.energy.model_dump(),
-            model=updated_model.model.model_dump(),
-            commercial=updated_model.commercial.model_dump(),
-            summary=updated_model.summary.model_dump(),
-            created_at=updated_model.created_at,
-            updated_at=updated_model.updated_at
-        )
+        expected = parse_if_match(if_match)
+        patched = await patch_quote(quote_id, ObjectId(str(current_user.id)), data, expected)
+    except PreconditionFailedError as e:
+        raise HTTPException(status_code=412, detail=str(e))
+    except CatalogFieldPatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error al serializar la cotización actualizada: {str(e)}"
-        )
+        raise HTTPException(status_code=500, detail=f"Error al actualizar la cotización: {str(e)}")
+
+    if patched is None:
+        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    return ORJSONResponse(patched, headers={"ETag": updated_at_etag(patched["updated_at"])})
 
 
 @router.delete("/{quote_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -90,7 +224,7 @@ async def delete_quote_endpoint(
     Elimina la cotización si pertenece al usuario autenticado.
     """
     try:
-        deleted = await delete_quote(quote_id)
+        deleted = await delete_quote(quote_id, ObjectId(str(current_user.id)))
         if not deleted:
             raise HTTPException(status_code=404, detail="Cotización no encontrada")
         return
@@ -0,0 +1,32 @@
+# backend/api/repricing.py
+
+from fastapi import APIRouter, Depends, status
+
+from services.repricing import repricing_status, start_repricing_run
+from core.auth import get_current_superuser
+from core.responses import ORJSONResponse
+from models.user_model import User
+
+router = APIRouter(prefix="/api/repricing", tags=["repricing"])
+
+
+@router.get("")
+async def repricing_status_endpoint(current_user: User = Depends(get_current_superuser)):
+    """
+    Progreso de la re-cotización: versión de la fórmula, último _id procesado, contadores
+    de la pasada y cotizaciones pendientes.
+    """
+    return ORJSONResponse(await repricing_status())
+
+
+@router.post("", status_code=status.HTTP_202_ACCEPTED)
+async def start_repricing_endpoint(current_user: User = Depends(get_current_superuser)):
+    """
+    Lanza (o reanuda) una pasada de re-cotización en segundo plano sin esperar
+    al siguiente intervalo; started=false si este proceso ya está ejecutando una.
+    """
+    started = start_repricing_run()
+    return ORJSONResponse(
+        {"started": started, **(await repricing_status())},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
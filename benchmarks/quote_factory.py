@@ -0,0 +1,82 @@
+# backend/benchmarks/quote_factory.py
+
+import random
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from models.enums.filament_enums import FilamentType, FilamentColor, FilamentDiameter
+from models.enums.printer_enums import PrinterType, NozzleSize, SupportType
+from services.pricing_logic import calculate_quote_summary
+from schemas.quote_schema import QuoteCreateSchema
+
+PRINTER_NAMES = ["Prusa MK4", "Ender 3", "Bambu X1", "Voron 24", "Anycubic Kobra"]
+FILAMENT_NAMES = ["Generico", "Premium", "Eco", "Pro"]
+
+
+def make_payload(rng: random.Random, index: int) -> Dict[str, Any]:
+    """
+    Cotización realista (mismo formato que el cuerpo de POST /api/quotes),
+    dentro de los rangos que validan los modelos. ~40 % con soportes.
+    """
+    supports = rng.random() < 0.4
+    layer = rng.choice([0.08, 0.12, 0.16, 0.2, 0.28, 0.32])
+    return {
+        "quote_name": f"Pieza {index:06d}",
+        "printer": {
+            "name": rng.choice(PRINTER_NAMES),
+            "watts": round(rng.uniform(80, 600), 1),
+            "type": rng.choice(list(PrinterType)).value,
+            "speed": round(rng.uniform(30, 300), 1),
+            "nozzle": rng.choice(list(NozzleSize)).value,
+            "layer": layer,
+            "bed_temperature": round(rng.uniform(0, 110)),
+            "hotend_temperature": round(rng.uniform(190, 300)),
+            "hourly_cost": round(rng.uniform(1, 15), 2),
+        },
+        "filament": {
+            "name": rng.choice(FILAMENT_NAMES),
+            "type": rng.choice(list(FilamentType)).value,
+            "diameter": rng.choice(list(FilamentDiameter)).value,
+            "price_per_kg": round(rng.uniform(12, 80), 2),
+            "color": rng.choice(list(FilamentColor)).value,
+            "total_weight": 1000,
+        },
+        "energy": {"kwh_cost": round(rng.uniform(0.05, 0.4), 3)},
+        "model": {
+            "model_weight": round(rng.uniform(2, 800), 1),
+            "print_time": round(rng.uniform(0.2, 48), 2),
+            "infill": round(rng.uniform(5, 100)),
+            "supports": supports,
+            "support_type": rng.choice(list(SupportType)).value if supports else None,
+            "support_weight": round(rng.uniform(1, 80), 1) if supports else 0,
+            "layer_height": layer,
+        },
+        "commercial": {
+            "labor": round(rng.uniform(0, 30), 2),
+            "post_processing": round(rng.uniform(0, 20), 2),
+            "margin": round(rng.uniform(0.1, 0.6), 2),
+            "taxes": round(rng.uniform(0, 0.21), 2),
+        },
+    }
+
+
+def make_payloads(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_payload(rng, i) for i in range(n)]
+
+
+def make_document(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Documento crudo como lo devuelve MongoDB (con _id, user_id, summary y fechas naive en UTC).
+    """
+    created_at = datetime.now(UTC).replace(tzinfo=None) - timedelta(days=1)
+    return {
+        "_id": ObjectId(),
+        "user_id": ObjectId(),
+        **payload,
+        "summary": calculate_quote_summary(QuoteCreateSchema.model_validate(payload)),
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
@@ -0,0 +1,294 @@
+# backend/benchmarks/run_benchmarks.py
+"""
+Micro-benchmarks de las rutas calientes (precio, optimización, validación y serialización).
+
+    python -m benchmarks.run_benchmarks                        # tamaños 1, 100, 1000
+    python -m benchmarks.run_benchmarks --sizes 10,1000 --repeat 7 --output before.json
+    python -m benchmarks.run_benchmarks --compare before.json  # falla si algo empeora > 10 %
+
+Los resultados se expresan en microsegundos por cotización (mediana y mínimo de las repeticiones)
+y se guardan en JSON para compararlos entre commits (la comparación usa el mínimo).
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import orjson
+import pydantic
+
+from benchmarks.quote_factory import make_document, make_payloads
+from models.quote_model import Quote, Printer, Filament, Energy, ModelData, Commercial, Summary
+from schemas.quote_schema import QuoteCreateSchema, QuoteOutSchema
+from schemas.quote_serializer import quote_document_to_dict
+from services.batch_pricing import price_batch, rows_to_columns
+from services.pricing_logic import calculate_quote_summary, generate_optimization
+from services.summary_cache import memoized_quote_summary
+
+DEFAULT_SIZES = (1, 100, 1000)
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.10   # empeoramiento relativo tolerado al comparar
+
+
+# Cada benchmark recibe los datos del lote y procesa todas sus cotizaciones
+def bench_calculate_quote_summary(data: Dict[str, Any]) -> None:
+    for schema in data["schemas"]:
+        calculate_quote_summary(schema)
+
+
+def bench_memoized_quote_summary(data: Dict[str, Any]) -> None:
+    # Hash de las entradas + resumen en caché (tras la vuelta de calentamiento todo son aciertos)
+    for schema in data["schemas"]:
+        memoized_quote_summary(schema)
+
+
+def bench_generate_optimization(data: Dict[str, Any]) -> None:
+    # generate_optimization solo lee atributos: los esquemas tienen las mismas secciones que Quote
+    for schema in data["schemas"]:
+        generate_optimization(schema)
+
+
+def bench_price_batch(data: Dict[str, Any]) -> None:
+    price_batch(data["columns"])
+
+
+def bench_create_schema_validation(data: Dict[str, Any]) -> None:
+    for payload in data["payloads"]:
+        QuoteCreateSchema.model_validate(payload)
+
+
+def bench_model_data_validation(data: Dict[str, Any]) -> None:
+    # Incluye ModelData.check_support_dependencies
+    for payload in data["payloads"]:
+        ModelData(**payload["model"])
+
+
+def bench_quote_sections_validation(data: Dict[str, Any]) -> None:
+    for doc in data["documents"]:
+        Printer(**doc["printer"])
+        Filament(**doc["filament"])
+        Energy(**doc["energy"])
+        ModelData(**doc["model"])
+        Commercial(**doc["commercial"])
+        Summary(**doc["summary"])
+
+
+def bench_quote_document_validation(data: Dict[str, Any]) -> None:
+    for doc in data["documents"]:
+        Quote.model_validate(doc)
+
+
+def bench_quote_out_schema(data: Dict[str, Any]) -> None:
+    # Ruta anterior a quote_serializer: construir QuoteOutSchema y serializarlo
+    for doc in data["documents"]:
+        QuoteOutSchema.model_validate({**doc, "_id": str(doc["_id"]), "user_id": str(doc["user_id"])}) \
+            .model_dump_json(by_alias=True)
+
+
+def bench_quote_serializer(data: Dict[str, Any]) -> None:
+    # Ruta actual de los endpoints: dict directo + orjson
+    for doc in data["documents"]:
+        orjson.dumps(quote_document_to_dict(doc), default=str, option=orjson.OPT_UTC_Z)
+
+
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "calculate_quote_summary": bench_calculate_quote_summary,
+    "memoized_quote_summary": bench_memoized_quote_summary,
+    "generate_optimization": bench_generate_optimization,
+    "price_batch": bench_price_batch,
+    "create_schema_validation": bench_create_schema_validation,
+    "model_data_validation": bench_model_data_validation,
+    "quote_sections_validation": bench_quote_sections_validation,
+    "quote_document_validation": bench_quote_document_validation,
+    "quote_out_schema": bench_quote_out_schema,
+    "quote_serializer": bench_quote_serializer,
+}
+
+# Requieren Beanie inicializado (y por lo tanto MongoDB accesible)
+NEEDS_BEANIE = {"quote_document_validation"}
+
+
+def build_batch(n: int, seed: int) -> Dict[str, Any]:
+    payloads = make_payloads(n, seed)
+    schemas = [QuoteCreateSchema.model_validate(p) for p in payloads]
+    columns = rows_to_columns([
+        {
+            "price_per_kg": s.filament.price_per_kg,
+            "model_weight": s.model.model_weight,
+            "support_weight": s.model.support_weight,
+            "watts": s.printer.watts,
+            "print_time": s.model.print_time,
+            "kwh_cost": s.energy.kwh_cost,
+            "hourly_cost": s.printer.hourly_cost,
+            "labor": s.commercial.labor,
+            "post_processing": s.commercial.post_processing,
+            "margin": s.commercial.margin,
+            "taxes": s.commercial.taxes,
+        }
+        for s in schemas
+    ])
+    return {
+        "payloads": payloads,
+        "schemas": schemas,
+        "columns": columns,
+        "documents": [make_document(p) for p in payloads],
+    }
+
+
+def time_benchmark(fn: Callable[[Dict[str, Any]], None], data: Dict[str, Any], n: int, repeat: int) -> Dict[str, Any]:
+    """Una vuelta de calentamiento y 'repeat' mediciones con el GC desactivado."""
+    fn(data)
+    runs = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(data)
+            runs.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        "median_us_per_quote": round(statistics.median(runs) / n * 1e6, 3),
+        "min_us_per_quote": round(min(runs) / n * 1e6, 3),
+        "runs": repeat,
+    }
+
+
+async def init_beanie_for_benchmarks(timeout_ms: int = 2000) -> Optional[str]:
+    """
+    Inicializa Beanie contra la base configurada (sin crear índices) para poder
+    construir Quote. Retorna el motivo si no fue posible.
+    """
+    try:
+        from beanie import init_beanie
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from core.config import settings
+
+        client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=timeout_ms)
+        await init_beanie(database=client[settings.DATABASE_NAME], document_models=[Quote], skip_indexes=True)
+        return None
+    except Exception as e:
+        return f"{type(e).__name__}: {e}".splitlines()[0][:200]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], repeat: int, seed: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    selected = {name: fn for name, fn in BENCHMARKS.items() if not only or name in only}
+    skipped: Dict[str, str] = {}
+    if NEEDS_BEANIE & set(selected):
+        reason = asyncio.run(init_beanie_for_benchmarks())
+        if reason is not None:
+            for name in NEEDS_BEANIE & set(selected):
+                skipped[name] = reason
+                del selected[name]
+
+    results: Dict[str, Dict[str, Any]] = {name: {} for name in selected}
+    for n in sizes:
+        data = build_batch(n, seed)
+        for name, fn in selected.items():
+            results[name][str(n)] = time_benchmark(fn, data, n, repeat)
+            print(f"{name:<28} n={n:<6} {results[name][str(n)]['median_us_per_quote']:>12.3f} µs/cotización",
+                  file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pydantic": pydantic.VERSION,
+            "sizes": sizes,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compara por benchmark y tamaño el mínimo de las repeticiones (el menos sensible al ruido
+    de otros procesos). Retorna las filas comparables; 'regression' es True si el tiempo
+    por cotización creció más que 'threshold'.
+    """
+    rows = []
+    for name, by_size in current["results"].items():
+        for size, result in by_size.items():
+            old = baseline.get("results", {}).get(name, {}).get(size)
+            if not old or not old["min_us_per_quote"]:
+                continue
+            ratio = result["min_us_per_quote"] / old["min_us_per_quote"]
+            rows.append({
+                "benchmark": name,
+                "n": int(size),
+                "baseline_us": old["min_us_per_quote"],
+                "current_us": result["min_us_per_quote"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold,
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de cotización")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Tamaños de lote, p.ej. 1,100,1000")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Mediciones por benchmark y tamaño")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de las cotizaciones generadas")
+    parser.add_argument("--only", default=None, help="Benchmarks a ejecutar, separados por comas")
+    parser.add_argument("--output", default=None, help="Archivo JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--compare", default=None, help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Empeoramiento tolerado (0.10 = 10 %%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    report = run(sizes, args.repeat, args.seed, only)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["comparison"] = {
+            "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "threshold": args.threshold,
+            "rows": compare(baseline, report, args.threshold),
+        }
+        for row in report["comparison"]["rows"]:
+            flag = "  REGRESIÓN" if row["regression"] else ""
+            print(f"{row['benchmark']:<28} n={row['n']:<6} {row['baseline_us']:>10.3f} -> "
+                  f"{row['current_us']:>10.3f} µs (x{row['ratio']}){flag}", file=sys.stderr)
+        if any(row["regression"] for row in report["comparison"]["rows"]):
+            exit_code = 1
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -11,9 +14,18 @@ from fastapi.security import OAuth2PasswordBearer
 from models.user_model import User
 from schemas.user_schema import TokenDataSchema
 from core.config import settings
+from core.user_cache import user_cache, token_cache
+from core.metrics import span
 
 # -------------------- Hashing de contraseñas --------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds = max_rounds = rounds: cualquier hash con otro costo "necesita actualización"
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def hash_password(password: str) -> str:
     """
@@ -27,6 +39,56 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y, si el hash usa un costo distinto a BCRYPT_ROUNDS,
+    devuelve también el nuevo hash (si no, None).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# bcrypt tarda cientos de ms: se ejecuta en un pool para no bloquear el event loop.
+_hash_executor: Optional[Executor] = None
+_hash_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _hash_executor
+
+async def _run_in_hash_executor(func, *args):
+    async with _hash_semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+
+async def hash_password_async(password: str) -> str:
+    """
+    Igual que hash_password, pero en el pool de hashing.
+    """
+    return await _run_in_hash_executor(hash_password, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Igual que verify_and_update_password, pero en el pool de hashing.
+    """
+    return await _run_in_hash_executor(verify_and_update_password, plain_password, hashed_password)
+
+def shutdown_hash_executor() -> None:
+    """
+    Cierra el pool de hashing (al apagar la aplicación).
+    """
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 
 # -------------------- Configuración de JWT --------------------
 SECRET_KEY = settings.SECRET_KEY
@@ -51,9 +113,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """
     Dependencia que extrae al usuario actual del JWT.
-    - Decodifica el token.
+    - Decodifica el token (o lo toma de la caché hasta su 'exp').
     - Obtiene 'sub' como username.
-    - Busca el objeto User.username == sub.
+    - Busca el objeto User.username == sub (o lo toma de la caché de usuarios).
     - Si no existe o no está activo, lanza 401.
     """
     credentials_exception = HTTPException(
@@ -61,16 +123,39 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
+    with span("jwt_decode"):
+        username = token_cache.get(token)
         if username is None:
-            raise credentials_exception
-        token_data = TokenDataSchema(username=username)
-    except (JWTError, ValidationError):
-        raise credentials_exception
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+                username: str = payload.get("sub")
+                if username is None:
+                    raise credentials_exception
+                token_data = TokenDataSchema(username=username)
+            except (JWTError, ValidationError):
+                raise credentials_exception
+            username = token_data.username
+            exp = payload.get("exp")
+            if exp is not None:
+                token_cache.set(token, username, ttl=max(0.0, float(exp) - time.time()))
 
-    user = await User.find_one(User.username == token_data.username)
-    if user is None or not user.is_active:
+    with span("user_lookup"):
+        user = user_cache.get(username)
+        if user is None:
+            user = await User.find_one(User.username == username)
+            if user is None or not user.is_active:
+                raise credentials_exception
+            user_cache.set(username, user)
+    if not user.is_active:
         raise credentials_exception
     return user
+
+
+async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependencia para los endpoints de administración (estadísticas internas, re-cotización):
+    el usuario actual si es administrador (is_superuser); si no, 403.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Requiere un usuario administrador")
+    return current_user
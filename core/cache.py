@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set
+
+
+class TTLCache:
+    """
+    Caché en memoria del proceso con expulsión LRU por tamaño y expiración por TTL.
+    Cada entrada puede asociarse a una etiqueta (p.ej. el id de una cotización)
+    para invalidar de una vez todas las entradas relacionadas.
+    No es thread-safe: está pensada para usarse desde el event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expira, valor, etiqueta)
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tag: Optional[Hashable] = None, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        if key in self._data:
+            self._remove(key)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value, tag)
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        if key in self._data:
+            self._remove(key)
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Elimina todas las entradas asociadas a 'tag'. Retorna cuántas se eliminaron."""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self._data.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tag = self._data.pop(key)
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._data)
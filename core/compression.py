@@ -0,0 +1,124 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin el paquete solo se usa gzip
+    brotli = None
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """True si el encabezado Accept-Encoding acepta 'encoding' (ignora las que tienen q=0)."""
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        if name.strip().lower() != encoding:
+            continue
+        q = params.strip().lower()
+        return not (q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"))
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Comprime las respuestas de al menos 'minimum_size' bytes con brotli si el cliente lo
+    acepta y el paquete está instalado, y si no con gzip (GZipMiddleware de Starlette).
+    Las respuestas en streaming (export, NDJSON) se comprimen por partes.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        send = _etag_per_encoding(send)
+        if brotli is not None:
+            if accepts_encoding(Headers(scope=scope).get("accept-encoding", ""), "br"):
+                responder = _BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+                await responder(scope, receive, send)
+                return
+        await self.gzip(scope, receive, send)
+
+
+def _etag_per_encoding(send: Send) -> Send:
+    """
+    Agrega al ETag fuerte la codificación de la respuesta ("<etag>-br", "<etag>-gzip"):
+    las representaciones comprimidas no comparten validador con la original.
+    """
+    async def wrapped(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            coding = headers.get("content-encoding")
+            etag = headers.get("etag")
+            if coding and etag:
+                headers["ETag"] = encoded_etag(etag, coding.strip().lower())
+        await send(message)
+    return wrapped
+
+
+class _BrotliResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.quality = quality
+        self.send: Send = None
+        self.start_message: Message = None
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    async def send_with_brotli(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Se retiene hasta ver el primer fragmento del cuerpo (tamaño y si hay más)
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+            )
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self.started = True
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = "br"
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = brotli.Compressor(quality=self.quality)
+            if not more_body:
+                data = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(data))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": data})
+                return
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        data = self.compressor.process(body)
+        data += self.compressor.flush() if more_body else self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
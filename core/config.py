@@ -6,6 +6,72 @@ class Settings(BaseSettings):
     DATABASE_NAME: str
     SECRET_KEY: str
 
+    # Pool de conexiones de Motor/PyMongo
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10              # conexiones que se mantienen abiertas
+    MONGO_MAX_IDLE_TIME_MS: int = 300000       # cierra conexiones ociosas (> min) tras 5 min
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000    # espera máxima por una conexión libre del pool
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 30000
+    MONGO_COMPRESSORS: str = "zlib"            # p.ej. "zstd,snappy,zlib" (zstd y snappy requieren sus paquetes)
+    MONGO_WARMUP_CONNECTIONS: int = 10         # conexiones abiertas antes de aceptar tráfico (0 = solo ping)
+
+    # Crear los índices de Beanie al arrancar (desactivar en réplicas escaladas si ya existen)
+    CREATE_INDEXES: bool = True
+
+    # Hashing de contraseñas (bcrypt) fuera del event loop
+    BCRYPT_ROUNDS: int = 12              # costo; al cambiarlo se re-hashea en el siguiente login
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" o "process"
+    PASSWORD_HASH_WORKERS: int = 4       # tamaño del pool
+    PASSWORD_HASH_CONCURRENCY: int = 8   # operaciones de hash simultáneas (en cola incluidas)
+
+    # Caché de usuarios autenticados y tokens decodificados
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL: int = 60             # segundos
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Verificar índices y planes de las consultas calientes al arrancar
+    VERIFY_INDEXES: bool = True
+
+    # Caché de resultados de optimización
+    OPTIMIZATION_CACHE_SIZE: int = 1024  # entradas máximas (LRU)
+    OPTIMIZATION_CACHE_TTL: int = 300    # segundos
+
+    # Memoización de resúmenes por hash de las entradas de la cotización
+    SUMMARY_CACHE_SIZE: int = 4096       # entradas máximas (LRU)
+    SUMMARY_CACHE_TTL: int = 3600        # segundos
+
+    # Catálogo de impresoras y filamentos (caché en memoria con invalidación por versión)
+    CATALOG_CACHE_SIZE: int = 10000
+    CATALOG_CACHE_TTL: int = 300             # segundos
+    CATALOG_VERSION_CHECK_INTERVAL: float = 5.0  # cada cuánto se consulta la versión global del catálogo
+
+    # Modelo de tiempo de impresión (regresión ridge sobre las cotizaciones guardadas)
+    PRINT_TIME_RETRAIN_INTERVAL: int = 3600  # segundos entre reentrenamientos incrementales (0 = desactivado)
+    PRINT_TIME_MIN_SAMPLES: int = 50         # cotizaciones mínimas para usar el modelo
+    PRINT_TIME_RIDGE_ALPHA: float = 1.0      # regularización L2
+
+    # Planificación de la granja de impresión (POST /api/schedule)
+    SCHEDULE_MAX_JOBS: int = 20000       # cotizaciones por plan; las que exceden se informan en 'truncated'
+    SCHEDULE_MAX_MACHINES: int = 2000    # unidades de impresora en la flota
+
+    # Re-cotización en segundo plano de los resúmenes con otra versión de la fórmula (PRICING_VERSION)
+    REPRICING_INTERVAL: int = 60         # segundos entre búsquedas de cotizaciones pendientes (0 = desactivado)
+    REPRICING_CHUNK_SIZE: int = 1000     # cotizaciones por lote (una lectura y un bulk_write)
+    REPRICING_MAX_RATE: int = 5000       # cotizaciones por segundo como máximo (0 = sin límite)
+    REPRICING_LEASE_SECONDS: int = 120   # si el proceso que la ejecuta muere, otro la retoma después
+
+    # Compresión de respuestas (brotli si el cliente lo acepta y el paquete está instalado; si no, gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024     # bytes; las respuestas menores se envían sin comprimir
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; calidades altas cuestan mucho CPU por respuesta
+
+    # Métricas de latencia por ruta/etapa y comandos de MongoDB en /metrics (desactivadas por defecto)
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""              # si se define, /metrics exige "Authorization: Bearer <token>"
+
     class Config:
         env_file = ".env"
 
@@ -1,32 +1,185 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
 
 from models.quote_model import Quote
 from models.user_model import User       # <— Importa tu modelo User
+from models.print_time_model import PrintTimeModel
+from models.catalog_model import PrinterCatalog, FilamentCatalog
 from core.config import settings
+from core.metrics import mongo_command_listener
+from services.pricing_logic import PRICING_VERSION
 
+import asyncio
 import logging
 import sys
+import time
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Consultas calientes que deben resolverse con índice: (colección, descripción, filtro, orden)
+HOT_QUERIES = [
+    ("users", "get_current_user", {"username": ""}, None),
+    ("users", "login ($or username/email)", {"$or": [{"username": ""}, {"email": ""}]}, None),
+    ("quotes", "list_user_quotes", {"user_id": ObjectId()},
+     [("created_at", ASCENDING), ("_id", ASCENDING)]),
+    ("quotes", "quotes list ETag (latest updated_at)", {"user_id": ObjectId()}, [("updated_at", DESCENDING)]),
+    ("quotes", "owned quote (get/update/delete/optimize)", {"_id": ObjectId(), "user_id": ObjectId()}, None),
+    ("quotes", "duplicate quotes (input_hash)", {"user_id": ObjectId(), "input_hash": ""},
+     [("_id", DESCENDING)]),
+    # La re-cotización lee una versión vieja por vez (igualdad): el orden por _id sale del índice
+    ("quotes", "stale pricing (repricing job)", {"pricing_version": PRICING_VERSION - 1, "_id": {"$gt": ObjectId()}},
+     [("_id", ASCENDING)]),
+    ("quotes", "catalog entry in use (printer)", {"printer_id": ObjectId()}, None),
+    ("quotes", "catalog entry in use (filament)", {"filament_id": ObjectId()}, None),
+    ("printers", "list catalog printers", {"user_id": ObjectId()}, [("name", ASCENDING)]),
+    ("filaments", "list catalog filaments", {"user_id": ObjectId()}, [("name", ASCENDING)]),
+]
 
-async def initiate_database():
+
+_client: Optional[AsyncIOMotorClient] = None
+_verify_task: Optional[asyncio.Task] = None
+
+
+def mongo_client_options() -> dict:
+    """Opciones del pool, timeouts y compresión tomadas de Settings."""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "compressors": [c.strip() for c in settings.MONGO_COMPRESSORS.split(",") if c.strip()],
+        "event_listeners": [mongo_command_listener] if settings.METRICS_ENABLED else [],
+    }
+
+
+async def warm_up_pool(client: AsyncIOMotorClient, connections: int) -> None:
+    """
+    Abre 'connections' conexiones antes de aceptar tráfico (pings simultáneos: cada uno
+    toma su propia conexión del pool), así las primeras peticiones no pagan el handshake.
+    """
+    await client.admin.command("ping")
+    if connections > 1:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections - 1)))
+
+
+async def initiate_database() -> AsyncIOMotorClient:
+    global _client, _verify_task
+    start = time.perf_counter()
     try:
-        client = AsyncIOMotorClient(settings.MONGO_URI)
+        client = AsyncIOMotorClient(settings.MONGO_URI, **mongo_client_options())
         database = client[settings.DATABASE_NAME]
-        logger.info("Successfully connected to MongoDB.")
     except Exception as e:
         logger.critical(f"Failed to connect to MongoDB: {e}")
         sys.exit(1)
 
     try:
-        # Añade ambos modelos: Quote y User
-        await init_beanie(
-            database=database,
-            document_models=[Quote, User]
+        # Beanie (incluye Quote, User, PrintTimeModel y el catálogo) y el calentamiento del pool en paralelo
+        await asyncio.gather(
+            init_beanie(
+                database=database,
+                document_models=[Quote, User, PrintTimeModel, PrinterCatalog, FilamentCatalog],
+                skip_indexes=not settings.CREATE_INDEXES,
+            ),
+            warm_up_pool(client, min(settings.MONGO_WARMUP_CONNECTIONS, settings.MONGO_MAX_POOL_SIZE)),
+        )
+        logger.info(
+            f"✅ MongoDB connected and Beanie initialized (Quote, User, PrintTimeModel, PrinterCatalog, FilamentCatalog) "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms."
         )
-        logger.info("✅ Beanie initialized successfully with models: Quote, User.")
     except Exception as e:
-        logger.critical(f"Failed to initialize Beanie: {e}")
+        logger.critical(f"Failed to initialize MongoDB/Beanie: {e}")
+        client.close()
         sys.exit(1)
+
+    _client = client
+    if settings.VERIFY_INDEXES:
+        # Solo emite avisos: se hace en segundo plano para no retrasar el arranque
+        _verify_task = asyncio.create_task(_verify_database(database))
+    return client
+
+
+async def _verify_database(database) -> None:
+    try:
+        await verify_indexes(database)
+        await verify_query_plans(database)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Could not verify indexes: {e}")
+
+
+async def close_database() -> None:
+    """Cancela la verificación pendiente y cierra el pool de conexiones."""
+    global _client, _verify_task
+    if _verify_task is not None:
+        _verify_task.cancel()
+        try:
+            await _verify_task
+        except asyncio.CancelledError:
+            pass
+        _verify_task = None
+    if _client is not None:
+        _client.close()
+        _client = None
+        logger.info("MongoDB connection pool closed.")
+
+
+async def verify_indexes(database) -> bool:
+    """
+    Comprueba que cada índice declarado en Settings.indexes exista en MongoDB
+    (init_beanie los crea; aquí se detecta si falló la creación, p.ej. por duplicados).
+    """
+    ok = True
+    for model in (Quote, User, PrinterCatalog, FilamentCatalog):
+        collection = database[model.Settings.name]
+        existing = await collection.index_information()
+        existing_keys = {tuple((field, int(direction)) for field, direction in info["key"])
+                         for info in existing.values()}
+        for index in model.Settings.indexes:
+            key = tuple((field, int(direction)) for field, direction in index.document["key"].items())
+            if key not in existing_keys:
+                logger.error(f"Missing index {index.document['name']} on '{model.Settings.name}'")
+                ok = False
+    if ok:
+        logger.info("Indexes verified for models: Quote, User, PrinterCatalog, FilamentCatalog.")
+    return ok
+
+
+def _plan_stages(plan) -> list:
+    """Recorre un plan de explain() y devuelve todas las etapas ('stage')."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+async def verify_query_plans(database) -> bool:
+    """
+    Ejecuta explain() sobre las consultas calientes y avisa si alguna
+    hace COLLSCAN o un SORT en memoria en lugar de usar un índice.
+    """
+    ok = True
+    for collection_name, label, query, sort in HOT_QUERIES:
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        if "COLLSCAN" in stages or "SORT" in stages:
+            logger.warning(f"Query '{label}' on '{collection_name}' does not use an index: {stages}")
+            ok = False
+    if ok:
+        logger.info("Hot queries use indexes.")
+    return ok
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, UTC
+from typing import Any, List, Optional
+
+from core.pagination import EPOCH
+
+
+# Codificaciones que CompressionMiddleware agrega al ETag fuerte ("<etag>-br"): cada
+# representación comprimida tiene su propio validador (RFC 9110 §8.8.3)
+CONTENT_CODINGS = ("br", "gzip")
+
+
+class PreconditionFailedError(Exception):
+    """El recurso cambió desde que el cliente lo leyó (If-Match no coincide)."""
+
+
+def now_millis() -> datetime:
+    """Fecha actual truncada a milisegundos (la precisión con la que MongoDB guarda fechas)."""
+    now = datetime.now(UTC)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def _millis(updated_at: datetime) -> int:
+    if updated_at.tzinfo is None:
+        # Beanie/Motor devuelven fechas naive en UTC
+        updated_at = updated_at.replace(tzinfo=UTC)
+    return (updated_at - EPOCH) // timedelta(milliseconds=1)
+
+
+def updated_at_etag(updated_at: datetime, catalog_version: Optional[int] = None) -> str:
+    """
+    ETag de una cotización a partir de su updated_at (cambia en cada escritura).
+    Si la cotización referencia el catálogo, se agrega su versión: los nombres de las
+    entradas se leen de él y pueden cambiar sin tocar la cotización. parse_if_match
+    solo usa la parte de updated_at.
+    """
+    if catalog_version is None:
+        return f'"{_millis(updated_at)}"'
+    return f'"{_millis(updated_at)}-c{catalog_version}"'
+
+
+def derived_etag(updated_at: Optional[datetime], *parts: Any) -> str:
+    """
+    ETag débil de una respuesta calculada a partir de datos guardados: la fecha de la
+    última escritura (p.ej. el máximo updated_at de un listado) más lo que también
+    determina el resultado (cantidad de cotizaciones, versión del catálogo o del modelo).
+    """
+    millis = _millis(updated_at) if updated_at is not None else 0
+    return 'W/"' + "-".join(str(part) for part in (millis, *parts)) + '"'
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """ETag fuerte de la representación comprimida con 'coding' (los débiles no cambian)."""
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def _opaque(tag: str) -> str:
+    # Sin "W/" ni el sufijo de codificación: el validador de la representación sin comprimir
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for coding in CONTENT_CODINGS:
+        if tag.endswith(f'-{coding}"'):
+            return tag[:-len(coding) - 2] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True si el encabezado If-None-Match incluye 'etag' (comparación débil: se ignoran "W/"
+    y el sufijo de codificación que agrega la compresión).
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = _opaque(etag)
+    return any(_opaque(tag) == opaque for tag in if_none_match.split(","))
+
+
+def parse_if_match(header: Optional[str]) -> Optional[List[datetime]]:
+    """
+    Convierte un encabezado If-Match en las fechas updated_at aceptadas.
+    Retorna None si no hay precondición (encabezado ausente o "*").
+    Lanza PreconditionFailedError si ningún ETag tiene el formato de updated_at_etag.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    accepted = []
+    for tag in header.split(","):
+        tag = _opaque(tag)
+        try:
+            accepted.append(EPOCH + timedelta(milliseconds=int(tag.strip('"').split("-")[0])))
+        except ValueError:
+            continue
+    if not accepted:
+        raise PreconditionFailedError("If-Match inválido")
+    return accepted
@@ -0,0 +1,226 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from pymongo import monitoring
+
+# Límites de los histogramas de latencia (segundos)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "unmatched"    # rutas inexistentes (evita una serie por URL)
+ROUTING_ROUTE = "routing"        # peticiones en curso que aún no llegan a su ruta
+BACKGROUND_ROUTE = "background"  # consultas fuera de una petición (arranque, tareas periódicas)
+
+Labels = Tuple[str, ...]
+
+
+class RequestMetrics:
+    """Tiempos por etapa y comandos de MongoDB de la petición en curso."""
+
+    __slots__ = ("scope", "stages", "db_calls", "db_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.stages: Dict[str, float] = {}
+        self.db_calls: Dict[str, int] = {}
+        self.db_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: Dict[Labels, list] = {}  # labels -> [conteo por bucket, suma, total]
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            base = _labels(self.label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], kind: str = "counter"):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.kind = kind
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{{{_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Labels) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class MetricsRegistry:
+    """
+    Métricas del proceso. Las actualizaciones se agrupan al final de cada petición
+    (una sola toma del lock); los comandos de MongoDB llegan desde los hilos de Motor.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Histogram(
+            "http_request_duration_seconds", "Latencia de las peticiones HTTP.", ("method", "route", "status"))
+        self.stages = Histogram(
+            "http_request_stage_duration_seconds", "Tiempo por etapa dentro de una petición.", ("route", "stage"))
+        self.db_commands = Counter(
+            "mongodb_commands_total", "Comandos enviados a MongoDB.", ("route", "command"))
+
+        self._active: Set[RequestMetrics] = set()
+
+    def request_started(self, state: RequestMetrics) -> None:
+        with self._lock:
+            self._active.add(state)
+
+    def request_finished(self, method: str, route: str, status: int, elapsed: float, state: RequestMetrics) -> None:
+        with self._lock:
+            self._active.discard(state)
+            self.requests.observe((method, route, str(status)), elapsed)
+            for stage, seconds in state.stages.items():
+                self.stages.observe((route, stage), seconds)
+            if state.db_calls:
+                self.stages.observe((route, "mongodb"), state.db_seconds)
+                for command, count in state.db_calls.items():
+                    self.db_commands.inc((route, command), count)
+
+    def background_command(self, command: str) -> None:
+        with self._lock:
+            self.db_commands.inc((BACKGROUND_ROUTE, command))
+
+    def render(self) -> str:
+        with self._lock:
+            # Peticiones en curso por ruta: se calcula al consultar, sin costo por petición
+            in_flight = Counter("http_requests_in_flight", "Peticiones en curso.", ("route",), kind="gauge")
+            for state in self._active:
+                in_flight.inc((route_path(state.scope, ROUTING_ROUTE),))
+            lines = []
+            for metric in (self.requests, self.stages, in_flight, self.db_commands):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Mide una etapa de la petición en curso (p.ej. "jwt_decode", "quote_insert").
+    Fuera de una petición no hace nada. Las etapas repetidas se suman.
+    """
+    state = _current.get()
+    if state is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        state.stages[name] = state.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def route_path(scope, default: str = UNMATCHED_ROUTE) -> str:
+    """
+    Plantilla de la ruta ("/api/quotes/{quote_id}") que el router deja en scope["route"],
+    para no crear una serie por cada id.
+    """
+    return getattr(scope.get("route"), "path", None) or default
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sin BaseHTTPMiddleware, no rompe el streaming): latencia total por
+    método/ruta/estado, peticiones en curso y las etapas y comandos acumulados durante la petición.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = RequestMetrics(scope)
+        token = _current.set(state)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.request_started(state)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.request_finished(scope["method"], route_path(scope), status_code, elapsed, state)
+            _current.reset(token)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Cuenta los comandos de MongoDB por ruta. Motor ejecuta PyMongo en hilos copiando
+    el contexto, así que la petición en curso está disponible en estos callbacks.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event.command_name, event.duration_micros)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event.command_name, event.duration_micros)
+
+    @staticmethod
+    def _record(command: str, duration_micros: int) -> None:
+        state = _current.get()
+        if state is None:
+            registry.background_command(command)
+            return
+        state.db_calls[command] = state.db_calls.get(command, 0) + 1
+        state.db_seconds += duration_micros / 1e6
+
+
+mongo_command_listener = MongoCommandMetrics()
@@ -0,0 +1,37 @@
+import base64
+from datetime import datetime, timedelta, UTC
+from typing import Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no fue generado por encode_cursor."""
+
+
+def encode_cursor(created_at: datetime, doc_id: ObjectId) -> str:
+    """
+    Cursor opaco para paginación por clave (keyset) sobre (created_at, _id).
+    MongoDB guarda fechas con precisión de milisegundos, así que el cursor también.
+    """
+    if created_at.tzinfo is None:
+        # Beanie/Motor devuelven fechas naive en UTC
+        created_at = created_at.replace(tzinfo=UTC)
+    millis = (created_at - EPOCH) // timedelta(milliseconds=1)
+    raw = f"{millis}:{doc_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Inverso de encode_cursor. Lanza InvalidCursorError si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        millis, doc_id = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":")
+        return EPOCH + timedelta(milliseconds=int(millis)), ObjectId(doc_id)
+    except (ValueError, UnicodeError, InvalidId) as e:
+        raise InvalidCursorError("Cursor inválido") from e
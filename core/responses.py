@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+# Respuestas con ETag: el cliente puede guardarlas pero debe revalidarlas (If-None-Match)
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Respuesta JSON serializada con orjson. Al devolverla directamente desde un endpoint,
+    FastAPI no vuelve a validar el contenido contra el response_model.
+    Acepta ObjectId como str, datetime (UTC con sufijo "Z", igual que Pydantic) y Enum.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_UTC_Z)
+
+
+def etag_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """304 sin cuerpo: el cliente ya tiene la versión actual (su If-None-Match coincide)."""
+    return Response(status_code=304, headers=etag_headers(etag))
@@ -0,0 +1,16 @@
+from core.cache import TTLCache
+from core.config import settings
+
+# Usuarios autenticados por username (evita un User.find_one por petición)
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+# Tokens JWT ya decodificados -> username (cada entrada expira junto con el claim 'exp')
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+def invalidate_user(username: str) -> None:
+    """
+    Descarta el usuario cacheado. Se llama desde los hooks de User al guardar,
+    actualizar o eliminar; los cambios hechos fuera de Beanie esperan al TTL.
+    """
+    user_cache.pop(username)
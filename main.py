@@ -1,13 +1,71 @@
+import time
+_IMPORT_START = time.perf_counter()  # para medir el tiempo de importación de la aplicación
+
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
-from core.database import initiate_database       # Función que inicializa Beanie
+from core.database import initiate_database, close_database  # Beanie + pool de Motor
+from core.auth import shutdown_hash_executor       # Pool de hashing de contraseñas
+from services.print_time_model import (            # Modelo de tiempo de impresión
+    load_print_time_model, start_print_time_training, stop_print_time_training,
+)
+from services.repricing import start_repricing_job, stop_repricing_job  # Re-cotización de resúmenes obsoletos
 from api.auth import router as auth_router         # Router de /auth
 from api.quotes import router as quotes_router     # Router de CRUD de cotizaciones
 from api.quote_optimization import router as optimization_router  # Router de optimización
+from api.batch_pricing import router as batch_pricing_router  # Router de cotización por lotes
+from api.quote_analytics import router as analytics_router  # Router de estadísticas de costo
+from api.quote_sensitivity import router as sensitivity_router  # Router de análisis de sensibilidad
+from api.print_schedule import router as schedule_router  # Router de planificación de la granja
+from api.repricing import router as repricing_router  # Router de la re-cotización en segundo plano
+from api.catalog import router as catalog_router   # Router del catálogo de impresoras y filamentos
+from api.metrics import router as metrics_router   # Router de /metrics
+from core.metrics import MetricsMiddleware         # Tiempos por ruta y etapa
+from core.compression import CompressionMiddleware # gzip / brotli
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    # Pool de MongoDB calentado y Beanie inicializado antes de aceptar tráfico
+    await initiate_database()
+    # Coeficientes persistidos + reentrenamiento incremental en segundo plano
+    await load_print_time_model()
+    start_print_time_training()
+    # Resúmenes calculados con otra versión de la fórmula o con costos del catálogo ya cambiados
+    start_repricing_job()
+    logger.info(
+        f"Startup completed in {(time.perf_counter() - start) * 1000:.0f} ms "
+        f"(imports {IMPORT_SECONDS * 1000:.0f} ms)"
+    )
+    try:
+        yield
+    finally:
+        await stop_print_time_training()
+        await stop_repricing_job()
+        await close_database()
+        # Cierra el pool usado para bcrypt
+        shutdown_hash_executor()
+
+
+app = FastAPI(title="3D Quotes API", lifespan=lifespan)
 
-app = FastAPI(title="3D Quotes API")
+# Compresión de respuestas grandes (la más interna: comprime el cuerpo ya generado)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
 
 # ───────────────────────────────────────────────────────────────────────
 # Configurar CORS para permitir peticiones desde el frontend
@@ -22,19 +80,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # GET, POST, PUT, DELETE, OPTIONS, etc.
     allow_headers=["*"],    # Authorization, Content-Type, etc.
+    expose_headers=["ETag"],  # el frontend lo reenvía en If-None-Match / If-Match
 )
 # ───────────────────────────────────────────────────────────────────────
 
-@app.on_event("startup")
-async def on_startup():
-    # Inicializa la base de datos (incluye Quote y User)
-    await initiate_database()
+# Métricas de latencia (se agrega al final para medir también CORS)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # Registrar rutas de autenticación
 app.include_router(auth_router, prefix="/auth")
 
+# Registrar rutas de estadísticas (antes que las de cotizaciones, por las rutas /{quote_id})
+app.include_router(analytics_router)
+
+# Registrar ruta de optimización de cotizaciones (antes que las de cotizaciones,
+# por GET /api/quotes/{quote_id}: /optimize y /*/stats son rutas fijas)
+app.include_router(optimization_router)
+
 # Registrar rutas de cotizaciones
 app.include_router(quotes_router)
 
-# Registrar ruta de optimización de cotizaciones
-app.include_router(optimization_router)
+# Registrar ruta de análisis de sensibilidad
+app.include_router(sensitivity_router)
+
+# Registrar ruta de cotización por lotes
+app.include_router(batch_pricing_router)
+
+# Registrar ruta de planificación de la granja de impresión
+app.include_router(schedule_router)
+
+# Registrar rutas de la re-cotización
+app.include_router(repricing_router)
+
+# Registrar rutas del catálogo de impresoras y filamentos
+app.include_router(catalog_router)
+
+# Registrar ruta de métricas (formato Prometheus)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
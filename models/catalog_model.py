@@ -0,0 +1,87 @@
+from beanie import Document
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, UTC
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+
+from models.enums.filament_enums import FilamentType, FilamentColor, FilamentDiameter
+from models.enums.printer_enums import PrinterType, NozzleSize
+
+# Campos que solo se guardan en el catálogo: una cotización que referencia una entrada
+# no los repite (se resuelven al leer) y el PATCH no los acepta. Los costos (watts,
+# hourly_cost, price_per_kg) sí se copian en la cotización, porque su resumen se calculó
+# con esos valores (la re-cotización y el PATCH los leen del documento); type y nozzle
+# también, porque las estadísticas, el planificador y el modelo de tiempo de impresión
+# los leen directamente de las cotizaciones. El ahorro es pequeño: ~73 de ~970 bytes
+# BSON por cotización (7.5 %); no copiar tampoco costos, type y nozzle llegaría a ~175 (18 %).
+PRINTER_CATALOG_ONLY = ("name",)
+FILAMENT_CATALOG_ONLY = ("name", "color", "diameter")
+
+# Campos de costo: al cambiar en una entrada se propagan a las cotizaciones que la referencian
+# (y que conservaban el valor anterior) y sus resúmenes se recalculan en segundo plano
+PRINTER_COST_FIELDS = ("watts", "hourly_cost")
+FILAMENT_COST_FIELDS = ("price_per_kg",)
+
+
+# Especificaciones fijas de una impresora (sin los ajustes de cada trabajo)
+class PrinterSpecs(BaseModel):
+    name: str = Field(..., min_length=2, max_length=30, description="Nombre de la impresora")
+    watts: float = Field(..., gt=0, description="Consumo eléctrico en watts")
+    type: PrinterType = Field(..., description="Tipo de impresora 3D")
+    nozzle: NozzleSize = Field(..., description="Diametro de boquilla")
+    hourly_cost: float = Field(..., ge=1, le=500, description="Costo por hora de uso de impresora")
+
+    @field_validator("name")
+    def name_must_be_alphanumeric_or_spaces(v):
+        if not v.replace(" ", "").isalnum():
+            raise ValueError("El nombre debe contener solo letras, números y espacios")
+        return v
+
+
+# Especificaciones fijas de un filamento (sin el peso de cada trabajo)
+class FilamentSpecs(BaseModel):
+    name: str = Field(..., min_length=2, max_length=40, description="Nombre del filamento")
+    type: FilamentType = Field(..., description="Tipo de filamento")
+    color: FilamentColor = Field(..., description="Color del filamento")
+    diameter: FilamentDiameter = Field(..., description="Diametro del filamento")
+    price_per_kg: float = Field(..., gt=1, le=100, description="Precio por kilogramo en rango realista")
+
+    @field_validator("name")
+    def name_must_be_text(v):
+        if not v.replace(" ", "").isalpha():
+            raise ValueError("El nombre debe contener solo letras y espacios")
+        return v
+
+
+# Impresora del catálogo del usuario
+class PrinterCatalog(Document, PrinterSpecs):
+    user_id: ObjectId = Field(..., description="ID del usuario dueño de la entrada")
+    version: int = Field(1, ge=1, description="Se incrementa en cada modificación")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        name = "printers"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING)], name="user_id_name"),
+        ]
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+# Filamento del catálogo del usuario
+class FilamentCatalog(Document, FilamentSpecs):
+    user_id: ObjectId = Field(..., description="ID del usuario dueño de la entrada")
+    version: int = Field(1, ge=1, description="Se incrementa en cada modificación")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        name = "filaments"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING)], name="user_id_name"),
+        ]
+
+    class Config:
+        arbitrary_types_allowed = True
@@ -0,0 +1,32 @@
+from beanie import Document
+from pydantic import Field
+from typing import List, Optional
+from datetime import datetime, UTC
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+
+
+# Modelo de regresión entrenado sobre las cotizaciones guardadas.
+# Se persisten los coeficientes y las estadísticas suficientes (XᵀX, Xᵀy, yᵀy)
+# para poder reentrenar de forma incremental solo con las cotizaciones nuevas.
+class PrintTimeModel(Document):
+    name: str = Field(..., description="Nombre del modelo (uno por documento)")
+    features: List[str] = Field(..., description="Columnas de X, sin el intercepto")
+    coefficients: Optional[List[float]] = Field(None, description="Intercepto + un coeficiente por columna")
+    xtx: List[List[float]] = Field(..., description="Acumulado de XᵀX (con columna de unos)")
+    xty: List[float] = Field(..., description="Acumulado de Xᵀy")
+    yty: float = Field(0.0, description="Acumulado de yᵀy")
+    n_samples: int = Field(0, ge=0, description="Cotizaciones usadas en el entrenamiento")
+    last_quote_id: Optional[ObjectId] = Field(None, description="Última cotización procesada (_id)")
+    rmse_log: Optional[float] = Field(None, description="RMSE de entrenamiento en escala logarítmica")
+    revision: int = Field(0, ge=0, description="Se incrementa en cada reentrenamiento")
+    trained_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        name = "ml_models"
+        indexes = [
+            IndexModel([("name", ASCENDING)], name="name_unique", unique=True),
+        ]
+
+    class Config:
+        arbitrary_types_allowed = True  # Para permitir el uso de ObjectId
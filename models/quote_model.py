@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional
 from datetime import datetime, UTC
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 
 from models.enums.filament_enums import FilamentType, FilamentColor, FilamentDiameter
@@ -98,17 +99,40 @@ class Summary(BaseModel):
 class Quote(Document):
     user_id: ObjectId = Field(..., description="ID del usuario que creó la cotización")
     quote_name: str = Field(..., min_length=3, max_length=60, description="Nombre de la cotización")
+    printer_id: Optional[ObjectId] = Field(None, description="Impresora del catálogo (si la cotización la referencia)")
+    filament_id: Optional[ObjectId] = Field(None, description="Filamento del catálogo (si la cotización lo referencia)")
     printer: Printer
     filament: Filament
     energy: Energy
     model: ModelData
     commercial: Commercial
     summary: Summary
+    input_hash: Optional[str] = Field(None, description="Hash de las secciones de entrada (cotizaciones idénticas)")
+    pricing_version: int = Field(0, description="Versión de la fórmula con la que se calculó el summary (0 = pendiente, -N = la versión N no pudo calcularlo)")
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
     class Settings:
         name = "quotes"  # Nombre de la colección en MongoDB
+        indexes = [
+            # Listado y paginación por usuario: filtro user_id + orden (created_at, _id)
+            IndexModel(
+                [("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+                name="user_id_created_at",
+            ),
+            # ETag del listado: última escritura (updated_at) y conteo por usuario
+            IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_id_updated_at"),
+            # Cotizaciones idénticas del usuario (mismas entradas)
+            IndexModel(
+                [("user_id", ASCENDING), ("input_hash", ASCENDING), ("_id", ASCENDING)],
+                name="user_id_input_hash",
+            ),
+            # Re-cotización: cotizaciones con otra versión de la fórmula, en orden de _id
+            IndexModel([("pricing_version", ASCENDING), ("_id", ASCENDING)], name="pricing_version_id"),
+            # Entradas del catálogo en uso (solo indexa las cotizaciones que las referencian)
+            IndexModel([("printer_id", ASCENDING)], name="printer_id", sparse=True),
+            IndexModel([("filament_id", ASCENDING)], name="filament_id", sparse=True),
+        ]
 
     class Config:
         arbitrary_types_allowed = True  # Para permitir el uso de ObjectId
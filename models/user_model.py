@@ -1,7 +1,10 @@
 from datetime import datetime
 
-from beanie import Document
+from beanie import Document, after_event, Delete, Replace, Save, SaveChanges, Update
 from pydantic import Field, EmailStr
+from pymongo import ASCENDING, IndexModel
+
+from core.user_cache import invalidate_user
 
 
 class User(Document):
@@ -13,12 +16,10 @@ class User(Document):
         ...,
         min_length=3,
         max_length=30,
-        unique=True,
         description="Nombre de usuario único (3–30 caracteres)"
     )
     email: EmailStr = Field(
         ...,
-        unique=True,
         description="Correo electrónico único"
     )
     hashed_password: str = Field(
@@ -38,8 +39,18 @@ class User(Document):
         description="Fecha de creación"
     )
 
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    def invalidate_cached_user(self):
+        # Cualquier cambio (p.ej. desactivar la cuenta) debe verse en la siguiente petición
+        invalidate_user(self.username)
+
     class Settings:
         name = "users"  # Nombre de la colección en MongoDB
+        indexes = [
+            # La unicidad se garantiza con índices (un kwarg unique=True en Field no crea nada)
+            IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        ]
 
     class Config:
         json_schema_extra = {
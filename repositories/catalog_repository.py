@@ -0,0 +1,138 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from beanie import Document
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+from models.quote_model import Quote
+
+# Colección con la versión global del catálogo: se incrementa en cada escritura
+# para que los demás procesos descarten su caché
+CATALOG_META_COLLECTION = "catalog_meta"
+CATALOG_VERSION_ID = "version"
+
+# Cola de costos del catálogo modificados, pendientes de copiar a las cotizaciones
+# (la vacía por lotes la re-cotización en segundo plano, en orden de _id)
+COST_CHANGES_COLLECTION = "catalog_cost_changes"
+
+
+def _meta_collection():
+    return Quote.get_motor_collection().database[CATALOG_META_COLLECTION]
+
+
+def _cost_changes_collection():
+    return Quote.get_motor_collection().database[COST_CHANGES_COLLECTION]
+
+
+async def get_catalog_version() -> int:
+    doc = await _meta_collection().find_one({"_id": CATALOG_VERSION_ID})
+    return doc["version"] if doc else 0
+
+
+async def bump_catalog_version() -> int:
+    doc = await _meta_collection().find_one_and_update(
+        {"_id": CATALOG_VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc["version"]
+
+
+# Entradas por id (sin filtrar por usuario): para resolver referencias en lote
+async def find_entries_by_ids(model: Type[Document], ids: Iterable[ObjectId]) -> List[dict]:
+    ids = list(ids)
+    if not ids:
+        return []
+    cursor = model.get_motor_collection().find({"_id": {"$in": ids}})
+    return await cursor.to_list(length=len(ids))
+
+
+async def find_user_entries(model: Type[Document], user_id: ObjectId) -> List[dict]:
+    cursor = model.get_motor_collection().find({"user_id": user_id}).sort("name", ASCENDING)
+    return await cursor.to_list(length=None)
+
+
+async def insert_entry(model: Type[Document], document: Dict[str, Any]) -> ObjectId:
+    result = await model.get_motor_collection().insert_one(document)
+    return result.inserted_id
+
+
+# Modifica una entrada del usuario e incrementa su versión en el mismo find_one_and_update.
+# Retorna el documento ANTERIOR (para comparar los costos sin otra lectura).
+async def update_user_entry(
+    model: Type[Document],
+    entry_id: ObjectId,
+    user_id: ObjectId,
+    fields: Dict[str, Any],
+    updated_at: datetime,
+) -> Optional[dict]:
+    return await model.get_motor_collection().find_one_and_update(
+        {"_id": entry_id, "user_id": user_id},
+        {"$set": {**fields, "updated_at": updated_at}, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE,
+    )
+
+
+async def delete_user_entry(model: Type[Document], entry_id: ObjectId, user_id: ObjectId) -> bool:
+    result = await model.get_motor_collection().delete_one({"_id": entry_id, "user_id": user_id})
+    return result.deleted_count > 0
+
+
+# ¿Alguna cotización referencia la entrada? (índice disperso sobre printer_id / filament_id)
+async def entry_in_use(ref_field: str, entry_id: ObjectId) -> bool:
+    count = await Quote.get_motor_collection().count_documents({ref_field: entry_id}, limit=1)
+    return count > 0
+
+
+# Cambio de un campo de costo de una entrada: el nuevo valor se copia en las cotizaciones
+# que la referencian y seguían con el valor anterior (las que lo cambiaron a mano lo conservan)
+async def enqueue_cost_change(
+    ref_field: str,
+    entry_id: ObjectId,
+    path: str,
+    old_value: Any,
+    new_value: Any,
+    created_at: datetime,
+) -> None:
+    await _cost_changes_collection().insert_one({
+        "ref_field": ref_field,
+        "entry_id": entry_id,
+        "path": path,
+        "old_value": old_value,
+        "new_value": new_value,
+        "created_at": created_at,
+    })
+
+
+async def next_cost_change() -> Optional[dict]:
+    return await _cost_changes_collection().find_one({}, sort=[("_id", ASCENDING)])
+
+
+async def count_cost_changes() -> int:
+    return await _cost_changes_collection().count_documents({})
+
+
+async def delete_cost_change(change_id: ObjectId) -> None:
+    await _cost_changes_collection().delete_one({"_id": change_id})
+
+
+# Siguiente lote de cotizaciones afectadas por el cambio (índice disperso sobre printer_id / filament_id)
+async def find_cost_change_targets(change: dict, limit: int) -> List[ObjectId]:
+    cursor = (
+        Quote.get_motor_collection()
+        .find({change["ref_field"]: change["entry_id"], change["path"]: change["old_value"]}, {"_id": 1})
+        .limit(limit)
+    )
+    return [doc["_id"] for doc in await cursor.to_list(length=limit)]
+
+
+# Aplica el cambio al lote; quedan con pricing_version 0 para que la re-cotización recalcule su summary
+async def apply_cost_change(change: dict, ids: List[ObjectId], updated_at: datetime) -> int:
+    path = change["path"]
+    result = await Quote.get_motor_collection().update_many(
+        {"_id": {"$in": ids}, path: change["old_value"]},
+        {"$set": {path: change["new_value"], "pricing_version": 0, "input_hash": None, "updated_at": updated_at}},
+    )
+    return result.modified_count
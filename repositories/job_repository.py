@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from models.quote_model import Quote
+
+# Estado de los trabajos en segundo plano (un documento por trabajo): progreso para
+# reanudarlos y un lease para que solo un proceso los ejecute a la vez
+JOBS_COLLECTION = "background_jobs"
+
+
+def _jobs_collection():
+    return Quote.get_motor_collection().database[JOBS_COLLECTION]
+
+
+async def get_job_state(job_id: str) -> Optional[dict]:
+    return await _jobs_collection().find_one({"_id": job_id})
+
+
+# Toma el lease si está libre, vencido o ya es de 'owner'. Retorna el estado guardado
+# (con el progreso de la ejecución anterior) o None si otro proceso lo tiene.
+async def acquire_job_lease(job_id: str, owner: str, now: datetime, lease_until: datetime) -> Optional[dict]:
+    try:
+        return await _jobs_collection().find_one_and_update(
+            {
+                "_id": job_id,
+                "$or": [{"owner": owner}, {"lease_until": None}, {"lease_until": {"$lt": now}}],
+            },
+            {"$set": {"owner": owner, "lease_until": lease_until}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # El documento existe y el filtro no coincidió: el lease es de otro proceso
+        return None
+
+
+# Guarda el progreso y renueva el lease; False si el lease ya no es de 'owner'
+async def save_job_progress(job_id: str, owner: str, fields: Dict[str, Any], lease_until: datetime) -> bool:
+    result = await _jobs_collection().update_one(
+        {"_id": job_id, "owner": owner},
+        {"$set": {**fields, "lease_until": lease_until}},
+    )
+    return result.matched_count > 0
+
+
+async def release_job_lease(job_id: str, owner: str, fields: Dict[str, Any]) -> None:
+    await _jobs_collection().update_one(
+        {"_id": job_id, "owner": owner},
+        {"$set": {**fields, "owner": None, "lease_until": None}},
+    )
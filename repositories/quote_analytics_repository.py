@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from models.quote_model import Quote
+
+# Límites por defecto de los histogramas ($bucket exige límites ascendentes)
+DEFAULT_COST_BOUNDARIES = [0, 10, 25, 50, 100, 250, 500, 1000]
+WASTE_BOUNDARIES = [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 101]  # 101 para incluir el 100 %
+
+
+def _group_stats(key: Any) -> Dict[str, Any]:
+    return {
+        "_id": key,
+        "count": {"$sum": 1},
+        "total_cost": {"$sum": "$summary.estimated_total_cost"},
+        "avg_cost": {"$avg": "$summary.estimated_total_cost"},
+        "grams_used": {"$sum": "$summary.grams_used"},
+        "grams_wasted": {"$sum": "$summary.grams_wasted"},
+        "avg_waste_percentage": {"$avg": "$summary.waste_percentage"},
+    }
+
+
+# Redondeo de las métricas ya agregadas (dentro de MongoDB)
+_ROUNDED = {
+    "_id": 0,
+    "key": "$_id",
+    "count": 1,
+    "total_cost": {"$round": ["$total_cost", 2]},
+    "avg_cost": {"$round": ["$avg_cost", 2]},
+    "grams_used": {"$round": ["$grams_used", 2]},
+    "grams_wasted": {"$round": ["$grams_wasted", 2]},
+    "avg_waste_percentage": {"$round": ["$avg_waste_percentage", 2]},
+}
+
+
+def build_analytics_pipeline(
+    user_id: ObjectId,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cost_boundaries: Optional[List[float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Un solo pipeline: $match por usuario (y rango de fechas, usando el índice user_id/created_at)
+    y un $facet con todas las agrupaciones, para que solo viajen resultados agregados.
+    """
+    match: Dict[str, Any] = {"user_id": user_id}
+    if date_from or date_to:
+        match["created_at"] = {}
+        if date_from:
+            match["created_at"]["$gte"] = date_from
+        if date_to:
+            match["created_at"]["$lt"] = date_to
+
+    return [
+        {"$match": match},
+        {"$facet": {
+            "totals": [
+                {"$group": _group_stats(None)},
+                {"$project": _ROUNDED},
+            ],
+            "by_filament_type": [
+                {"$group": _group_stats("$filament.type")},
+                {"$project": _ROUNDED},
+                {"$sort": {"total_cost": -1}},
+            ],
+            "by_printer_type": [
+                {"$group": _group_stats("$printer.type")},
+                {"$project": _ROUNDED},
+                {"$sort": {"total_cost": -1}},
+            ],
+            "by_month": [
+                {"$group": _group_stats({"$dateToString": {"format": "%Y-%m", "date": "$created_at"}})},
+                {"$project": _ROUNDED},
+                {"$sort": {"key": 1}},
+            ],
+            "cost_histogram": [
+                {"$bucket": {
+                    "groupBy": "$summary.estimated_total_cost",
+                    "boundaries": cost_boundaries or DEFAULT_COST_BOUNDARIES,
+                    "default": "other",
+                    "output": {"count": {"$sum": 1}, "total_cost": {"$sum": "$summary.estimated_total_cost"}},
+                }},
+                {"$project": {"_id": 0, "min": "$_id", "count": 1, "total_cost": {"$round": ["$total_cost", 2]}}},
+            ],
+            "waste_histogram": [
+                {"$bucket": {
+                    "groupBy": "$summary.waste_percentage",
+                    "boundaries": WASTE_BOUNDARIES,
+                    "default": "other",
+                    "output": {"count": {"$sum": 1}, "grams_wasted": {"$sum": "$summary.grams_wasted"}},
+                }},
+                {"$project": {"_id": 0, "min": "$_id", "count": 1, "grams_wasted": {"$round": ["$grams_wasted", 2]}}},
+            ],
+        }},
+    ]
+
+
+async def aggregate_quote_analytics(
+    user_id: ObjectId,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cost_boundaries: Optional[List[float]] = None,
+) -> Dict[str, Any]:
+    pipeline = build_analytics_pipeline(user_id, date_from, date_to, cost_boundaries)
+    cursor = Quote.get_motor_collection().aggregate(pipeline, allowDiskUse=True)
+    result = await cursor.to_list(length=1)
+    facets = result[0] if result else {}
+    totals = facets.get("totals") or [{"count": 0, "total_cost": 0.0}]
+    facets["totals"] = totals[0]
+    facets["totals"].pop("key", None)
+    return facets
@@ -1,4 +1,7 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 from models.quote_model import Quote
 from schemas.quote_schema import QuoteCreateSchema, QuoteUpdateSchema
 from bson import ObjectId
@@ -29,25 +32,324 @@ async def get_quotes_by_user(user_id: ObjectId) -> List[Quote]:
     return await Quote.find(Quote.user_id == user_id).to_list()
 
 
+# Obtener una página de cotizaciones de un usuario, ordenada por (created_at, _id).
+# Paginación por clave: 'after' es el (created_at, _id) del último elemento de la página anterior.
+# Se pide un documento extra para saber si existe una página siguiente.
+# Devuelve documentos crudos (dict) para serializarlos sin construir modelos Beanie.
+async def get_quotes_page(
+    user_id: ObjectId,
+    limit: int,
+    after: Optional[Tuple[datetime, ObjectId]] = None
+) -> List[dict]:
+    query = {"user_id": user_id}
+    if after is not None:
+        created_at, last_id = after
+        query["$or"] = [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "_id": {"$gt": last_id}},
+        ]
+    cursor = (
+        Quote.get_motor_collection()
+        .find(query)
+        .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+        .limit(limit + 1)
+    )
+    return await cursor.to_list(length=limit + 1)
+
+
+# Cursor de Motor sobre los documentos crudos de un usuario (sin construir modelos Beanie),
+# para recorrer colecciones grandes en lotes con memoria constante
+def iter_quote_documents(user_id: ObjectId, batch_size: int = 500):
+    return (
+        Quote.get_motor_collection()
+        .find({"user_id": user_id}, {"revision_id": 0})
+        .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+        .batch_size(batch_size)
+    )
+
+
+# Cursor sobre los campos que usa la optimización (generate_optimization / evaluate_parameters),
+# en el mismo orden que el listado
+OPTIMIZATION_PROJECTION = {
+    "_id": 1,
+    "quote_name": 1,
+    "printer.speed": 1,
+    "printer.nozzle": 1,
+    "printer.watts": 1,
+    "printer.hourly_cost": 1,
+    "filament.price_per_kg": 1,
+    "energy.kwh_cost": 1,
+    "model.layer_height": 1,
+    "model.infill": 1,
+    "model.support_weight": 1,
+    "model.model_weight": 1,
+    "model.print_time": 1,
+}
+
+def iter_optimization_documents(user_id: ObjectId, batch_size: int = 1000):
+    return (
+        Quote.get_motor_collection()
+        .find({"user_id": user_id}, OPTIMIZATION_PROJECTION)
+        .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+        .batch_size(batch_size)
+    )
+
+
+# Cotizaciones a planificar en la granja de impresión (solo los campos que usa el planificador).
+# Con 'quote_ids' se limita a esas cotizaciones del usuario; sin ellas, todas (hasta 'limit').
+SCHEDULE_PROJECTION = {
+    "_id": 1,
+    "quote_name": 1,
+    "printer.type": 1,
+    "printer.nozzle": 1,
+    "model.print_time": 1,
+    "energy.kwh_cost": 1,
+}
+
+def _schedule_query(user_id: ObjectId, quote_ids: Optional[List[ObjectId]]) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"user_id": user_id}
+    if quote_ids is not None:
+        query["_id"] = {"$in": quote_ids}
+    return query
+
+
+async def find_schedule_documents(
+    user_id: ObjectId,
+    quote_ids: Optional[List[ObjectId]] = None,
+    limit: int = 20000,
+) -> List[dict]:
+    cursor = (
+        Quote.get_motor_collection()
+        .find(_schedule_query(user_id, quote_ids), SCHEDULE_PROJECTION)
+        .sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit)
+
+
+async def count_schedule_documents(user_id: ObjectId, quote_ids: Optional[List[ObjectId]] = None) -> int:
+    return await Quote.get_motor_collection().count_documents(_schedule_query(user_id, quote_ids))
+
+
+# Cursor sobre los campos que usa el modelo de tiempo de impresión, en orden de _id,
+# empezando después de 'after_id' (marca de agua del último entrenamiento)
+TRAINING_PROJECTION = {
+    "_id": 1,
+    "printer.speed": 1,
+    "printer.nozzle": 1,
+    "model.layer_height": 1,
+    "model.infill": 1,
+    "model.support_weight": 1,
+    "model.model_weight": 1,
+    "model.print_time": 1,
+}
+
+def iter_training_documents(after_id: Optional[ObjectId] = None, batch_size: int = 5000):
+    query = {"_id": {"$gt": after_id}} if after_id is not None else {}
+    return (
+        Quote.get_motor_collection()
+        .find(query, TRAINING_PROJECTION)
+        .sort("_id", ASCENDING)
+        .batch_size(batch_size)
+    )
+
+
 # Actualizar una cotización
 async def update_quote(quote_id: str, data: QuoteUpdateSchema) -> Optional[Quote]:
     oid = ObjectId(quote_id)
-    # find_one_and_update retorna el documento antiguo o el nuevo, según configuración
-    updated = await Quote.find_one_and_update(
+    # Solo las secciones enviadas (sin None) y el documento ya actualizado
+    updated = await Quote.get_motor_collection().find_one_and_update(
         {"_id": oid},
-        {"$set": data.dict()},
-        return_document=True  # si usas Motor directamente. En Beanie usa `set_only=True, fetch_new=True` o el método correspondiente
+        {"$set": data.model_dump(exclude_none=True, mode="json")},
+        return_document=ReturnDocument.AFTER
+    )
+    return Quote.model_validate(updated) if updated else None
+
+
+# Insertar documentos ya armados (ver quote_to_document): las cotizaciones que referencian
+# el catálogo se guardan sin los campos que solo guarda el catálogo, y sin referencias nulas
+async def insert_quote_document(document: Dict[str, Any]) -> ObjectId:
+    result = await Quote.get_motor_collection().insert_one(document)
+    return result.inserted_id
+
+
+async def insert_quote_documents(documents: List[Dict[str, Any]], ordered: bool = False) -> List[ObjectId]:
+    result = await Quote.get_motor_collection().insert_many(documents, ordered=ordered)
+    return result.inserted_ids
+
+
+# Fecha de la última escritura y cantidad de cotizaciones del usuario (ETag del listado):
+# ambas se resuelven solo con el índice user_id_updated_at
+async def get_quotes_version(user_id: ObjectId) -> Tuple[Optional[datetime], int]:
+    collection = Quote.get_motor_collection()
+    latest, count = await asyncio.gather(
+        collection.find_one(
+            {"user_id": user_id}, {"_id": 0, "updated_at": 1}, sort=[("updated_at", DESCENDING)]
+        ),
+        collection.count_documents({"user_id": user_id}),
+    )
+    return (latest["updated_at"] if latest else None), count
+
+
+# Re-cotización: cotizaciones cuyo summary se calculó con otra versión de la fórmula
+# (o quedó pendiente). Se recorren de a una versión vieja por vez, en orden de _id a partir
+# de 'after_id': la igualdad sobre pricing_version deja el orden por _id en el índice
+# pricing_version_id (sin SORT en memoria). Solo las entradas del resumen. Las que no se pudieron recalcular con la versión actual quedan con -pricing_version y no se
+# vuelven a leer hasta que el usuario las edita, cambia el catálogo o sube la versión.
+REPRICING_PROJECTION = {
+    "_id": 1,
+    "updated_at": 1,
+    "summary": 1,
+    "filament.price_per_kg": 1,
+    "printer.watts": 1,
+    "printer.hourly_cost": 1,
+    "energy.kwh_cost": 1,
+    "model.model_weight": 1,
+    "model.support_weight": 1,
+    "model.print_time": 1,
+    "commercial.labor": 1,
+    "commercial.post_processing": 1,
+    "commercial.margin": 1,
+    "commercial.taxes": 1,
+}
+
+def _stale_versions_query(pricing_version: int) -> Dict[str, Any]:
+    return {"pricing_version": {"$nin": [pricing_version, -pricing_version]}}
+
+def stale_pricing_query(stale_version: int, after_id: Optional[ObjectId] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"pricing_version": stale_version}
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    return query
+
+# Versiones viejas presentes (DISTINCT_SCAN sobre el índice: una clave por versión), ascendentes
+async def find_stale_pricing_versions(pricing_version: int) -> List[int]:
+    versions = await Quote.get_motor_collection().distinct("pricing_version", _stale_versions_query(pricing_version))
+    return sorted(versions)
+
+async def find_stale_pricing_documents(stale_version: int, after_id: Optional[ObjectId], limit: int) -> List[dict]:
+    cursor = (
+        Quote.get_motor_collection()
+        .find(stale_pricing_query(stale_version, after_id), REPRICING_PROJECTION)
+        .sort("_id", ASCENDING)
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit)
+
+async def count_stale_pricing(pricing_version: int) -> int:
+    # Conteo sin orden: COUNT_SCAN sobre los rangos del índice
+    return await Quote.get_motor_collection().count_documents(_stale_versions_query(pricing_version))
+
+async def count_failed_pricing(pricing_version: int) -> int:
+    return await Quote.get_motor_collection().count_documents({"pricing_version": -pricing_version})
+
+# Entradas y resumen de las cotizaciones ya calculadas con 'pricing_version' (datos del modelo de costo)
+def iter_priced_documents(pricing_version: int, batch_size: int = 5000):
+    return (
+        Quote.get_motor_collection()
+        .find({"pricing_version": pricing_version}, REPRICING_PROJECTION)
+        .sort("_id", ASCENDING)
+        .batch_size(batch_size)
+    )
+
+# Escrituras por lotes (un viaje por lote); retorna cuántas operaciones encontraron su documento
+async def bulk_update_quotes(operations: List[UpdateOne]) -> int:
+    if not operations:
+        return 0
+    result = await Quote.get_motor_collection().bulk_write(operations, ordered=False)
+    return result.matched_count
+
+
+# Operaciones de una cotización acotadas a su propietario: _id + user_id en el mismo filtro.
+# Un solo viaje a MongoDB (resuelto por el índice de _id); si no es del usuario, no coincide.
+# Devuelve el documento crudo: las referencias al catálogo se resuelven antes de construir Quote.
+async def get_owned_quote(quote_id: ObjectId, user_id: ObjectId) -> Optional[dict]:
+    return await Quote.get_motor_collection().find_one(
+        {"_id": quote_id, "user_id": user_id}, {"revision_id": 0}
+    )
+
+
+# Aplica 'update' (documento o pipeline) y devuelve el documento crudo actualizado,
+# o None si no existe, no es del usuario, su updated_at no está en 'expected_updated_at'
+# o referencia al catálogo por alguno de los campos de 'unreferenced'.
+async def update_owned_quote(
+    quote_id: ObjectId,
+    user_id: ObjectId,
+    update: Any,
+    expected_updated_at: Optional[List[datetime]] = None,
+    unreferenced: Iterable[str] = (),
+) -> Optional[dict]:
+    query: Dict[str, Any] = {"_id": quote_id, "user_id": user_id}
+    if expected_updated_at is not None:
+        query["updated_at"] = {"$in": expected_updated_at}
+    for ref_field in unreferenced:
+        query[ref_field] = None
+    return await Quote.get_motor_collection().find_one_and_update(
+        query, update, projection={"revision_id": 0}, return_document=ReturnDocument.AFTER
+    )
+
+
+# input_hash de una cotización del usuario: None si no existe o no es suya, "" si no tiene hash
+async def get_owned_input_hash(quote_id: ObjectId, user_id: ObjectId) -> Optional[str]:
+    doc = await Quote.get_motor_collection().find_one(
+        {"_id": quote_id, "user_id": user_id}, {"input_hash": 1}
+    )
+    if doc is None:
+        return None
+    return doc.get("input_hash") or ""
+
+
+# Cotizaciones del usuario con las mismas entradas (índice user_id_input_hash), las más recientes primero
+async def find_quotes_by_input_hash(
+    user_id: ObjectId,
+    input_hash: str,
+    exclude_id: Optional[ObjectId] = None,
+    limit: int = 50,
+) -> List[dict]:
+    query: Dict[str, Any] = {"user_id": user_id, "input_hash": input_hash}
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}
+    cursor = (
+        Quote.get_motor_collection()
+        .find(query, {"revision_id": 0})
+        .sort("_id", DESCENDING)
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit)
+
+
+# Eliminar cotización (solo si es del usuario)
+async def delete_owned_quote(quote_id: ObjectId, user_id: ObjectId) -> bool:
+    result = await Quote.get_motor_collection().delete_one({"_id": quote_id, "user_id": user_id})
+    return result.deleted_count > 0
+
+
+# ¿Existe la cotización y pertenece al usuario? (para distinguir 404 de 412 tras un PATCH fallido)
+async def owned_quote_exists(quote_id: ObjectId, user_id: ObjectId) -> bool:
+    count = await Quote.get_motor_collection().count_documents(
+        {"_id": quote_id, "user_id": user_id}, limit=1
+    )
+    return count > 0
+
+
+# printer_id / filament_id de una cotización del usuario (None si no existe o no es suya)
+async def get_owned_catalog_refs(quote_id: ObjectId, user_id: ObjectId) -> Optional[dict]:
+    return await Quote.get_motor_collection().find_one(
+        {"_id": quote_id, "user_id": user_id}, {"printer_id": 1, "filament_id": 1}
     )
-    return updated
 
 
-# Eliminar cotización
-async def delete_quote(quote_id: str) -> bool:
-    quote = await Quote.get(ObjectId(quote_id))
-    if not quote:
-        return False
-    await quote.delete()
-    return True
+# Entradas de costo y updated_at de una cotización del usuario (para recalcular el resumen
+# de un PATCH); None si no existe, no es suya o su updated_at no está en 'expected_updated_at'.
+async def get_owned_pricing_inputs(
+    quote_id: ObjectId,
+    user_id: ObjectId,
+    expected_updated_at: Optional[List[datetime]] = None,
+) -> Optional[dict]:
+    query: Dict[str, Any] = {"_id": quote_id, "user_id": user_id}
+    if expected_updated_at is not None:
+        query["updated_at"] = {"$in": expected_updated_at}
+    return await Quote.get_motor_collection().find_one(query, REPRICING_PROJECTION)
 
 
 def calculate_waste_percentage(used: float, total: float) -> float:
@@ -0,0 +1,31 @@
+# backend/schemas/batch_pricing_schema.py
+
+from pydantic import BaseModel, model_validator
+from typing import Dict, List, Optional
+
+# Esquema de entrada para cotizar en lote.
+# Acepta formato columnar ({"columns": {"watts": [...], ...}})
+# o lista de objetos ({"rows": [{"watts": ..., ...}, ...]}), pero no ambos.
+class PriceBatchInputSchema(BaseModel):
+    columns: Optional[Dict[str, List[float]]] = None # columnas con un valor por fila
+    rows: Optional[List[Dict[str, float]]] = None # filas con los mismos nombres de columna
+
+    @model_validator(mode="after")
+    def check_single_format(self) -> "PriceBatchInputSchema":
+        if (self.columns is None) == (self.rows is None):
+            raise ValueError("Debe enviar 'columns' o 'rows' (solo uno de ellos)")
+        return self
+
+# Esquema de salida columnar (misma posición = misma fila de entrada)
+class PriceBatchOutputSchema(BaseModel):
+    count: int # número de filas cotizadas
+    material_cost: List[float]
+    energy_cost: List[float]
+    machine_cost: List[float]
+    extra_cost: List[float] # mano de obra + postprocesado
+    margin_cost: List[float]
+    tax_cost: List[float]
+    estimated_total_cost: List[float]
+    grams_used: List[float]
+    grams_wasted: List[float]
+    waste_percentage: List[float]
@@ -0,0 +1,51 @@
+# backend/schemas/catalog_schema.py
+
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+from models.catalog_model import PrinterSpecs, FilamentSpecs
+from models.enums.filament_enums import FilamentType, FilamentColor, FilamentDiameter
+from models.enums.printer_enums import PrinterType, NozzleSize
+from schemas.quote_patch_schema import partial_model
+
+# Esquemas para crear entradas del catálogo (mismas restricciones que el modelo)
+PrinterCatalogCreateSchema = PrinterSpecs
+FilamentCatalogCreateSchema = FilamentSpecs
+
+# Esquemas para modificar entradas (solo los campos enviados)
+PrinterCatalogPatchSchema = partial_model(PrinterSpecs)
+FilamentCatalogPatchSchema = partial_model(FilamentSpecs)
+
+
+# Esquema para mostrar una impresora del catálogo
+class PrinterCatalogOutSchema(BaseModel):
+    id: str = Field(alias="_id") # id de la entrada
+    user_id: str # dueño de la entrada
+    name: str # nombre de la impresora
+    watts: float # potencia en watts
+    type: PrinterType # tipo de impresora
+    nozzle: NozzleSize # diámetro de la boquilla
+    hourly_cost: float # costo por hora de uso
+    version: int # se incrementa en cada modificación
+    created_at: datetime # fecha de creación
+    updated_at: datetime # fecha de actualización
+
+    class Config:
+        populate_by_name = True
+
+
+# Esquema para mostrar un filamento del catálogo
+class FilamentCatalogOutSchema(BaseModel):
+    id: str = Field(alias="_id") # id de la entrada
+    user_id: str # dueño de la entrada
+    name: str # nombre del filamento
+    type: FilamentType # tipo de filamento
+    color: FilamentColor # color del filamento
+    diameter: FilamentDiameter # diámetro del filamento
+    price_per_kg: float # precio por kilogramo
+    version: int # se incrementa en cada modificación
+    created_at: datetime # fecha de creación
+    updated_at: datetime # fecha de actualización
+
+    class Config:
+        populate_by_name = True
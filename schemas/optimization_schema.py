@@ -1,7 +1,7 @@
 # backend/schemas/optimization_schema.py
 
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, List, Optional
 
 class ModeParameters(BaseModel):
     speed: float
@@ -23,7 +23,17 @@ class OptimizationMode(BaseModel):
     new_parameters: ModeParameters
     results: ModeResults
 
+class ParetoPoint(OptimizationMode):
+    score: float  # puntaje ponderado (0 = mejor)
+
+class ParetoFrontSchema(BaseModel):
+    evaluated: int       # candidatos evaluados en la rejilla
+    front_size: int      # candidatos no dominados
+    recommended: ParetoPoint
+    front: List[ParetoPoint]
+
 class OptimizationOutputSchema(BaseModel):
     fast: OptimizationMode
     economic: OptimizationMode
     balanced: OptimizationMode
+    pareto: Optional[ParetoFrontSchema] = None  # solo si se pide búsqueda en rejilla
@@ -0,0 +1,106 @@
+# backend/schemas/quote_patch_schema.py
+
+import inspect
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel, ConfigDict, Field, create_model, field_validator, model_validator
+from pydantic.fields import FieldInfo
+
+from models.quote_model import Printer, Filament, Energy, ModelData, Commercial
+
+SUPPORT_FIELDS = {"supports", "support_type", "support_weight"}
+
+# Campos que intervienen en calculate_quote_summary: si cambia alguno se recalcula el resumen
+COST_FIELDS = {
+    "printer.watts",
+    "printer.hourly_cost",
+    "filament.price_per_kg",
+    "energy.kwh_cost",
+    "model.model_weight",
+    "model.support_weight",
+    "model.print_time",
+    "commercial.labor",
+    "commercial.post_processing",
+    "commercial.margin",
+    "commercial.taxes",
+}
+
+
+def partial_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Versión parcial de un subdocumento: todos los campos pasan a ser opcionales (por omisión),
+    pero conservan sus restricciones y field_validator, y no aceptan null si el original no lo acepta.
+    No hereda los model_validator, que dependen de campos que pueden no venir en el PATCH.
+    """
+    fields = {
+        name: (info.annotation, FieldInfo.merge_field_infos(info, default=None))
+        for name, info in model.model_fields.items()
+    }
+    validators = {}
+    for name, decorator in model.__pydantic_decorators__.field_validators.items():
+        func = decorator.func
+        if inspect.ismethod(func):
+            # Validadores con 'cls': se vuelven a declarar como classmethod del modelo parcial
+            func = classmethod(func.__func__)
+        validators[name] = field_validator(*decorator.info.fields, mode=decorator.info.mode)(func)
+    return create_model(
+        f"{model.__name__}Patch",
+        __config__=ConfigDict(extra="forbid"),
+        __validators__=validators,
+        **fields,
+    )
+
+
+PrinterPatchSchema = partial_model(Printer)
+FilamentPatchSchema = partial_model(Filament)
+EnergyPatchSchema = partial_model(Energy)
+ModelDataPatchSchema = partial_model(ModelData)
+CommercialPatchSchema = partial_model(Commercial)
+
+
+# Esquema para actualizaciones parciales (PATCH): solo se envían los campos que cambian
+class QuotePatchSchema(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    quote_name: str = Field(None, min_length=3, max_length=60) # nombre de la cotización
+    printer: PrinterPatchSchema = None # campos de impresora a cambiar
+    filament: FilamentPatchSchema = None # campos de filamento a cambiar
+    energy: EnergyPatchSchema = None # campos de energía a cambiar
+    model: ModelDataPatchSchema = None # campos del modelo a cambiar
+    commercial: CommercialPatchSchema = None # campos comerciales a cambiar
+
+    @model_validator(mode="after")
+    def check_patch(self) -> "QuotePatchSchema":
+        if not self.to_set_fields():
+            raise ValueError("Debe enviar al menos un campo a actualizar")
+        model_fields = self.model.model_fields_set if self.model is not None else set()
+        if model_fields & SUPPORT_FIELDS:
+            # Los soportes se validan juntos, igual que en ModelData
+            if "supports" not in model_fields:
+                raise ValueError("Para cambiar los soportes envíe 'supports' junto con 'support_type' y 'support_weight'")
+            ModelData.model_construct(
+                supports=self.model.supports,
+                support_type=self.model.support_type,
+                support_weight=self.model.support_weight,
+            ).check_support_dependencies()
+        return self
+
+    def to_set_fields(self) -> Dict[str, Any]:
+        """
+        Campos enviados como rutas con punto ("printer.speed": 120), listos para $set.
+        Si se desactivan los soportes, también se limpian su tipo y peso.
+        """
+        data = self.model_dump(exclude_unset=True, mode="json")
+        fields: Dict[str, Any] = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                fields.update({f"{key}.{name}": v for name, v in value.items()})
+            else:
+                fields[key] = value
+        if fields.get("model.supports") is False:
+            fields["model.support_type"] = None
+            fields["model.support_weight"] = 0
+        return fields
+
+    def changes_cost(self) -> bool:
+        return any(path in COST_FIELDS for path in self.to_set_fields())
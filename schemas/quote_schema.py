@@ -1,6 +1,6 @@
 from bson import ObjectId
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Union
 from datetime import datetime
 
 from models.enums.filament_enums import FilamentType, FilamentColor, FilamentDiameter
@@ -27,6 +27,17 @@ class FilamentSchema(BaseModel):
     color: FilamentColor # color del filamento
     total_weight: float # peso total disponible
 
+# Ajustes de impresora de un trabajo (el resto sale de la entrada del catálogo, ver printer_id)
+class PrinterJobSchema(BaseModel):
+    speed: float # velocidad de impresión
+    layer: float # altura de capa
+    bed_temperature: float # temperatura de cama
+    hotend_temperature: float # temperatura hotend
+
+# Datos de filamento de un trabajo (el resto sale de la entrada del catálogo, ver filament_id)
+class FilamentJobSchema(BaseModel):
+    total_weight: float # peso total disponible
+
 # Esquema para energía
 class EnergySchema(BaseModel):
     kwh_cost: float # costo por kilovatio-hora
@@ -56,27 +67,47 @@ class SummarySchema(BaseModel):
     waste_percentage: float # porcentaje de desperdicio
     suggestions: Optional[List[str]] = []  # sugerencias opcionales
 
+# Las secciones con solo los ajustes del trabajo requieren la referencia al catálogo
+def validate_catalog_references(data):
+    if isinstance(data.printer, PrinterJobSchema) and not data.printer_id:
+        raise ValueError("Debe enviar printer_id o los datos completos de la impresora")
+    if isinstance(data.filament, FilamentJobSchema) and not data.filament_id:
+        raise ValueError("Debe enviar filament_id o los datos completos del filamento")
+    return data
+
 # Esquema para crear cotizaciones
 class QuoteCreateSchema(BaseModel):
     quote_name: str # nombre de la cotización
-    printer: PrinterSchema # datos de la impresora
-    filament: FilamentSchema # datos del filamento
+    printer_id: Optional[str] = None # impresora del catálogo (opcional)
+    filament_id: Optional[str] = None # filamento del catálogo (opcional)
+    printer: Union[PrinterSchema, PrinterJobSchema] # datos de la impresora (o solo los del trabajo si hay printer_id)
+    filament: Union[FilamentSchema, FilamentJobSchema] # datos del filamento (o solo los del trabajo si hay filament_id)
     energy: EnergySchema # datos de energía
     model: ModelDataSchema # datos del modelo
     commercial: CommercialSchema # datos comerciales
 
+    @model_validator(mode="after")
+    def check_catalog_references(self) -> "QuoteCreateSchema":
+        return validate_catalog_references(self)
+
     class Config:
         from_attributes = True
 
 # Esquema para actualizar cotizaciones (todos los campos son opcionales)
 class QuoteUpdateSchema(BaseModel):
     quote_name: Optional[str] # nombre de la cotización (opcional)
-    printer: Optional[PrinterSchema] # datos de impresora (opcional)
-    filament: Optional[FilamentSchema] # datos del filamento (opcional)
+    printer_id: Optional[str] = None # impresora del catálogo (opcional)
+    filament_id: Optional[str] = None # filamento del catálogo (opcional)
+    printer: Optional[Union[PrinterSchema, PrinterJobSchema]] # datos de impresora (opcional)
+    filament: Optional[Union[FilamentSchema, FilamentJobSchema]] # datos del filamento (opcional)
     energy: Optional[EnergySchema] # datos de energía (opcional)
     model: Optional[ModelDataSchema] # datos del modelo (opcional)
     commercial: Optional[CommercialSchema] # datos comerciales (opcional)
 
+    @model_validator(mode="after")
+    def check_catalog_references(self) -> "QuoteUpdateSchema":
+        return validate_catalog_references(self)
+
     class Config:
         from_attributes = True
 
@@ -85,12 +116,16 @@ class QuoteOutSchema(BaseModel):
     id: str = Field(alias= "_id") # id de la cotización
     user_id: str # id del usuario que creó la cotización
     quote_name: str # nombre de la cotización
+    printer_id: Optional[str] = None # impresora del catálogo referenciada
+    filament_id: Optional[str] = None # filamento del catálogo referenciado
     printer: PrinterSchema # datos de la impresora
     filament: FilamentSchema # datos del filamento
     energy: EnergySchema # datos de energía
     model: ModelDataSchema # datos del modelo
     commercial: CommercialSchema # datos comerciales
     summary: SummarySchema # resumen de la cotización
+    input_hash: Optional[str] = None # hash de las entradas (igual en cotizaciones idénticas)
+    pricing_version: int = 0 # versión de la fórmula del summary (ver PRICING_VERSION)
     created_at: datetime # fecha de creación
     updated_at: datetime # fecha de actualización
 
@@ -98,3 +133,8 @@ class QuoteOutSchema(BaseModel):
         from_attributes = True
         populate_by_name = True
         json_encoders = {ObjectId: str}
+
+# Esquema para una página de cotizaciones (paginación por cursor)
+class QuotePageSchema(BaseModel):
+    items: List[QuoteOutSchema] # cotizaciones de esta página
+    next_cursor: Optional[str] = None # cursor para pedir la siguiente página (None si no hay más)
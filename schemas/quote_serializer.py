@@ -0,0 +1,78 @@
+# backend/schemas/quote_serializer.py
+
+from typing import Any, Dict, Optional
+
+from models.quote_model import Quote
+
+# Ruta única de serialización Quote -> JSON de salida.
+# Produce el mismo contenido que QuoteOutSchema (con "_id" como alias de id)
+# sin reconstruir ni revalidar modelos Pydantic; se usa junto con ORJSONResponse.
+
+# Secciones embebidas que se devuelven tal cual (mismos campos que los esquemas de salida)
+SECTIONS = ("printer", "filament", "energy", "model", "commercial", "summary")
+
+# Referencias opcionales al catálogo de impresoras y filamentos
+CATALOG_REFS = ("printer_id", "filament_id")
+
+
+def _ref(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def quote_to_dict(quote: Quote) -> Dict[str, Any]:
+    """
+    Desde una instancia de Quote (p.ej. recién creada o actualizada).
+    """
+    out: Dict[str, Any] = {
+        "_id": str(quote.id),
+        "user_id": str(quote.user_id),
+        "quote_name": quote.quote_name,
+    }
+    for ref in CATALOG_REFS:
+        out[ref] = _ref(getattr(quote, ref))
+    for section in SECTIONS:
+        out[section] = getattr(quote, section).model_dump()
+    out["input_hash"] = quote.input_hash
+    out["pricing_version"] = quote.pricing_version
+    out["created_at"] = quote.created_at
+    out["updated_at"] = quote.updated_at
+    return out
+
+
+def quote_to_document(quote: Quote) -> Dict[str, Any]:
+    """
+    Documento a insertar en MongoDB desde una instancia de Quote
+    (las referencias al catálogo solo se incluyen si existen, para el índice disperso).
+    """
+    doc: Dict[str, Any] = {"user_id": quote.user_id, "quote_name": quote.quote_name}
+    for ref in CATALOG_REFS:
+        if getattr(quote, ref) is not None:
+            doc[ref] = getattr(quote, ref)
+    for section in SECTIONS:
+        doc[section] = getattr(quote, section).model_dump(mode="json")
+    if quote.input_hash is not None:
+        doc["input_hash"] = quote.input_hash
+    doc["pricing_version"] = quote.pricing_version
+    doc["created_at"] = quote.created_at
+    doc["updated_at"] = quote.updated_at
+    return doc
+
+
+def quote_document_to_dict(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Desde un documento crudo de MongoDB (sin construir el modelo Beanie).
+    """
+    out: Dict[str, Any] = {
+        "_id": str(doc["_id"]),
+        "user_id": str(doc["user_id"]),
+        "quote_name": doc["quote_name"],
+    }
+    for ref in CATALOG_REFS:
+        out[ref] = _ref(doc.get(ref))
+    for section in SECTIONS:
+        out[section] = doc[section]
+    out["input_hash"] = doc.get("input_hash")
+    out["pricing_version"] = doc.get("pricing_version", 0)
+    out["created_at"] = doc["created_at"]
+    out["updated_at"] = doc["updated_at"]
+    return out
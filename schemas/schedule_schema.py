@@ -0,0 +1,51 @@
+# backend/schemas/schedule_schema.py
+
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+
+from core.config import settings
+
+# Impresora del catálogo y cuántas unidades iguales hay en la granja
+class FleetEntrySchema(BaseModel):
+    printer_id: str # id de la impresora en /api/catalog/printers
+    count: int = Field(1, ge=1, le=500) # unidades de esa impresora
+
+class ScheduleRequestSchema(BaseModel):
+    quote_ids: Optional[List[str]] = Field(None, min_length=1, max_length=settings.SCHEDULE_MAX_JOBS) # None = todas
+    fleet: List[FleetEntrySchema] = Field(..., min_length=1)
+    objective: Literal["makespan", "cost"] = "makespan"
+    max_makespan: Optional[float] = Field(None, gt=0) # horas; solo para objective="cost"
+
+    @model_validator(mode="after")
+    def check_fleet_size(self):
+        if sum(entry.count for entry in self.fleet) > settings.SCHEDULE_MAX_MACHINES:
+            raise ValueError(f"La flota no puede superar {settings.SCHEDULE_MAX_MACHINES} impresoras")
+        return self
+
+# Un trabajo en la cola de una impresora (horas desde el inicio del plan)
+class ScheduledJob(BaseModel):
+    quote_id: str
+    quote_name: Optional[str] = None
+    start: float
+    end: float
+
+class ScheduledMachine(BaseModel):
+    printer_id: str
+    name: str
+    unit: int # unidad 1..count de esa impresora
+    load: float # horas de impresión asignadas
+    cost: float # costo de máquina + energía de sus trabajos
+    jobs: List[ScheduledJob]
+
+class ScheduleOutputSchema(BaseModel):
+    objective: str
+    jobs: int # trabajos asignados
+    machines_count: int
+    makespan: float # horas hasta que termina la última impresora
+    total_cost: float
+    local_search_iterations: int
+    elapsed_ms: float # tiempo del algoritmo (sin la consulta)
+    unassigned: List[str] # cotizaciones sin impresora compatible (tipo y boquilla)
+    truncated: bool # True si había más cotizaciones que SCHEDULE_MAX_JOBS (se planifican las más antiguas)
+    total_quotes: int # cotizaciones que coinciden con la petición (planificadas o no)
+    machines: List[ScheduledMachine]
@@ -0,0 +1,21 @@
+# backend/schemas/sensitivity_schema.py
+
+from pydantic import BaseModel
+from typing import Dict, List
+
+# Una barra del gráfico de tornado: costo total con la entrada baja y alta
+class TornadoBar(BaseModel):
+    input: str # nombre de la entrada (columna de price-batch)
+    value: float # valor original
+    low_value: float # valor * (1 - delta)
+    high_value: float # valor * (1 + delta)
+    low_cost: float # costo total con low_value
+    high_cost: float # costo total con high_value
+    swing: float # |high_cost - low_cost|
+    elasticity: float # variación % del costo por cada 1 % de la entrada
+
+class SensitivityOutputSchema(BaseModel):
+    delta: float # perturbación relativa aplicada
+    base_cost: float # costo total de la cotización
+    elasticities: Dict[str, float] # elasticidad por entrada
+    tornado: List[TornadoBar] # ordenado de mayor a menor swing
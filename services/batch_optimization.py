@@ -0,0 +1,147 @@
+# backend/services/batch_optimization.py
+
+import json
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List
+
+import numpy as np
+from bson import ObjectId
+
+from repositories import quote_repository
+from services.batch_pricing import round_column
+from services.pricing_logic import evaluate_parameters
+
+OPTIMIZATION_CHUNK_SIZE = 1000  # cotizaciones evaluadas por operación vectorizada
+
+# Factores de cada modo de generate_optimization: (velocidad, capa, relleno, soportes).
+# Velocidad y capa se recortan a 300 mm/s y 1.0 mm; el relleno reducido no baja de 5 %.
+OPTIMIZATION_MODES = {
+    "fast":     (1.10, 1.10, 1.00, 0.90),
+    "economic": (1.00, 1.00, 0.80, 0.85),
+    "balanced": (1.05, 1.05, 0.90, 0.90),
+}
+MAX_SPEED = 300.0
+MAX_LAYER = 1.0
+MIN_INFILL = 5.0
+
+
+def _stack(docs: List[Dict[str, Any]]) -> SimpleNamespace:
+    """
+    Cotización "apilada": los mismos atributos que lee evaluate_parameters en un Quote,
+    con un array por campo (una posición por cotización del lote).
+    """
+    def column(section: str, field: str) -> np.ndarray:
+        return np.array([float(doc[section].get(field) or 0.0) for doc in docs], dtype=np.float64)
+
+    return SimpleNamespace(
+        printer=SimpleNamespace(
+            speed=column("printer", "speed"),
+            nozzle=column("printer", "nozzle"),
+            watts=column("printer", "watts"),
+            hourly_cost=column("printer", "hourly_cost"),
+        ),
+        filament=SimpleNamespace(price_per_kg=column("filament", "price_per_kg")),
+        energy=SimpleNamespace(kwh_cost=column("energy", "kwh_cost")),
+        model=SimpleNamespace(
+            layer_height=column("model", "layer_height"),
+            infill=column("model", "infill"),
+            support_weight=column("model", "support_weight"),
+            model_weight=column("model", "model_weight"),
+            print_time=column("model", "print_time"),
+        ),
+    )
+
+
+def optimize_chunk(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Los tres modos de generate_optimization para todo el lote, cada uno en una sola
+    llamada vectorizada a evaluate_parameters. El costo de referencia es evaluate_parameters
+    con los parámetros originales (misma fórmula que los modos, sin costos comerciales).
+    """
+    quote = _stack(docs)
+    speed, layer = quote.printer.speed, quote.model.layer_height
+    infill, support = quote.model.infill, quote.model.support_weight
+
+    baseline = evaluate_parameters(quote, speed, layer, infill, support)["total_cost"]
+    modes: Dict[str, Dict[str, List[float]]] = {}
+    for mode, (f_speed, f_layer, f_infill, f_support) in OPTIMIZATION_MODES.items():
+        speed_new = np.minimum(speed * f_speed, MAX_SPEED)
+        layer_new = np.minimum(layer * f_layer, MAX_LAYER)
+        infill_new = np.maximum(infill * f_infill, MIN_INFILL) if f_infill != 1.0 else infill
+        support_new = support * f_support
+        results = evaluate_parameters(quote, speed_new, layer_new, infill_new, support_new)
+        modes[mode] = {
+            "speed": round_column(speed_new),
+            "layer_height": round_column(layer_new, 3),
+            "infill": round_column(infill_new),
+            "support_weight": round_column(support_new),
+            **{key: round_column(values) for key, values in results.items()},
+        }
+
+    baseline_cost = round_column(baseline)
+    out = []
+    for i, doc in enumerate(docs):
+        costs = {mode: columns["total_cost"][i] for mode, columns in modes.items()}
+        best_mode = min(costs, key=costs.get)
+        savings = round(baseline_cost[i] - costs[best_mode], 2)
+        out.append({
+            "event": "quote",
+            "_id": str(doc["_id"]),
+            "quote_name": doc.get("quote_name"),
+            "baseline_cost": baseline_cost[i],
+            "best_mode": best_mode if savings > 0 else None,
+            "savings": max(savings, 0.0),
+            "modes": {
+                mode: {
+                    "new_parameters": {
+                        key: columns[key][i] for key in ("speed", "layer_height", "infill", "support_weight")
+                    },
+                    "results": {
+                        key: columns[key][i] for key in (
+                            "print_time", "grams_used", "grams_wasted", "waste_percentage",
+                            "material_cost", "energy_cost", "machine_cost", "total_cost",
+                        )
+                    },
+                }
+                for mode, columns in modes.items()
+            },
+        })
+    return out
+
+
+async def stream_user_optimizations(user_id: ObjectId, chunk_size: int = OPTIMIZATION_CHUNK_SIZE) -> AsyncIterator[str]:
+    """
+    Optimiza todas las cotizaciones del usuario leyendo un solo cursor (solo los campos
+    que usa la optimización) y emite NDJSON: una línea {"event": "quote", ...} por cotización
+    y una línea final {"event": "done", ...} con el ahorro potencial total y por modo.
+    """
+    totals = {"count": 0, "baseline_cost": 0.0, "optimized_cost": 0.0, "potential_savings": 0.0}
+    by_mode = {mode: 0 for mode in OPTIMIZATION_MODES}
+
+    chunk: List[Dict[str, Any]] = []
+
+    def flush() -> str:
+        lines = []
+        for result in optimize_chunk(chunk):
+            totals["count"] += 1
+            totals["baseline_cost"] += result["baseline_cost"]
+            totals["optimized_cost"] += result["baseline_cost"] - result["savings"]
+            totals["potential_savings"] += result["savings"]
+            if result["best_mode"] is not None:
+                by_mode[result["best_mode"]] += 1
+            lines.append(json.dumps(result, ensure_ascii=False))
+        chunk.clear()
+        return "\n".join(lines) + "\n"
+
+    async for doc in quote_repository.iter_optimization_documents(user_id, chunk_size):
+        chunk.append(doc)
+        if len(chunk) >= chunk_size:
+            yield flush()
+    if chunk:
+        yield flush()
+
+    yield json.dumps({
+        "event": "done",
+        **{key: round(value, 2) if isinstance(value, float) else value for key, value in totals.items()},
+        "best_mode_counts": by_mode,
+    }) + "\n"
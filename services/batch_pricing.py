@@ -0,0 +1,175 @@
+# backend/services/batch_pricing.py
+
+from typing import Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+
+# Columnas de entrada del motor por lotes: (nombre, valor por defecto, mínimo, máximo, mínimo inclusivo)
+# Los límites replican los de los subdocumentos de models/quote_model.py.
+# Un valor por defecto None significa que la columna es obligatoria.
+BATCH_COLUMNS = {
+    "price_per_kg":    (None, 1.0, 100.0, False),
+    "model_weight":    (None, 0.0, None, False),
+    "support_weight":  (0.0,  0.0, None, True),
+    "watts":           (None, 0.0, None, False),
+    "print_time":      (None, 0.0, None, False),
+    "kwh_cost":        (None, 0.0, None, False),
+    "hourly_cost":     (None, 1.0, 500.0, True),
+    "labor":           (0.0,  0.0, 500.0, True),
+    "post_processing": (0.0,  0.0, 500.0, True),
+    "margin":          (None, 0.0, 1.0, True),
+    "taxes":           (0.0,  0.0, 1.0, True),
+}
+
+MAX_BATCH_ROWS = 100_000
+
+# Columna -> (sección, campo) del documento de una cotización; las opcionales valen 0 si faltan
+INPUT_PATHS = {
+    "price_per_kg":    ("filament", "price_per_kg"),
+    "model_weight":    ("model", "model_weight"),
+    "support_weight":  ("model", "support_weight"),
+    "watts":           ("printer", "watts"),
+    "print_time":      ("model", "print_time"),
+    "kwh_cost":        ("energy", "kwh_cost"),
+    "hourly_cost":     ("printer", "hourly_cost"),
+    "labor":           ("commercial", "labor"),
+    "post_processing": ("commercial", "post_processing"),
+    "margin":          ("commercial", "margin"),
+    "taxes":           ("commercial", "taxes"),
+}
+SUMMARY_FIELDS = ("estimated_total_cost", "grams_used", "grams_wasted", "waste_percentage")
+
+
+def rows_to_columns(rows: Sequence[Mapping[str, float]]) -> Dict[str, List[float]]:
+    """
+    Convierte una lista de filas (dicts) en formato columnar sin crear
+    un modelo Pydantic por fila. Las columnas opcionales ausentes toman su valor por defecto.
+    """
+    columns: Dict[str, List[float]] = {}
+    for name, (default, _, _, _) in BATCH_COLUMNS.items():
+        if default is None:
+            try:
+                columns[name] = [row[name] for row in rows]
+            except KeyError as e:
+                raise ValueError(f"Falta la columna obligatoria '{name}' en alguna fila") from e
+        else:
+            columns[name] = [row.get(name, default) for row in rows]
+    return columns
+
+
+def out_of_range(name: str, arr: np.ndarray) -> np.ndarray:
+    """
+    Máscara de las filas de 'arr' que no son finitas o están fuera
+    de los límites de la columna 'name' de BATCH_COLUMNS.
+    """
+    _, low, high, inclusive = BATCH_COLUMNS[name]
+    invalid = ~np.isfinite(arr)
+    invalid |= (arr < low) if inclusive else (arr <= low)
+    if high is not None:
+        invalid |= arr > high
+    return invalid
+
+
+def _as_arrays(columns: Mapping[str, Iterable[float]]) -> Dict[str, np.ndarray]:
+    """
+    Convierte las columnas a arrays float64 y valida longitudes y rangos
+    como operaciones sobre el array completo.
+    """
+    unknown = set(columns) - set(BATCH_COLUMNS)
+    if unknown:
+        raise ValueError(f"Columnas desconocidas: {', '.join(sorted(unknown))}")
+
+    size = None
+    for name, (default, _, _, _) in BATCH_COLUMNS.items():
+        if default is None and name not in columns:
+            raise ValueError(f"Falta la columna obligatoria '{name}'")
+        if name in columns:
+            n = len(columns[name])
+            if size is None:
+                size = n
+            elif n != size:
+                raise ValueError("Todas las columnas deben tener la misma longitud")
+
+    if not size:
+        raise ValueError("El lote no contiene filas")
+    if size > MAX_BATCH_ROWS:
+        raise ValueError(f"El lote excede el máximo de {MAX_BATCH_ROWS} filas")
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, (default, _, _, _) in BATCH_COLUMNS.items():
+        if name in columns:
+            arr = np.asarray(columns[name], dtype=np.float64)
+        else:
+            arr = np.full(size, default, dtype=np.float64)
+
+        invalid = out_of_range(name, arr)
+        if invalid.any():
+            rows = np.flatnonzero(invalid)[:10].tolist()
+            raise ValueError(f"Valores fuera de rango en '{name}' (filas {rows})")
+        arrays[name] = arr
+    return arrays
+
+
+def price_batch(columns: Mapping[str, Iterable[float]]) -> Dict[str, np.ndarray]:
+    """
+    Versión vectorizada de calculate_quote_summary: aplica la misma fórmula
+    sobre arrays completos y devuelve los componentes de costo SIN redondear.
+    """
+    return price_arrays(_as_arrays(columns))
+
+
+def price_arrays(a: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Fórmula de price_batch sobre arrays float64 ya armados (una entrada por columna
+    de BATCH_COLUMNS), sin validar rangos: la usa el análisis de sensibilidad,
+    cuyas perturbaciones pueden salir de los límites de los modelos.
+    """
+    # Material
+    grams_used = a["model_weight"] + a["support_weight"]
+    material_cost = grams_used * (a["price_per_kg"] / 1000)
+
+    # Energía e impresión
+    energy_cost = (a["watts"] / 1000) * a["print_time"] * a["kwh_cost"]
+    machine_cost = a["print_time"] * a["hourly_cost"]
+    printing_cost = material_cost + energy_cost + machine_cost
+
+    # Comercial
+    base_cost = printing_cost + (a["labor"] + a["post_processing"])
+    with_margin = base_cost * (1 + a["margin"])
+    final_price = with_margin * (1 + a["taxes"])
+
+    # Diagnóstico (grams_used > 0 siempre porque model_weight > 0)
+    grams_wasted = a["support_weight"]
+    waste_percentage = (grams_wasted / grams_used) * 100
+
+    return {
+        "material_cost": material_cost,
+        "energy_cost": energy_cost,
+        "machine_cost": machine_cost,
+        "extra_cost": a["labor"] + a["post_processing"],
+        "margin_cost": with_margin - base_cost,
+        "tax_cost": final_price - with_margin,
+        "estimated_total_cost": final_price,
+        "grams_used": grams_used,
+        "grams_wasted": grams_wasted,
+        "waste_percentage": waste_percentage,
+    }
+
+
+def round_column(values: np.ndarray, ndigits: int = 2) -> List[float]:
+    """
+    Redondea con round() de Python (no np.round) para devolver exactamente
+    los mismos números que la ruta escalar calculate_quote_summary.
+    """
+    return [round(v, ndigits) for v in values.tolist()]
+
+
+def price_summary(values: Mapping[str, float]) -> Dict[str, float]:
+    """
+    Resumen redondeado de una sola cotización ya validada (valores por columna; las
+    opcionales ausentes o None valen 0): mismos números que calculate_quote_summary.
+    """
+    arrays = {name: np.array([float(values.get(name) or 0.0)], dtype=np.float64) for name in BATCH_COLUMNS}
+    results = price_arrays(arrays)
+    return {key: round_column(results[key])[0] for key in SUMMARY_FIELDS}
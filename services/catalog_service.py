@@ -0,0 +1,206 @@
+# backend/services/catalog_service.py
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from beanie import Document
+from bson import ObjectId
+
+from core.cache import TTLCache
+from core.config import settings
+from core.etag import now_millis
+from models.catalog_model import (
+    PrinterCatalog, FilamentCatalog, PRINTER_CATALOG_ONLY, FILAMENT_CATALOG_ONLY,
+    PRINTER_COST_FIELDS, FILAMENT_COST_FIELDS,
+)
+from repositories import catalog_repository
+from services.repricing import start_repricing_run
+
+
+class CatalogEntryInUseError(Exception):
+    """La entrada del catálogo está referenciada por alguna cotización."""
+
+
+# Sección de la cotización -> (modelo del catálogo, campo de referencia, campos que solo guarda el catálogo)
+CATALOGS: Dict[str, Tuple[Type[Document], str, Tuple[str, ...]]] = {
+    "printer": (PrinterCatalog, "printer_id", PRINTER_CATALOG_ONLY),
+    "filament": (FilamentCatalog, "filament_id", FILAMENT_CATALOG_ONLY),
+}
+
+# Campos de costo de cada sección (se copian en las cotizaciones que referencian la entrada)
+COST_FIELDS = {"printer": PRINTER_COST_FIELDS, "filament": FILAMENT_COST_FIELDS}
+
+# Campos de la entrada que no forman parte de las especificaciones
+ENTRY_METADATA = {"_id", "revision_id", "user_id", "version", "created_at", "updated_at"}
+
+# Entradas del catálogo por (sección, id). Las escrituras locales descartan su entrada;
+# las de otros procesos se detectan por la versión global del catálogo (ver sync_catalog_version)
+catalog_cache = TTLCache(maxsize=settings.CATALOG_CACHE_SIZE, ttl=settings.CATALOG_CACHE_TTL)
+
+_known_version: Optional[int] = None
+_version_checked_at = float("-inf")
+
+
+async def sync_catalog_version() -> None:
+    """
+    Consulta la versión global del catálogo como máximo cada CATALOG_VERSION_CHECK_INTERVAL
+    segundos y vacía la caché si otro proceso modificó alguna entrada.
+    """
+    global _known_version, _version_checked_at
+    now = time.monotonic()
+    if now - _version_checked_at < settings.CATALOG_VERSION_CHECK_INTERVAL:
+        return
+    _version_checked_at = now
+    version = await catalog_repository.get_catalog_version()
+    if version != _known_version:
+        catalog_cache.clear()
+        _known_version = version
+
+
+async def current_catalog_version() -> int:
+    """Versión global del catálogo vista por este proceso (para los ETag de las lecturas)."""
+    await sync_catalog_version()
+    return _known_version or 0
+
+
+async def _invalidate_entry(section: str, entry_id: ObjectId) -> None:
+    global _known_version
+    catalog_cache.pop((section, entry_id))
+    version = await catalog_repository.bump_catalog_version()
+    # Este proceso ya descartó su copia: no hace falta vaciar la caché en la próxima consulta
+    if _known_version is not None and version == _known_version + 1:
+        _known_version = version
+
+
+async def resolve_entries(section: str, ids: Iterable[ObjectId]) -> Dict[ObjectId, dict]:
+    """
+    Entradas del catálogo por id: las que no están en caché se leen en una sola consulta ($in).
+    """
+    await sync_catalog_version()
+    model = CATALOGS[section][0]
+    found: Dict[ObjectId, dict] = {}
+    missing: List[ObjectId] = []
+    for entry_id in set(ids):
+        entry = catalog_cache.get((section, entry_id))
+        if entry is None:
+            missing.append(entry_id)
+        else:
+            found[entry_id] = entry
+    for entry in await catalog_repository.find_entries_by_ids(model, missing):
+        catalog_cache.set((section, entry["_id"]), entry)
+        found[entry["_id"]] = entry
+    return found
+
+
+async def get_user_entry(section: str, entry_id: str, user_id: ObjectId) -> Optional[dict]:
+    """Entrada del catálogo del usuario (None si no existe, no es suya o el id es inválido)."""
+    try:
+        oid = ObjectId(entry_id)
+    except Exception:
+        return None
+    entry = (await resolve_entries(section, [oid])).get(oid)
+    if entry is None or entry["user_id"] != user_id:
+        return None
+    return entry
+
+
+def merge_catalog_fields(section: str, entry: dict, values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sección completa de la cotización: especificaciones de la entrada + valores propios del trabajo
+    (los valores enviados tienen prioridad, salvo los campos que solo guarda el catálogo).
+    """
+    catalog_only = CATALOGS[section][2]
+    merged = {name: value for name, value in entry.items() if name not in ENTRY_METADATA}
+    merged.update({name: value for name, value in values.items() if name not in catalog_only})
+    return merged
+
+
+def strip_catalog_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Quita de las secciones printer/filament los campos que solo guarda el catálogo
+    cuando la cotización referencia una entrada (modifica 'doc' y lo retorna).
+    """
+    for section, (_, ref_field, catalog_only) in CATALOGS.items():
+        if doc.get(ref_field) is not None and isinstance(doc.get(section), dict):
+            for name in catalog_only:
+                doc[section].pop(name, None)
+    return doc
+
+
+async def resolve_quote_documents(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Completa en lote las secciones de las cotizaciones que referencian el catálogo:
+    una consulta por colección para las entradas que no están en caché (modifica 'docs').
+    """
+    for section, (_, ref_field, catalog_only) in CATALOGS.items():
+        ids = [doc[ref_field] for doc in docs if doc.get(ref_field) is not None]
+        if not ids:
+            continue
+        entries = await resolve_entries(section, ids)
+        for doc in docs:
+            entry = entries.get(doc.get(ref_field))
+            if entry is not None:
+                values = {name: entry[name] for name in catalog_only}
+                values.update({name: v for name, v in doc[section].items() if name not in catalog_only})
+                doc[section] = values
+    return docs
+
+
+# ─── Gestión de las entradas del usuario ─────────────────────────────────
+
+async def list_user_entries(section: str, user_id: ObjectId) -> List[dict]:
+    return await catalog_repository.find_user_entries(CATALOGS[section][0], user_id)
+
+
+async def create_entry(section: str, user_id: ObjectId, specs: Dict[str, Any]) -> dict:
+    model = CATALOGS[section][0]
+    now = now_millis()
+    document = {"user_id": user_id, **specs, "version": 1, "created_at": now, "updated_at": now}
+    document["_id"] = await catalog_repository.insert_entry(model, document)
+    return document
+
+
+async def update_entry(section: str, entry_id: str, user_id: ObjectId, fields: Dict[str, Any]) -> Optional[dict]:
+    """
+    Modifica los campos enviados e incrementa la versión de la entrada.
+    Los campos que solo guarda el catálogo (p.ej. el nombre) se ven en todas las cotizaciones
+    al leerlas. Un costo modificado se encola para copiarlo en segundo plano en las cotizaciones
+    que tenían el valor anterior, que luego se re-cotizan (services/repricing.py).
+    """
+    try:
+        oid = ObjectId(entry_id)
+    except Exception:
+        return None
+    model, ref_field, _ = CATALOGS[section]
+
+    now = now_millis()
+    before = await catalog_repository.update_user_entry(model, oid, user_id, fields, now)
+    if before is None:
+        return None
+    entry = {**before, **fields, "updated_at": now, "version": before.get("version", 0) + 1}
+    await _invalidate_entry(section, oid)
+
+    changed = [name for name in COST_FIELDS[section] if name in fields and before.get(name) != fields[name]]
+    for name in changed:
+        await catalog_repository.enqueue_cost_change(
+            ref_field, oid, f"{section}.{name}", before.get(name), fields[name], now,
+        )
+    if changed:
+        start_repricing_run()
+    return entry
+
+
+async def delete_entry(section: str, entry_id: str, user_id: ObjectId) -> bool:
+    """
+    Elimina la entrada si es del usuario. Lanza CatalogEntryInUseError si alguna cotización la referencia.
+    """
+    entry = await get_user_entry(section, entry_id, user_id)
+    if entry is None:
+        return False
+    model, ref_field, _ = CATALOGS[section]
+    if await catalog_repository.entry_in_use(ref_field, entry["_id"]):
+        raise CatalogEntryInUseError("La entrada está en uso por alguna cotización")
+    deleted = await catalog_repository.delete_user_entry(model, entry["_id"], user_id)
+    if deleted:
+        await _invalidate_entry(section, entry["_id"])
+    return deleted
@@ -0,0 +1,323 @@
+# backend/services/hyperparam_search.py
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Rejilla por defecto (la misma del notebook 01_basicRegression) + regularización L2
+DEFAULT_GRID = {
+    "lr": [1e-3, 3e-3, 1e-2],
+    "epochs": [10, 20, 40],
+    "batch_size": [16, 32, 64],
+    "alpha": [0.0],
+}
+DEFAULT_SPLITS = 5
+DEFAULT_PATIENCE = 3      # épocas sin mejorar en validación antes de detenerse (None = sin early stopping)
+MIN_IMPROVEMENT = 1e-6    # mejora mínima del RMSE de validación para reiniciar la paciencia
+
+# Matriz de entrenamiento compartida dentro de cada proceso del pool
+_shared: Dict[str, Any] = {}
+
+
+def kfold_indices(n: int, n_splits: int, fold: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Índices (entrenamiento, validación) del fold 'fold' con barajado reproducible.
+    Cada proceso los recalcula a partir de la semilla en vez de recibirlos serializados.
+    """
+    order = np.random.default_rng(seed).permutation(n)
+    parts = np.array_split(order, n_splits)
+    return np.concatenate(parts[:fold] + parts[fold + 1:]), parts[fold]
+
+
+def minibatch_gd(
+    X: np.ndarray,
+    y: np.ndarray,
+    lr: float,
+    epochs: int,
+    batch_size: int,
+    alpha: float = 0.0,
+    X_val: Optional[np.ndarray] = None,
+    y_val: Optional[np.ndarray] = None,
+    patience: Optional[int] = DEFAULT_PATIENCE,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    Regresión lineal por mini-batch gradient descent (como en el notebook), con L2 opcional.
+    Las features se estandarizan con la media/desviación del entrenamiento.
+    Si hay datos de validación, se conserva la mejor época y se detiene tras 'patience'
+    épocas sin mejora o si el entrenamiento diverge.
+    """
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Xs = (X - mean) / std
+    Xv = (X_val - mean) / std if X_val is not None else None
+
+    rng = np.random.default_rng(seed)
+    n, d = Xs.shape
+    W = 0.01 * rng.normal(size=d)
+    b = float(y.mean())
+
+    best = {"W": W.copy(), "b": b, "val_rmse": np.inf, "epoch": 0}
+    stale = 0
+    epochs_run = 0
+    for epoch in range(1, epochs + 1):
+        idx = rng.permutation(n)
+        for start in range(0, n, batch_size):
+            batch = idx[start:start + batch_size]
+            xb, yb = Xs[batch], y[batch]
+            err = xb @ W + b - yb
+            W -= lr * (xb.T @ err / len(batch) + alpha * W)
+            b -= lr * float(err.mean())
+        epochs_run = epoch
+
+        if Xv is None:
+            continue
+        val_rmse = float(np.sqrt(np.mean((Xv @ W + b - y_val) ** 2)))
+        if not np.isfinite(val_rmse):
+            break
+        if val_rmse < best["val_rmse"] - MIN_IMPROVEMENT:
+            best = {"W": W.copy(), "b": b, "val_rmse": val_rmse, "epoch": epoch}
+            stale = 0
+        else:
+            stale += 1
+            if patience is not None and stale >= patience:
+                break
+
+    if Xv is None:
+        best = {"W": W, "b": b, "val_rmse": None, "epoch": epochs_run}
+    # Coeficientes en la escala original de las features
+    coef = best["W"] / std
+    return {
+        "coef": coef,
+        "intercept": best["b"] - float(coef @ mean),
+        "val_rmse": best["val_rmse"],
+        "best_epoch": best["epoch"],
+        "epochs_run": epochs_run,
+    }
+
+
+def _evaluate(X: np.ndarray, y: np.ndarray, config: Dict[str, Any], fold: int,
+              n_splits: int, patience: Optional[int], seed: int) -> Dict[str, Any]:
+    train, val = kfold_indices(len(y), n_splits, fold, seed)
+    result = minibatch_gd(
+        X[train], y[train],
+        lr=config["lr"], epochs=config["epochs"], batch_size=config["batch_size"],
+        alpha=config.get("alpha", 0.0),
+        X_val=X[val], y_val=y[val], patience=patience, seed=seed,
+    )
+    return {"val_rmse": result["val_rmse"], "epochs_run": result["epochs_run"]}
+
+
+# ── Pool de procesos con la matriz en memoria compartida ────────────────
+
+def _attach_shared(x_spec: Tuple[str, tuple], y_spec: Tuple[str, tuple]) -> None:
+    """Inicializador de cada proceso: se conecta una sola vez a los bloques compartidos."""
+    for key, (name, shape) in (("X", x_spec), ("y", y_spec)):
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[key + "_shm"] = shm
+        _shared[key] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _evaluate_shared(config: Dict[str, Any], fold: int, n_splits: int,
+                     patience: Optional[int], seed: int) -> Dict[str, Any]:
+    return _evaluate(_shared["X"], _shared["y"], config, fold, n_splits, patience, seed)
+
+
+def _to_shared(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, tuple]]:
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=np.float64, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape)
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _summarize(configs: List[Dict[str, Any]], fold_results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Promedia los folds de cada configuración y ordena por RMSE de validación."""
+    results = []
+    for config, folds in zip(configs, fold_results):
+        rmses = [f["val_rmse"] for f in folds]
+        results.append({
+            "config": config,
+            "cv_rmse": float(np.mean(rmses)) if all(np.isfinite(rmses)) else None,
+            "fold_rmse": rmses,
+            "epochs_run": [f["epochs_run"] for f in folds],
+        })
+    results.sort(key=lambda r: np.inf if r["cv_rmse"] is None else r["cv_rmse"])
+    return results
+
+
+def grid_search(
+    X: np.ndarray,
+    y: np.ndarray,
+    grid: Dict[str, Iterable[Any]] = DEFAULT_GRID,
+    n_splits: int = DEFAULT_SPLITS,
+    patience: Optional[int] = DEFAULT_PATIENCE,
+    workers: Optional[int] = None,
+    seed: int = 42,
+) -> List[Dict[str, Any]]:
+    """
+    Evalúa cada configuración × fold en un pool de procesos. X e y se copian una vez
+    a memoria compartida; las tareas solo envían la configuración y el número de fold.
+    workers=1 ejecuta el bucle en serie en el proceso actual (referencia del notebook).
+    """
+    configs = expand_grid(grid)
+    tasks = [(i, fold) for i in range(len(configs)) for fold in range(n_splits)]
+    fold_results: List[List[Any]] = [[None] * n_splits for _ in configs]
+
+    if workers == 1:
+        for i, fold in tasks:
+            fold_results[i][fold] = _evaluate(X, y, configs[i], fold, n_splits, patience, seed)
+        return _summarize(configs, fold_results)
+
+    x_shm, x_spec = _to_shared(X)
+    y_shm, y_spec = _to_shared(y)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=_attach_shared,
+            initargs=(x_spec, y_spec),
+        ) as pool:
+            futures = {
+                pool.submit(_evaluate_shared, configs[i], fold, n_splits, patience, seed): (i, fold)
+                for i, fold in tasks
+            }
+            for future, (i, fold) in futures.items():
+                fold_results[i][fold] = future.result()
+    finally:
+        for shm in (x_shm, y_shm):
+            shm.close()
+            shm.unlink()
+    return _summarize(configs, fold_results)
+
+
+def benchmark_search(
+    X: np.ndarray,
+    y: np.ndarray,
+    grid: Dict[str, Iterable[Any]] = DEFAULT_GRID,
+    n_splits: int = DEFAULT_SPLITS,
+    patience: Optional[int] = DEFAULT_PATIENCE,
+    workers: Optional[int] = None,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    Ejecuta la búsqueda en serie y en paralelo con los mismos datos y semillas,
+    comprueba que den el mismo resultado y reporta el speedup de tiempo real.
+    """
+    start = time.perf_counter()
+    serial = grid_search(X, y, grid, n_splits, patience, workers=1, seed=seed)
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = grid_search(X, y, grid, n_splits, patience, workers=workers, seed=seed)
+    parallel_seconds = time.perf_counter() - start
+
+    return {
+        "samples": int(len(y)),
+        "configs": len(parallel),
+        "tasks": len(parallel) * n_splits,
+        "workers": workers or os.cpu_count(),
+        "serial_seconds": round(serial_seconds, 3),
+        "parallel_seconds": round(parallel_seconds, 3),
+        "speedup": round(serial_seconds / parallel_seconds, 2) if parallel_seconds > 0 else None,
+        "same_result": serial[0]["config"] == parallel[0]["config"],
+        "best": parallel[0],
+    }
+
+
+async def _load_matrix(cursor, to_arrays, batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    blocks_X, blocks_y = [], []
+    while True:
+        docs = await cursor.to_list(length=batch_size)
+        if not docs:
+            break
+        X, y = to_arrays(docs)
+        blocks_X.append(X)
+        blocks_y.append(y)
+    if not blocks_y:
+        return np.empty((0, 0)), np.empty(0)
+    return np.vstack(blocks_X), np.concatenate(blocks_y)
+
+
+async def load_print_time_matrix() -> Tuple[np.ndarray, np.ndarray]:
+    """Matriz de features y log(print_time) de todas las cotizaciones guardadas (sin intercepto)."""
+    from repositories.quote_repository import iter_training_documents
+    from services.print_time_model import TRAINING_BATCH_SIZE, training_arrays
+
+    def to_arrays(docs):
+        X, y = training_arrays(docs)
+        return X[:, 1:], y
+
+    cursor = iter_training_documents(None, TRAINING_BATCH_SIZE)
+    return await _load_matrix(cursor, to_arrays, TRAINING_BATCH_SIZE)
+
+
+def cost_arrays(docs: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (X, y) del modelo de costo: las entradas de la fórmula (columnas de INPUT_PATHS, las
+    opcionales en 0) y summary.estimated_total_cost. Descarta las filas sin resumen.
+    """
+    from services.batch_pricing import INPUT_PATHS
+
+    rows, targets = [], []
+    for doc in docs:
+        cost = (doc.get("summary") or {}).get("estimated_total_cost")
+        if cost is None:
+            continue
+        try:
+            rows.append([float((doc.get(section) or {}).get(field) or 0.0) for section, field in INPUT_PATHS.values()])
+        except (TypeError, ValueError):
+            continue
+        targets.append(float(cost))
+    if not rows:
+        return np.empty((0, len(INPUT_PATHS))), np.empty(0)
+    return np.array(rows, dtype=np.float64), np.array(targets, dtype=np.float64)
+
+
+async def load_cost_matrix() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Entradas de la fórmula y estimated_total_cost de las cotizaciones calculadas con la
+    versión actual (PRICING_VERSION): datos para ajustar un modelo de costo aproximado.
+    """
+    from repositories.quote_repository import iter_priced_documents
+    from services.pricing_logic import PRICING_VERSION
+    from services.print_time_model import TRAINING_BATCH_SIZE
+
+    cursor = iter_priced_documents(PRICING_VERSION, TRAINING_BATCH_SIZE)
+    return await _load_matrix(cursor, cost_arrays, TRAINING_BATCH_SIZE)
+
+
+MATRIX_LOADERS = {"print_time": load_print_time_matrix, "cost": load_cost_matrix}
+
+
+async def _main(workers: Optional[int], model: str) -> None:
+    from core.database import initiate_database
+
+    await initiate_database()
+    X, y = await MATRIX_LOADERS[model]()
+    if len(y) < DEFAULT_SPLITS * 2:
+        print(json.dumps({"error": "No hay suficientes cotizaciones para validar", "samples": int(len(y))}))
+        return
+    report = benchmark_search(X, y, workers=workers)
+    print(json.dumps({"model": model, **report}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    # python -m services.hyperparam_search [workers] [print_time|cost]
+    import sys
+
+    asyncio.run(_main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else None,
+        sys.argv[2] if len(sys.argv) > 2 else "print_time",
+    ))
@@ -0,0 +1,59 @@
+# backend/services/optimization_cache.py
+
+import hashlib
+import json
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from core.cache import TTLCache
+from core.config import settings
+from core.etag import derived_etag
+from models.quote_model import Quote
+from services.print_time_model import model_revision
+
+# Caché de resultados de generate_optimization / pareto_search por contenido de la cotización
+optimization_cache = TTLCache(
+    maxsize=settings.OPTIMIZATION_CACHE_SIZE,
+    ttl=settings.OPTIMIZATION_CACHE_TTL,
+)
+
+
+def optimization_cache_key(quote: Quote, params: Tuple[Hashable, ...] = ()) -> str:
+    """
+    Hash estable de las secciones que afectan la optimización
+    (printer, filament, energy, model) + updated_at + parámetros de la consulta
+    + revisión del modelo de tiempo de impresión (al reentrenar cambian los resultados).
+    """
+    content = {
+        "printer": quote.printer.model_dump(mode="json"),
+        "filament": quote.filament.model_dump(mode="json"),
+        "energy": quote.energy.model_dump(mode="json"),
+        "model": quote.model.model_dump(mode="json"),
+        "updated_at": quote.updated_at.isoformat(),
+        "params": list(params),
+        "time_model": model_revision(),
+    }
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_cached_optimization(quote: Quote, params: Tuple[Hashable, ...] = ()) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Retorna (key, resultado) — resultado es None si no está en caché."""
+    key = optimization_cache_key(quote, params)
+    return key, optimization_cache.get(key)
+
+
+def store_optimization(quote: Quote, key: str, result: Dict[str, Any]) -> None:
+    optimization_cache.set(key, result, tag=str(quote.id))
+
+
+def invalidate_quote_optimizations(quote_id: str) -> None:
+    """Descarta las optimizaciones en caché de una cotización (al editarla o eliminarla)."""
+    optimization_cache.invalidate_tag(str(quote_id))
+
+
+def optimization_etag(updated_at) -> str:
+    """
+    ETag de la optimización de una cotización: cambia con su updated_at y con la revisión
+    del modelo de tiempo de impresión (los parámetros de la consulta son parte de la URL).
+    """
+    return derived_etag(updated_at, f"m{model_revision()}")
@@ -0,0 +1,125 @@
+# backend/services/pareto_optimizer.py
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from models.quote_model import Quote
+from services.pricing_logic import evaluate_parameters
+
+# Límites que ya imponen Printer/ModelData
+MAX_SPEED = 300.0
+MAX_LAYER = 1.0
+MIN_INFILL = 5.0
+MAX_INFILL = 100.0
+
+# Rango de búsqueda relativo a los parámetros originales
+SPEED_RANGE   = (0.5, 1.5)
+LAYER_RANGE   = (0.5, 1.5)
+INFILL_RANGE  = (0.5, 1.5)
+SUPPORT_RANGE = (0.7, 1.0)   # los soportes solo se reducen
+
+DEFAULT_RESOLUTION = 12      # 12^4 = 20 736 candidatos
+MAX_RESOLUTION = 25          # 25^4 = 390 625 candidatos
+MAX_FRONT_POINTS = 50        # puntos del frente devueltos (ordenados por puntaje)
+
+OBJECTIVES = ("print_time", "total_cost", "waste_percentage")
+
+
+def _axis(center: float, bounds: Tuple[float, float], low: float, high: float, resolution: int) -> np.ndarray:
+    """
+    Eje de la rejilla alrededor del valor original, recortado a [low, high].
+    Si el rango colapsa (p.ej. soportes en 0) devuelve un único valor.
+    """
+    start = min(max(center * bounds[0], low), high)
+    stop = min(max(center * bounds[1], low), high)
+    if stop <= start:
+        return np.array([start])
+    return np.linspace(start, stop, resolution)
+
+
+def _pareto_front(columns: List[np.ndarray], score: np.ndarray) -> np.ndarray:
+    """
+    Índices de los candidatos no dominados (minimización en todas las columnas).
+    En cada paso visita el candidato pendiente de mejor puntaje y descarta en bloque
+    todos los que domina: O(n * tamaño del frente), sin ordenar la rejilla completa.
+    Se compara columna por columna, que es mucho más rápido que reducir sobre axis=1.
+    """
+    idx = np.arange(len(score))
+    pending = score.copy()
+    while True:
+        i = int(np.argmin(pending))
+        if pending[i] == np.inf:
+            return idx
+        worse_or_equal = np.ones(len(idx), dtype=bool)
+        strictly_worse = np.zeros(len(idx), dtype=bool)
+        for col in columns:
+            worse_or_equal &= col >= col[i]
+            strictly_worse |= col > col[i]
+        keep = ~(worse_or_equal & strictly_worse)
+        pending[i] = np.inf
+        idx = idx[keep]
+        pending = pending[keep]
+        columns = [col[keep] for col in columns]
+
+
+def pareto_search(
+    quote: Quote,
+    resolution: int = DEFAULT_RESOLUTION,
+    weights: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+    max_points: int = MAX_FRONT_POINTS,
+) -> Dict[str, Any]:
+    """
+    Evalúa de una sola vez una rejilla densa de (speed, layer_height, infill, support_weight)
+    y devuelve el frente de Pareto de tiempo de impresión vs. costo total vs. desperdicio.
+    Los puntos del frente se ordenan por el puntaje ponderado (objetivos normalizados a [0, 1]);
+    el primero es la recomendación.
+    """
+    speed_old   = quote.printer.speed
+    layer_old   = quote.model.layer_height
+    infill_old  = quote.model.infill
+    support_old = quote.model.support_weight or 0.0
+
+    speeds   = _axis(speed_old, SPEED_RANGE, 1e-6, MAX_SPEED, resolution)
+    layers   = _axis(layer_old, LAYER_RANGE, 1e-6, MAX_LAYER, resolution)
+    infills  = _axis(infill_old, INFILL_RANGE, MIN_INFILL, MAX_INFILL, resolution)
+    supports = _axis(support_old, SUPPORT_RANGE, 0.0, max(support_old, 0.0), resolution)
+
+    grid = np.meshgrid(speeds, layers, infills, supports, indexing="ij")
+    speed, layer, infill, support = (axis.ravel() for axis in grid)
+
+    results = evaluate_parameters(quote, speed, layer, infill, support)
+    columns = [results[name] for name in OBJECTIVES]
+
+    # Puntaje ponderado sobre objetivos normalizados a [0, 1]
+    total_weight = sum(weights)
+    score = np.zeros(speed.size)
+    for col, weight in zip(columns, weights):
+        low, high = col.min(), col.max()
+        if high > low and total_weight > 0:
+            score += (weight / total_weight) * ((col - low) / (high - low))
+
+    front = _pareto_front(columns, score)
+    front_size = int(front.size)
+    front = front[np.argsort(score[front], kind="stable")][:max_points]
+
+    points = [
+        {
+            "new_parameters": {
+                "speed": round(float(speed[i]), 2),
+                "layer_height": round(float(layer[i]), 3),
+                "infill": round(float(infill[i]), 2),
+                "support_weight": round(float(support[i]), 2),
+            },
+            "results": {key: round(float(values[i]), 2) for key, values in results.items()},
+            "score": round(float(score[i]), 4),
+        }
+        for i in front
+    ]
+
+    return {
+        "evaluated": int(speed.size),
+        "front_size": front_size,
+        "recommended": points[0],
+        "front": points,
+    }
@@ -3,6 +3,13 @@
 from typing import Dict, Any
 from schemas.quote_schema import QuoteCreateSchema
 from models.quote_model import Quote
+from services.print_time_model import predict_time_ratio
+
+# Versión de la fórmula del resumen. Al cambiar calculate_quote_summary (y su versión
+# vectorizada price_arrays en batch_pricing, que usan la importación, el PATCH y la
+# re-cotización) se incrementa; services/repricing.py recalcula en segundo plano las
+# cotizaciones con otra versión. tests/test_pricing_parity.py comprueba que ambas coincidan.
+PRICING_VERSION = 1
 
 
 # Diagnóstico de cotización
@@ -42,6 +49,67 @@ def calculate_quote_summary(data: QuoteCreateSchema) -> dict:
     }
 
 
+# Evaluación de parámetros de impresión alternativos
+def evaluate_parameters(quote: Quote, speed_new, layer_new, infill_new, support_new) -> Dict[str, Any]:
+    """
+    Estima tiempo, material y costos de la cotización con nuevos parámetros.
+    Solo usa aritmética elemento a elemento, por lo que acepta tanto floats
+    como arrays de NumPy (un candidato por posición). Los valores no se redondean.
+    Supone parámetros > 0, garantizado por las validaciones de Printer/ModelData.
+    """
+    # Valores originales
+    speed_old    = quote.printer.speed                    # mm/s
+    layer_old    = quote.model.layer_height               # mm
+    infill_old   = quote.model.infill                     # %
+    model_weight = quote.model.model_weight               # g
+    time_old     = quote.model.print_time                 # h
+
+    # Precios y costos
+    price_per_g   = quote.filament.price_per_kg / 1000.0   # USD por gramo
+    cost_kwh      = quote.energy.kwh_cost                  # USD por kWh
+    watts         = quote.printer.watts                    # W
+    cost_per_hour = quote.printer.hourly_cost              # USD por hora
+
+    # 1) Peso de modelo nuevo (solo cambia si infill varía)
+    model_weight_new = model_weight * (infill_new / infill_old)
+
+    # 2) Nuevo tiempo de impresión
+    #    Con el modelo entrenado sobre las cotizaciones guardadas (services/print_time_model);
+    #    mientras no haya suficientes datos se usan los factores fijos:
+    #    - fact_layer  = layer_old / layer_new
+    #    - fact_speed  = speed_old / speed_new
+    #    - fact_infill = infill_new / infill_old
+    ratio = predict_time_ratio(quote, speed_new, layer_new, infill_new, support_new, model_weight_new)
+    if ratio is None:
+        fact_layer  = layer_old / layer_new
+        fact_speed  = speed_old / speed_new
+        fact_infill = infill_new / infill_old
+        ratio = fact_layer * fact_speed * fact_infill
+    time_new = time_old * ratio
+
+    # 3) Gramos usados y desperdicio
+    grams_used_new   = model_weight_new + support_new
+    grams_wasted_new = support_new
+    waste_pct_new = grams_wasted_new / grams_used_new * 100.0
+
+    # 4) Costos
+    material_cost = grams_used_new * price_per_g
+    energy_cost   = (watts / 1000.0) * time_new * cost_kwh
+    machine_cost  = time_new * cost_per_hour
+    total_cost    = material_cost + energy_cost + machine_cost
+
+    return {
+        "print_time": time_new,
+        "grams_used": grams_used_new,
+        "grams_wasted": grams_wasted_new,
+        "waste_percentage": waste_pct_new,
+        "material_cost": material_cost,
+        "energy_cost": energy_cost,
+        "machine_cost": machine_cost,
+        "total_cost": total_cost,
+    }
+
+
 # 💡 Generación de recomendaciones inteligentes
 def generate_optimization(quote: Quote) -> Dict[str, Any]:
     """
@@ -57,53 +125,11 @@ def generate_optimization(quote: Quote) -> Dict[str, Any]:
     layer_old    = quote.model.layer_height               # mm
     infill_old   = quote.model.infill                     # %
     support_old  = quote.model.support_weight or 0.0      # g
-    model_weight = quote.model.model_weight               # g
-    time_old     = quote.model.print_time                 # h
-
-    # Precios y costos
-    price_per_g   = quote.filament.price_per_kg / 1000.0   # USD por gramo
-    cost_kwh      = quote.energy.kwh_cost                  # USD por kWh
-    watts         = quote.printer.watts                    # W
-    cost_per_hour = quote.printer.hourly_cost              # USD por hora
 
-    # Función auxiliar para calcular resultados a partir de nuevos parámetros
+    # Función auxiliar para calcular resultados (redondeados) a partir de nuevos parámetros
     def _calc_results(speed_new, layer_new, infill_new, support_new) -> Dict[str, Any]:
-        # 1) Peso de modelo nuevo (solo cambia si infill varía)
-        if infill_old > 0:
-            model_weight_new = model_weight * (infill_new / infill_old)
-        else:
-            model_weight_new = model_weight
-
-        # 2) Nuevo tiempo de impresión
-        #    - fact_layer  = layer_old / layer_new
-        #    - fact_speed  = speed_old / speed_new
-        #    - fact_infill = infill_new / infill_old (si infill_old > 0)
-        fact_layer  = layer_old / layer_new if layer_new > 0 else 1.0
-        fact_speed  = speed_old / speed_new if speed_new > 0 else 1.0
-        fact_infill = (infill_new / infill_old) if infill_old > 0 else 1.0
-        time_new = time_old * fact_layer * fact_speed * fact_infill
-
-        # 3) Gramos usados y desperdicio
-        grams_used_new   = model_weight_new + support_new
-        grams_wasted_new = support_new
-        waste_pct_new = (grams_wasted_new / grams_used_new * 100.0) if grams_used_new > 0 else 0.0
-
-        # 4) Costos
-        material_cost = grams_used_new * price_per_g
-        energy_cost   = (watts / 1000.0) * time_new * cost_kwh
-        machine_cost  = time_new * cost_per_hour
-        total_cost    = material_cost + energy_cost + machine_cost
-
-        return {
-            "print_time": round(time_new, 2),
-            "grams_used": round(grams_used_new, 2),
-            "grams_wasted": round(grams_wasted_new, 2),
-            "waste_percentage": round(waste_pct_new, 2),
-            "material_cost": round(material_cost, 2),
-            "energy_cost": round(energy_cost, 2),
-            "machine_cost": round(machine_cost, 2),
-            "total_cost": round(total_cost, 2),
-        }
+        results = evaluate_parameters(quote, speed_new, layer_new, infill_new, support_new)
+        return {key: round(value, 2) for key, value in results.items()}
 
     # --- Modo ⚡ “Rápido” ---
     speed_fast = speed_old * 1.10
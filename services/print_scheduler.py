@@ -0,0 +1,319 @@
+# backend/services/print_scheduler.py
+
+import asyncio
+import heapq
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+from core.config import settings
+from repositories import quote_repository
+from services.catalog_service import get_user_entry
+from services.quote_service import CatalogEntryNotFoundError
+
+OBJECTIVES = ("makespan", "cost")
+MAX_LOCAL_SEARCH_ITERATIONS = 2000
+LOCAL_SEARCH_TIME_BUDGET = 0.5   # segundos como máximo de mejora local (en total)
+EPS = 1e-9
+
+# Trabajo: cotización a imprimir. Máquina: una copia física de una impresora del catálogo.
+# Un trabajo solo puede ir a máquinas del mismo grupo (tipo de impresora, boquilla);
+# así cada grupo es un problema independiente.
+Job = Dict[str, Any]      # {"id", "group", "duration" (h), "kwh_cost"}
+Machine = Dict[str, Any]  # {"group", "hourly_cost", "watts", ...}
+
+
+def job_cost(job: Job, machine: Machine) -> float:
+    """Costo de máquina + energía del trabajo en esa máquina."""
+    return job["duration"] * (machine["hourly_cost"] + machine["watts"] / 1000.0 * job["kwh_cost"])
+
+
+def _lpt(durations: Sequence[float], job_ids: List[int], machine_ids: List[int], assignment: List[int], loads: List[float]) -> None:
+    """
+    List scheduling LPT: los trabajos más largos primero, cada uno a la máquina
+    menos cargada (montículo de (carga, máquina)).
+    """
+    heap = [(loads[m], m) for m in machine_ids]
+    heapq.heapify(heap)
+    for j in sorted(job_ids, key=lambda j: -durations[j]):
+        load, m = heap[0]
+        assignment[j] = m
+        loads[m] = load + durations[j]
+        heapq.heapreplace(heap, (loads[m], m))
+
+
+def _improve_makespan(durations: Sequence[float], job_ids: List[int], machine_ids: List[int],
+                      assignment: List[int], loads: List[float], deadline_at: float) -> int:
+    """
+    Búsqueda local entre la máquina más cargada y la menos cargada: mueve un trabajo o
+    intercambia dos, eligiendo el que deja ambas cargas más parejas (diferencia más cercana
+    a la mitad de la brecha). Termina cuando no hay mejora o se agota el presupuesto.
+    Retorna las iteraciones aplicadas.
+    """
+    per_machine: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+    for j in job_ids:
+        per_machine[assignment[j]].append((durations[j], j))
+    for jobs in per_machine.values():
+        jobs.sort()
+
+    applied = 0
+    for _ in range(MAX_LOCAL_SEARCH_ITERATIONS):
+        if time.perf_counter() > deadline_at:
+            break
+        hi = max(machine_ids, key=loads.__getitem__)
+        lo = min(machine_ids, key=loads.__getitem__)
+        gap = loads[hi] - loads[lo]
+        if gap <= EPS:
+            break
+        target = gap / 2
+        best_delta, best = 0.0, None  # delta = duración que pasa de hi a lo (0 < delta < gap)
+
+        hi_jobs, lo_jobs = per_machine[hi], per_machine[lo]
+        # Mover un trabajo de hi a lo
+        pos = bisect_left(hi_jobs, (target, -1))
+        for k in (pos - 1, pos):
+            if 0 <= k < len(hi_jobs):
+                d = hi_jobs[k][0]
+                if EPS < d < gap - EPS and abs(d - target) < abs(best_delta - target):
+                    best_delta, best = d, (k, None)
+        # Intercambiar a (en hi) por b (en lo) con a - b lo más cercano a target
+        for k, (a, _) in enumerate(hi_jobs):
+            pos = bisect_left(lo_jobs, (a - target, -1))
+            for q in (pos - 1, pos):
+                if 0 <= q < len(lo_jobs):
+                    d = a - lo_jobs[q][0]
+                    if EPS < d < gap - EPS and abs(d - target) < abs(best_delta - target):
+                        best_delta, best = d, (k, q)
+        if best is None:
+            break
+
+        k, q = best
+        b_item = lo_jobs.pop(q) if q is not None else None
+        a_item = hi_jobs.pop(k)
+        insort(lo_jobs, a_item)
+        assignment[a_item[1]] = lo
+        if b_item is not None:
+            insort(hi_jobs, b_item)
+            assignment[b_item[1]] = hi
+        loads[hi] -= best_delta
+        loads[lo] += best_delta
+        applied += 1
+    return applied
+
+
+def _cost_schedule(jobs: Sequence[Job], machines: Sequence[Machine], job_ids: List[int], machine_ids: List[int],
+                   assignment: List[int], loads: List[float], limit: float) -> None:
+    """
+    En orden LPT, cada trabajo va a la máquina más barata para él (un montículo de cargas por
+    clase de costo) que termine dentro de 'limit'; si ninguna cabe, a la menos cargada.
+    Luego una pasada de mejora mueve trabajos a máquinas más baratas con holgura suficiente.
+    """
+    classes: Dict[Tuple[float, float], List[Tuple[float, int]]] = defaultdict(list)
+    for m in machine_ids:
+        classes[(machines[m]["hourly_cost"], machines[m]["watts"])].append((loads[m], m))
+    for heap in classes.values():
+        heapq.heapify(heap)
+
+    def peek(heap: List[Tuple[float, int]]) -> Tuple[float, int]:
+        # Descarta entradas obsoletas (la carga de la máquina cambió desde que se insertó)
+        while heap[0][0] != loads[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def by_rate(job: Job) -> List[Tuple[float, float]]:
+        return sorted(classes, key=lambda c: c[0] + c[1] / 1000.0 * job["kwh_cost"])
+
+    def place(j: int, m: int) -> None:
+        assignment[j] = m
+        loads[m] += jobs[j]["duration"]
+        key = (machines[m]["hourly_cost"], machines[m]["watts"])
+        heapq.heappush(classes[key], (loads[m], m))
+
+    for j in sorted(job_ids, key=lambda j: -jobs[j]["duration"]):
+        d = jobs[j]["duration"]
+        target = None
+        for c in by_rate(jobs[j]):
+            load, m = peek(classes[c])
+            if load + d <= limit + EPS:
+                target = m
+                break
+        if target is None:
+            target = min((peek(classes[c]) for c in classes))[1]
+        place(j, target)
+
+    # Mejora local: trabajos más largos primero, a una clase más barata si cabe
+    for j in sorted(job_ids, key=lambda j: -jobs[j]["duration"]):
+        d, current = jobs[j]["duration"], assignment[j]
+        current_cost = job_cost(jobs[j], machines[current])
+        for c in by_rate(jobs[j]):
+            load, m = peek(classes[c])
+            if m == current or job_cost(jobs[j], machines[m]) >= current_cost - EPS:
+                break
+            if load + d <= limit + EPS:
+                loads[current] -= d
+                key = (machines[current]["hourly_cost"], machines[current]["watts"])
+                heapq.heappush(classes[key], (loads[current], current))
+                place(j, m)
+                break
+
+
+def schedule_jobs(
+    jobs: Sequence[Job],
+    machines: Sequence[Machine],
+    objective: str = "makespan",
+    max_makespan: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Asigna los trabajos a las máquinas compatibles.
+    - makespan: LPT con montículo + búsqueda local (mover / intercambiar) por grupo.
+    - cost: minimiza costo de máquina + energía sin pasar de 'max_makespan' horas
+      (por defecto, el makespan que obtiene el objetivo makespan en cada grupo).
+    Retorna la asignación (índice de máquina por trabajo, -1 si no hay máquina compatible),
+    las cargas por máquina y métricas del plan.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo desconocido: {objective}")
+    start = time.perf_counter()
+    deadline_at = start + LOCAL_SEARCH_TIME_BUDGET
+    durations = [job["duration"] for job in jobs]
+
+    groups: Dict[Any, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+    for m, machine in enumerate(machines):
+        groups[machine["group"]][1].append(m)
+    for j, job in enumerate(jobs):
+        if job["group"] in groups:
+            groups[job["group"]][0].append(j)
+
+    assignment = [-1] * len(jobs)
+    loads = [0.0] * len(machines)
+    iterations = 0
+    for job_ids, machine_ids in groups.values():
+        if not job_ids:
+            continue
+        _lpt(durations, job_ids, machine_ids, assignment, loads)
+        iterations += _improve_makespan(durations, job_ids, machine_ids, assignment, loads, deadline_at)
+        if objective == "cost":
+            limit = max_makespan if max_makespan is not None else max(loads[m] for m in machine_ids)
+            for m in machine_ids:
+                loads[m] = 0.0
+            _cost_schedule(jobs, machines, job_ids, machine_ids, assignment, loads, limit)
+
+    total_cost = sum(job_cost(jobs[j], machines[m]) for j, m in enumerate(assignment) if m >= 0)
+    return {
+        "assignment": assignment,
+        "loads": loads,
+        "makespan": max(loads, default=0.0),
+        "total_cost": total_cost,
+        "local_search_iterations": iterations,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+# ─── Planificación de las cotizaciones de un usuario ─────────────────────
+
+async def schedule_user_quotes(
+    user_id: ObjectId,
+    fleet: Sequence[Tuple[str, int]],
+    quote_ids: Optional[Sequence[str]] = None,
+    objective: str = "makespan",
+    max_makespan: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Planifica las cotizaciones del usuario (todas, o las de 'quote_ids') en una flota de
+    impresoras del catálogo: 'fleet' = [(printer_id, copias)]. Lanza CatalogEntryNotFoundError
+    si alguna impresora no es del usuario y ValueError si algún id de cotización es inválido.
+    """
+    machines: List[Machine] = []
+    for printer_id, count in fleet:
+        entry = await get_user_entry("printer", printer_id, user_id)
+        if entry is None:
+            raise CatalogEntryNotFoundError(f"printer_id {printer_id} no encontrado en el catálogo")
+        machines.extend(
+            {
+                "printer_id": str(entry["_id"]),
+                "name": entry["name"],
+                "unit": unit,
+                "group": (entry["type"], entry["nozzle"]),
+                "hourly_cost": entry["hourly_cost"],
+                "watts": entry["watts"],
+            }
+            for unit in range(1, count + 1)
+        )
+
+    try:
+        oids = [ObjectId(qid) for qid in quote_ids] if quote_ids is not None else None
+    except Exception:
+        raise ValueError("ID de cotización inválido")
+    # Se lee una de más para saber si la cuenta supera el límite sin contar en el caso común
+    limit = settings.SCHEDULE_MAX_JOBS
+    docs = await quote_repository.find_schedule_documents(user_id, oids, limit + 1)
+    total_quotes = len(docs)
+    if total_quotes > limit:
+        docs = docs[:limit]
+        total_quotes = await quote_repository.count_schedule_documents(user_id, oids)
+    jobs: List[Job] = [
+        {
+            "id": str(doc["_id"]),
+            "quote_name": doc.get("quote_name"),
+            "group": (doc["printer"]["type"], doc["printer"]["nozzle"]),
+            "duration": float(doc["model"]["print_time"]),
+            "kwh_cost": float(doc["energy"]["kwh_cost"]),
+        }
+        for doc in docs
+    ]
+
+    # CPU puro: en un hilo para no bloquear el event loop
+    result = await asyncio.to_thread(schedule_jobs, jobs, machines, objective, max_makespan)
+    return _schedule_output(jobs, machines, result, objective, total_quotes)
+
+
+def _schedule_output(jobs: Sequence[Job], machines: Sequence[Machine], result: Dict[str, Any], objective: str,
+                     total_quotes: int) -> Dict[str, Any]:
+    """Plan por máquina: trabajos en orden (más largos primero) con inicio y fin en horas."""
+    per_machine: List[List[int]] = [[] for _ in machines]
+    unassigned = []
+    for j, m in enumerate(result["assignment"]):
+        if m < 0:
+            unassigned.append(jobs[j]["id"])
+        else:
+            per_machine[m].append(j)
+
+    out_machines = []
+    for m, job_ids in enumerate(per_machine):
+        job_ids.sort(key=lambda j: -jobs[j]["duration"])
+        clock, cost, timeline = 0.0, 0.0, []
+        for j in job_ids:
+            end = clock + jobs[j]["duration"]
+            timeline.append({
+                "quote_id": jobs[j]["id"],
+                "quote_name": jobs[j]["quote_name"],
+                "start": round(clock, 4),
+                "end": round(end, 4),
+            })
+            cost += job_cost(jobs[j], machines[m])
+            clock = end
+        out_machines.append({
+            "printer_id": machines[m]["printer_id"],
+            "name": machines[m]["name"],
+            "unit": machines[m]["unit"],
+            "load": round(clock, 4),
+            "cost": round(cost, 2),
+            "jobs": timeline,
+        })
+
+    return {
+        "objective": objective,
+        "jobs": len(jobs) - len(unassigned),
+        "machines_count": len(machines),
+        "makespan": round(result["makespan"], 4),
+        "total_cost": round(result["total_cost"], 2),
+        "local_search_iterations": result["local_search_iterations"],
+        "elapsed_ms": round(result["elapsed_ms"], 1),
+        "unassigned": unassigned,
+        "truncated": total_quotes > len(jobs),
+        "total_quotes": total_quotes,
+        "machines": out_machines,
+    }
@@ -0,0 +1,257 @@
+# backend/services/print_time_model.py
+
+import asyncio
+import logging
+from datetime import datetime, UTC
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from models.print_time_model import PrintTimeModel
+from models.quote_model import Quote
+from models.enums.printer_enums import NozzleSize
+from repositories.quote_repository import iter_training_documents
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "print_time"
+TRAINING_BATCH_SIZE = 5000
+
+# log(print_time) = w0 + Σ wj * feature_j
+# En escala logarítmica los efectos multiplicativos (capa, velocidad, relleno) son lineales.
+FEATURES = (
+    "log_speed",
+    "log_layer_height",
+    "log_infill",
+    "log_nozzle",
+    "log1p_support_weight",
+    "log_model_weight",
+)
+N_COLUMNS = len(FEATURES) + 1  # + intercepto
+
+# Coeficientes activos (en memoria) y revisión con la que se entrenaron
+_coefficients: Optional[np.ndarray] = None
+_revision: int = 0
+_retrain_lock = asyncio.Lock()
+_retrain_task: Optional[asyncio.Task] = None
+
+
+def feature_columns(speed, layer, infill, nozzle, support, model_weight) -> List[Any]:
+    """
+    Columnas de features (sin intercepto). Acepta floats o arrays de NumPy.
+    """
+    return [
+        np.log(speed),
+        np.log(layer),
+        np.log(infill),
+        np.log(nozzle),
+        np.log1p(support),
+        np.log(model_weight),
+    ]
+
+
+def training_arrays(docs: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte documentos crudos en (X con columna de unos, y = log(print_time)).
+    Descarta las filas incompletas o con valores no positivos.
+    """
+    rows = []
+    for doc in docs:
+        printer, model = doc.get("printer") or {}, doc.get("model") or {}
+        try:
+            row = (
+                float(printer["speed"]),
+                float(model["layer_height"]),
+                float(model["infill"]),
+                float(printer["nozzle"]),
+                float(model.get("support_weight") or 0.0),
+                float(model["model_weight"]),
+                float(model["print_time"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+        if min(row[:4]) > 0 and row[4] >= 0 and row[5] > 0 and row[6] > 0:
+            rows.append(row)
+
+    if not rows:
+        return np.empty((0, N_COLUMNS)), np.empty(0)
+    data = np.array(rows, dtype=np.float64)
+    X = np.column_stack([np.ones(len(data))] + feature_columns(*data[:, :6].T))
+    return X, np.log(data[:, 6])
+
+
+def solve_ridge(xtx: np.ndarray, xty: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Solución cerrada de ridge: (XᵀX + αI) w = Xᵀy, sin penalizar el intercepto.
+    """
+    penalty = alpha * np.eye(len(xty))
+    penalty[0, 0] = 0.0
+    return np.linalg.solve(xtx + penalty, xty)
+
+
+def _training_rmse(w: np.ndarray, xtx: np.ndarray, xty: np.ndarray, yty: float, n: int) -> float:
+    """RMSE de entrenamiento a partir de las estadísticas suficientes (sin volver a leer los datos)."""
+    sse = yty - 2.0 * float(w @ xty) + float(w @ xtx @ w)
+    return float(np.sqrt(max(sse, 0.0) / n))
+
+
+def _activate(model: Optional[PrintTimeModel]) -> None:
+    global _coefficients, _revision
+    if model is None or model.coefficients is None:
+        _coefficients, _revision = None, 0
+    else:
+        _coefficients, _revision = np.array(model.coefficients), model.revision
+
+
+async def _load_model() -> Optional[PrintTimeModel]:
+    return await PrintTimeModel.find_one(PrintTimeModel.name == MODEL_NAME)
+
+
+async def load_print_time_model() -> None:
+    """Carga en memoria los coeficientes persistidos (si existen)."""
+    _activate(await _load_model())
+
+
+async def retrain_print_time_model(full: bool = False) -> Dict[str, Any]:
+    """
+    Reentrena el modelo de forma incremental: suma a XᵀX, Xᵀy e yᵀy solo las cotizaciones
+    con _id posterior a la última procesada y vuelve a resolver el sistema (7×7).
+    Con full=True reinicia las estadísticas (recoge ediciones y borrados de cotizaciones antiguas).
+    La lectura es asíncrona por lotes; el álgebra por lote es de microsegundos.
+    """
+    async with _retrain_lock:
+        stored = await _load_model()
+        if stored is None or full or stored.features != list(FEATURES):
+            xtx, xty, yty, n, last_id = np.zeros((N_COLUMNS, N_COLUMNS)), np.zeros(N_COLUMNS), 0.0, 0, None
+        else:
+            xtx, xty = np.array(stored.xtx), np.array(stored.xty)
+            yty, n, last_id = stored.yty, stored.n_samples, stored.last_quote_id
+        base_revision = stored.revision if stored is not None else 0
+
+        added = 0
+        cursor = iter_training_documents(last_id, TRAINING_BATCH_SIZE)
+        while True:
+            docs = await cursor.to_list(length=TRAINING_BATCH_SIZE)
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            X, y = training_arrays(docs)
+            xtx += X.T @ X
+            xty += X.T @ y
+            yty += float(y @ y)
+            n += len(y)
+            added += len(y)
+
+        if stored is not None and not added and not full:
+            _activate(stored)
+            return print_time_model_stats(stored)
+
+        coefficients, rmse_log = None, None
+        if n >= settings.PRINT_TIME_MIN_SAMPLES:
+            w = solve_ridge(xtx, xty, settings.PRINT_TIME_RIDGE_ALPHA)
+            coefficients, rmse_log = w.tolist(), _training_rmse(w, xtx, xty, yty, n)
+
+        model = PrintTimeModel(
+            name=MODEL_NAME,
+            features=list(FEATURES),
+            coefficients=coefficients,
+            xtx=xtx.tolist(),
+            xty=xty.tolist(),
+            yty=yty,
+            n_samples=n,
+            last_quote_id=last_id,
+            rmse_log=rmse_log,
+            revision=base_revision + 1,
+            trained_at=datetime.now(UTC),
+        )
+        # Escritura condicionada a la revisión leída: si otro worker entrenó antes, se usa la suya
+        document = model.model_dump(exclude={"id", "revision_id"})
+        try:
+            result = await PrintTimeModel.get_motor_collection().replace_one(
+                {"name": MODEL_NAME, "revision": base_revision}, document, upsert=True
+            )
+            saved = result.matched_count > 0 or result.upserted_id is not None
+        except DuplicateKeyError:
+            saved = False
+        if not saved:
+            model = await _load_model()
+
+        _activate(model)
+        return print_time_model_stats(model)
+
+
+def print_time_model_stats(model: Optional[PrintTimeModel] = None) -> Dict[str, Any]:
+    if model is None:
+        return {"active": _coefficients is not None, "revision": _revision}
+    return {
+        "active": model.coefficients is not None,
+        "revision": model.revision,
+        "n_samples": model.n_samples,
+        "rmse_log": model.rmse_log,
+        "features": model.features,
+        "coefficients": model.coefficients,
+        "trained_at": model.trained_at,
+    }
+
+
+def model_revision() -> int:
+    """Revisión de los coeficientes activos (0 = sin modelo, se usan los factores fijos)."""
+    return _revision
+
+
+def predict_time_ratio(quote: Quote, speed_new, layer_new, infill_new, support_new, model_weight_new):
+    """
+    Razón tiempo_nuevo / tiempo_original según el modelo: exp(f(nuevos) - f(originales)).
+    Así se conserva el tiempo real de la cotización y el modelo solo aporta el cambio relativo.
+    Retorna None si todavía no hay un modelo entrenado. Acepta floats o arrays de NumPy.
+    """
+    w = _coefficients
+    if w is None:
+        return None
+    nozzle = quote.printer.nozzle
+    # NozzleSize en una cotización; array de diámetros en una cotización apilada (batch_optimization)
+    nozzle = float(nozzle.value) if isinstance(nozzle, NozzleSize) else nozzle
+    old = feature_columns(
+        quote.printer.speed,
+        quote.model.layer_height,
+        quote.model.infill,
+        nozzle,
+        0.0 if quote.model.support_weight is None else quote.model.support_weight,
+        quote.model.model_weight,
+    )
+    new = feature_columns(speed_new, layer_new, infill_new, nozzle, support_new, model_weight_new)
+    delta = sum(wj * (fn - fo) for wj, fn, fo in zip(w[1:], new, old))
+    ratio = np.exp(delta)
+    return float(ratio) if np.ndim(ratio) == 0 else ratio
+
+
+async def _retrain_loop(interval: float) -> None:
+    while True:
+        try:
+            stats = await retrain_print_time_model()
+            logger.info(f"Print-time model revision {stats['revision']} ({stats.get('n_samples', 0)} samples)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Print-time model retraining failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_print_time_training() -> None:
+    """Lanza el reentrenamiento periódico en segundo plano (cada PRINT_TIME_RETRAIN_INTERVAL segundos)."""
+    global _retrain_task
+    if settings.PRINT_TIME_RETRAIN_INTERVAL > 0 and _retrain_task is None:
+        _retrain_task = asyncio.create_task(_retrain_loop(settings.PRINT_TIME_RETRAIN_INTERVAL))
+
+
+async def stop_print_time_training() -> None:
+    global _retrain_task
+    if _retrain_task is not None:
+        _retrain_task.cancel()
+        try:
+            await _retrain_task
+        except asyncio.CancelledError:
+            pass
+        _retrain_task = None
@@ -0,0 +1,109 @@
+# backend/services/quote_export.py
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List
+
+from bson import ObjectId
+
+from models.quote_model import Printer, Filament, Energy, ModelData, Commercial, Summary
+from repositories import quote_repository
+from services.catalog_service import resolve_quote_documents
+
+# Secciones embebidas de Quote, en el orden en que se exportan
+SECTIONS = {
+    "printer": Printer,
+    "filament": Filament,
+    "energy": Energy,
+    "model": ModelData,
+    "commercial": Commercial,
+    "summary": Summary,
+}
+
+# Columnas CSV: campos de primer nivel + "seccion.campo" para cada subdocumento
+CSV_FIELDS: List[str] = [
+    "_id",
+    "quote_name",
+    "printer_id",
+    "filament_id",
+    *[f"{section}.{field}" for section, model in SECTIONS.items() for field in model.model_fields],
+    "created_at",
+    "updated_at",
+]
+
+LIST_SEPARATOR = "|"  # para summary.suggestions en CSV
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def _iter_batches(user_id: ObjectId, batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Documentos del usuario en lotes de 'batch_size', con las referencias al catálogo
+    resueltas una vez por lote (las secciones se exportan completas).
+    """
+    batch: List[Dict[str, Any]] = []
+    async for doc in quote_repository.iter_quote_documents(user_id, batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield await resolve_quote_documents(batch)
+            batch = []
+    if batch:
+        yield await resolve_quote_documents(batch)
+
+
+def _csv_row(doc: Dict[str, Any]) -> List[Any]:
+    row = []
+    for column in CSV_FIELDS:
+        section, _, field = column.partition(".")
+        value = doc.get(section, {}).get(field) if field else doc.get(section)
+        row.append(_csv_value(value))
+    return row
+
+
+async def stream_quotes_ndjson(user_id: ObjectId, batch_size: int = 500) -> AsyncIterator[str]:
+    """
+    Serializa al vuelo las cotizaciones del usuario, una por línea (NDJSON).
+    Lee documentos crudos del cursor en lotes: la memoria no depende del total.
+    """
+    async for batch in _iter_batches(user_id, batch_size):
+        yield "\n".join(json.dumps(doc, default=_json_default, ensure_ascii=False) for doc in batch) + "\n"
+
+
+async def stream_quotes_csv(user_id: ObjectId, batch_size: int = 500) -> AsyncIterator[str]:
+    """
+    Igual que stream_quotes_ndjson, pero en CSV con columnas aplanadas (CSV_FIELDS).
+    La cabecera se envía de inmediato.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    async for batch in _iter_batches(user_id, batch_size):
+        writer.writerows(_csv_row(doc) for doc in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
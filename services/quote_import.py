@@ -0,0 +1,274 @@
+# backend/services/quote_import.py
+
+import asyncio
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime, UTC
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, IO, Iterator, List, Tuple
+
+import numpy as np
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from models.quote_model import Quote, Printer, Filament, Energy, ModelData, Commercial, Summary
+from schemas.quote_schema import QuoteCreateSchema
+from services.batch_pricing import out_of_range, price_arrays, round_column
+from services.pricing_logic import PRICING_VERSION
+from services.summary_cache import quote_input_hash
+from repositories import quote_repository
+from schemas.quote_serializer import quote_to_document
+
+IMPORT_CHUNK_SIZE = 1000   # filas validadas, cotizadas e insertadas por lote
+MAX_ERRORS_PER_CHUNK = 100 # errores detallados por lote (el conteo siempre es exacto)
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # bytes del archivo subido que se mantienen en memoria
+
+# Columnas de la exportación que no se importan (las genera el servidor)
+# (las referencias al catálogo tampoco: la exportación ya trae las secciones completas)
+IGNORED_COLUMNS = {
+    "_id", "id", "user_id", "printer_id", "filament_id", "summary", "pricing_version", "created_at", "updated_at",
+}
+
+# Columna del motor de precios -> (sección, campo); las opcionales valen 0 si faltan
+PRICING_FIELDS = {
+    "price_per_kg":    ("filament", "price_per_kg"),
+    "model_weight":    ("model", "model_weight"),
+    "support_weight":  ("model", "support_weight"),
+    "watts":           ("printer", "watts"),
+    "print_time":      ("model", "print_time"),
+    "kwh_cost":        ("energy", "kwh_cost"),
+    "hourly_cost":     ("printer", "hourly_cost"),
+    "labor":           ("commercial", "labor"),
+    "post_processing": ("commercial", "post_processing"),
+    "margin":          ("commercial", "margin"),
+    "taxes":           ("commercial", "taxes"),
+}
+
+# Una fila leída: (número de fila, datos) o (número de fila, error de lectura)
+Row = Tuple[int, Any]
+
+
+def _is_utf8(text: str) -> bool:
+    # spool_upload decodifica con surrogateescape: los bytes inválidos quedan como sustitutos
+    try:
+        text.encode("utf-8")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"JSON inválido: {name} no es un número admitido")
+
+
+def iter_ndjson_rows(text: IO[str]) -> Iterator[Row]:
+    """
+    Una cotización JSON por línea (mismo formato que QuoteCreateSchema o que la exportación NDJSON).
+    Las líneas con UTF-8 inválido, NaN o Infinity se reportan como error de su fila.
+    """
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        if not _is_utf8(line):
+            yield number, ValueError("Texto con bytes UTF-8 inválidos")
+            continue
+        try:
+            yield number, json.loads(line, parse_constant=_reject_constant)
+        except json.JSONDecodeError as e:
+            yield number, ValueError(f"JSON inválido: {e.msg}")
+        except ValueError as e:
+            yield number, e
+
+
+def iter_csv_rows(text: IO[str]) -> Iterator[Row]:
+    """
+    CSV con columnas aplanadas "seccion.campo" (mismo formato que la exportación CSV).
+    Las celdas vacías se omiten para que apliquen los valores por defecto.
+    """
+    for number, record in enumerate(csv.DictReader(text), start=1):
+        if not all(_is_utf8(cell) for cell in (*record, *record.values()) if isinstance(cell, str)):
+            yield number, ValueError("Texto con bytes UTF-8 inválidos")
+            continue
+        row: Dict[str, Any] = {}
+        for column, value in record.items():
+            if column is None or value is None or value == "":
+                continue
+            section, _, field = column.partition(".")
+            if section in IGNORED_COLUMNS:
+                continue
+            if field:
+                row.setdefault(section, {})[field] = value
+            else:
+                row[section] = value
+        yield number, row
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in e['loc']) or 'fila'}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+
+def _validate_row(raw: Any) -> Dict[str, Any]:
+    """
+    Valida una fila con QuoteCreateSchema y con las restricciones de los subdocumentos de Quote.
+    """
+    if isinstance(raw, Exception):
+        raise raw
+    data = QuoteCreateSchema.model_validate(raw)
+    return {
+        "quote_name": data.quote_name,
+        "printer": Printer(**data.printer.model_dump()),
+        "filament": Filament(**data.filament.model_dump()),
+        "energy": Energy(**data.energy.model_dump()),
+        "model": ModelData(**data.model.model_dump()),
+        "commercial": Commercial(**data.commercial.model_dump()),
+    }
+
+
+def _pricing_arrays(sections: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    return {
+        name: np.array([getattr(s[section], field) or 0.0 for s in sections], dtype=np.float64)
+        for name, (section, field) in PRICING_FIELDS.items()
+    }
+
+
+def _summaries(arrays: Dict[str, np.ndarray]) -> List[Summary]:
+    """
+    Calcula los resúmenes de todo el lote con el motor vectorizado
+    (mismos números que calculate_quote_summary).
+    """
+    results = price_arrays(arrays)
+    rounded = {
+        key: round_column(results[key])
+        for key in ("estimated_total_cost", "grams_used", "grams_wasted", "waste_percentage")
+    }
+    return [
+        Summary(**{key: values[i] for key, values in rounded.items()}, suggestions=[])
+        for i in range(len(rounded["estimated_total_cost"]))
+    ]
+
+
+def _validate_chunk(chunk: List[Row]) -> Tuple[List[Dict[str, Any]], List[int], List[Summary], List[Dict[str, Any]]]:
+    """
+    Valida las filas del lote y cotiza las válidas.
+    Retorna (secciones, números de fila, resúmenes, errores por fila).
+    Una fila con entradas fuera de los límites del motor de precios (o no finitas)
+    se reporta como error de su fila y no impide cotizar el resto.
+    """
+    errors: List[Dict[str, Any]] = []
+    valid_rows: List[int] = []
+    sections: List[Dict[str, Any]] = []
+    for number, raw in chunk:
+        try:
+            sections.append(_validate_row(raw))
+            valid_rows.append(number)
+        except (ValidationError, ValueError, TypeError) as e:
+            errors.append({"row": number, "error": _error_message(e)})
+    if not sections:
+        return sections, valid_rows, [], errors
+
+    arrays = _pricing_arrays(sections)
+    invalid = np.zeros(len(sections), dtype=bool)
+    for name, arr in arrays.items():
+        bad = out_of_range(name, arr)
+        section, field = PRICING_FIELDS[name]
+        errors.extend(
+            {"row": valid_rows[i], "error": f"{section}.{field}: valor fuera de rango"}
+            for i in np.flatnonzero(bad & ~invalid).tolist()
+        )
+        invalid |= bad
+    if invalid.any():
+        keep = np.flatnonzero(~invalid).tolist()
+        sections = [sections[i] for i in keep]
+        valid_rows = [valid_rows[i] for i in keep]
+        arrays = {name: arr[~invalid] for name, arr in arrays.items()}
+        errors.sort(key=lambda err: err["row"])
+
+    summaries = _summaries(arrays) if sections else []
+    return sections, valid_rows, summaries, errors
+
+
+def _prepare_chunk(user_id: ObjectId, rows: Iterator[Row], chunk_size: int) -> Dict[str, Any]:
+    """
+    Lee el siguiente lote, lo valida y calcula sus resúmenes.
+    Es trabajo de CPU/disco: se ejecuta en un hilo para no bloquear el event loop.
+    """
+    chunk = list(islice(rows, chunk_size))
+    sections, valid_rows, summaries, errors = _validate_chunk(chunk)
+
+    now = datetime.now(UTC)
+    quotes = [
+        Quote(user_id=user_id, **s, summary=summary, input_hash=quote_input_hash(s),
+              pricing_version=PRICING_VERSION,
+              created_at=now, updated_at=now)
+        for s, summary in zip(sections, summaries)
+    ]
+    return {"processed": len(chunk), "quotes": quotes, "rows": valid_rows, "errors": errors}
+
+
+async def _insert_chunk(prepared: Dict[str, Any]) -> int:
+    """
+    Inserta el lote con insert_many desordenado; los fallos de escritura
+    se agregan a los errores por fila. Devuelve cuántas se insertaron.
+    """
+    quotes = prepared["quotes"]
+    if not quotes:
+        return 0
+    try:
+        await quote_repository.insert_quote_documents([quote_to_document(q) for q in quotes], ordered=False)
+        return len(quotes)
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        prepared["errors"].extend(
+            {"row": prepared["rows"][w["index"]], "error": w.get("errmsg", "Error de escritura")}
+            for w in write_errors
+        )
+        prepared["errors"].sort(key=lambda err: err["row"])
+        return e.details.get("nInserted", len(quotes) - len(write_errors))
+
+
+async def spool_upload(chunks: AsyncIterator[bytes]) -> IO[str]:
+    """
+    Guarda el cuerpo de la petición en un archivo temporal (en memoria hasta
+    SPOOL_MAX_MEMORY, luego en disco) para procesarlo por lotes con memoria acotada.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    # surrogateescape: un byte inválido no aborta la lectura, se reporta como error de su fila
+    return io.TextIOWrapper(spool, encoding="utf-8", errors="surrogateescape", newline="")
+
+
+async def import_quotes(
+    user_id: ObjectId,
+    rows: Iterator[Row],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> AsyncIterator[str]:
+    """
+    Importa cotizaciones por lotes y emite el progreso como NDJSON:
+    una línea {"event": "progress", ...} por lote y una línea final {"event": "done", ...}.
+    Las filas inválidas se reportan sin detener la importación.
+    """
+    totals = {"processed": 0, "inserted": 0, "failed": 0}
+    while True:
+        prepared = await asyncio.to_thread(_prepare_chunk, user_id, rows, chunk_size)
+        if not prepared["processed"]:
+            break
+        inserted = await _insert_chunk(prepared)
+        totals["processed"] += prepared["processed"]
+        totals["inserted"] += inserted
+        totals["failed"] += len(prepared["errors"])
+        yield json.dumps({
+            "event": "progress",
+            **totals,
+            "errors": prepared["errors"][:MAX_ERRORS_PER_CHUNK],
+        }, ensure_ascii=False) + "\n"
+
+    yield json.dumps({"event": "done", **totals}) + "\n"
@@ -1,124 +1,329 @@
-from typing import List, Optional
-from schemas.quote_schema import QuoteCreateSchema, QuoteUpdateSchema
-from models.quote_model import Quote, Printer, Filament, Energy, ModelData, Commercial, Summary
+from typing import Any, Dict, List, Optional
+from schemas.quote_schema import QuoteCreateSchema, QuoteUpdateSchema, PrinterSchema, FilamentSchema
+from schemas.quote_patch_schema import QuotePatchSchema
+from models.quote_model import Quote, Printer, Filament, Energy, ModelData, Commercial
 from repositories import quote_repository
 from bson import ObjectId
 from datetime import datetime, UTC
 
-from services.pricing_logic import calculate_quote_summary, generate_optimization
+from services.summary_cache import memoized_quote_summary
+from services.pricing_logic import PRICING_VERSION
+from services.batch_pricing import INPUT_PATHS, price_summary
+from services.optimization_cache import invalidate_quote_optimizations
+from services.catalog_service import (
+    CATALOGS, get_user_entry, merge_catalog_fields, strip_catalog_fields, resolve_quote_documents,
+    current_catalog_version,
+)
+from core.pagination import encode_cursor, decode_cursor
+from core.etag import PreconditionFailedError, now_millis, updated_at_etag, derived_etag
+from core.metrics import span
+
+from schemas.quote_serializer import quote_document_to_dict, quote_to_document
+
+
+# Intentos de un PATCH de costo si otra escritura cambia la cotización entre la lectura y el $set
+PATCH_RETRIES = 3
+
+
+class CatalogEntryNotFoundError(Exception):
+    """printer_id o filament_id no corresponde a una entrada del catálogo del usuario."""
+
+
+class CatalogFieldPatchError(Exception):
+    """El PATCH modifica un campo que la cotización toma de su entrada del catálogo."""
+
+
+# Esquema completo de cada sección que puede venir del catálogo
+CATALOG_SECTION_SCHEMAS = {"printer": PrinterSchema, "filament": FilamentSchema}
+
+
+async def apply_catalog_references(data, user_id: ObjectId):
+    """
+    Completa las secciones printer/filament con las especificaciones de las entradas
+    referenciadas (printer_id / filament_id). Retorna (datos completos, {campo_ref: ObjectId}).
+    Lanza CatalogEntryNotFoundError si alguna referencia no es del usuario.
+    """
+    refs: Dict[str, ObjectId] = {}
+    updates: Dict[str, Any] = {}
+    for section, (_, ref_field, _) in CATALOGS.items():
+        entry_id = getattr(data, ref_field)
+        if not entry_id:
+            continue
+        entry = await get_user_entry(section, entry_id, user_id)
+        if entry is None:
+            raise CatalogEntryNotFoundError(f"{ref_field} no encontrado en el catálogo")
+        values = getattr(data, section).model_dump(mode="json")
+        updates[section] = CATALOG_SECTION_SCHEMAS[section](**merge_catalog_fields(section, entry, values))
+        refs[ref_field] = entry["_id"]
+    return (data.model_copy(update=updates) if updates else data), refs
+
 
-from schemas.quote_schema import QuoteOutSchema
 # Crear cotización con cálculo de resumen
 async def create_quote(user_id: str, data: QuoteCreateSchema) -> Quote:
-    # Cálculo de resumen (puede ir mejorando luego)
-    # Cálculo real del resumen técnico
-    summary_data = calculate_quote_summary(data)
-    # Generación de recomendaciones inteligentes (si decides guardarlas)
-    optimization = generate_optimization(summary_data, data)
-    summary_data["suggestions"] = optimization["recommendation_summary"]
-
-    # Convertir dict a objeto Summary
-    summary_obj = Summary(**summary_data)
-    quote = Quote(
-        user_id=ObjectId(user_id),
-        quote_name=data.quote_name,
-        printer=Printer(**data.printer.model_dump()),
-        filament=Filament(**data.filament.model_dump()),
-        energy=Energy(**data.energy.model_dump()),
-        model=ModelData(**data.model.model_dump()),
-        commercial=Commercial(**data.commercial.model_dump()),
-        summary=summary_obj,
-        created_at=datetime.now(UTC),
-        updated_at=datetime.now(UTC)
-    )
-    await quote.insert() # problema interno de ide que no detecta metodos asincronos beanie
-    #return quote
-    #return QuoteOutSchema.model_validate(quote)
-    return QuoteOutSchema(
-        id=str(quote.id),
-        user_id=str(quote.user_id),
-        quote_name=quote.quote_name,
-        printer=quote.printer.model_dump(),
-        filament=quote.filament.model_dump(),
-        energy=quote.energy.model_dump(),
-        model=quote.model.model_dump(),
-        commercial=quote.commercial.model_dump(),
-        summary=quote.summary.model_dump(),
-        created_at=quote.created_at,
-        updated_at=quote.updated_at
-    )
-
-# Obtener cotización por ID (usada en GET o validación de propietario)
-async def get_quote_by_id(quote_id: str) -> Optional[Quote]:
-    return await quote_repository.get_quote_by_id(quote_id)
-
-
-# Obtener todas las cotizaciones del usuario actual
-async def get_user_quotes(user_id: ObjectId) -> List[Quote]:
-    quotes = await quote_repository.get_quotes_by_user(user_id)
-    return [
-        QuoteOutSchema(
-            id=str(q.id),
-            user_id=str(q.user_id),
-            quote_name=q.quote_name,
-            printer=q.printer.model_dump(),
-            filament=q.filament.model_dump(),
-            energy=q.energy.model_dump(),
-            model=q.model.model_dump(),
-            commercial=q.commercial.model_dump(),
-            summary=q.summary.model_dump(),
-            created_at=q.created_at,
-            updated_at=q.updated_at
+    with span("catalog_resolve"):
+        data, refs = await apply_catalog_references(data, ObjectId(user_id))
+    # Cálculo real del resumen técnico (memoizado por hash de las entradas)
+    with span("calculate_quote_summary"):
+        input_hash, summary_obj = memoized_quote_summary(data)
+    # generate_optimization recibe un Quote y no retorna "recommendation_summary",
+    # así que las sugerencias quedan como las deja calculate_quote_summary.
+    with span("quote_build"):
+        quote = Quote(
+            user_id=ObjectId(user_id),
+            quote_name=data.quote_name,
+            **refs,
+            printer=Printer(**data.printer.model_dump()),
+            filament=Filament(**data.filament.model_dump()),
+            energy=Energy(**data.energy.model_dump()),
+            model=ModelData(**data.model.model_dump()),
+            commercial=Commercial(**data.commercial.model_dump()),
+            summary=summary_obj,
+            input_hash=input_hash,
+            pricing_version=PRICING_VERSION,
+            created_at=datetime.now(UTC),
+            updated_at=datetime.now(UTC)
         )
-        for q in quotes
-    ]
+    with span("quote_insert"):
+        # Si referencia el catálogo, se guarda sin los campos que ya están en la entrada
+        quote.id = await quote_repository.insert_quote_document(strip_catalog_fields(quote_to_document(quote)))
+    # Se retorna el documento; el endpoint lo serializa una sola vez con quote_to_dict
+    return quote
+
+# Obtener una cotización del usuario (None si no existe o no es suya)
+async def get_owned_quote(quote_id: str, user_id: ObjectId) -> Optional[Quote]:
+    doc = await get_owned_quote_document(quote_id, user_id)
+    if doc is None:
+        return None
+    return await quote_from_document(doc)
+
+
+# Documento crudo de la cotización del usuario, sin resolver el catálogo
+# (basta para el ETag: si el cliente ya la tiene, no se construye nada más)
+async def get_owned_quote_document(quote_id: str, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    try:
+        oid = ObjectId(quote_id)
+    except Exception:
+        return None
+    return await quote_repository.get_owned_quote(oid, user_id)
+
+
+async def quote_from_document(doc: Dict[str, Any]) -> Quote:
+    await resolve_quote_documents([doc])
+    return Quote.model_validate(doc)
+
+
+async def quote_document_output(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Documento crudo -> dict de salida (con las referencias al catálogo resueltas)."""
+    with span("catalog_resolve"):
+        await resolve_quote_documents([doc])
+    return quote_document_to_dict(doc)
+
+
+async def quote_etag(doc: Dict[str, Any]) -> str:
+    """ETag de la cotización (incluye la versión del catálogo si lo referencia)."""
+    if any(doc.get(ref_field) is not None for _, ref_field, _ in CATALOGS.values()):
+        return updated_at_etag(doc["updated_at"], await current_catalog_version())
+    return updated_at_etag(doc["updated_at"])
+
+
+async def get_user_quotes_etag(user_id: ObjectId) -> str:
+    """
+    ETag del listado: última escritura y cantidad de cotizaciones del usuario (una eliminación
+    cambia la cantidad) y la versión del catálogo (nombres de las entradas referenciadas).
+    """
+    latest, count = await quote_repository.get_quotes_version(user_id)
+    return derived_etag(latest, count, f"c{await current_catalog_version()}")
+
 
+# Obtener una página de cotizaciones del usuario actual
+async def get_user_quotes(user_id: ObjectId, limit: int = 50, after: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Pagina por (created_at, _id): memoria y latencia dependen solo de 'limit'.
+    'after' es el next_cursor de la página anterior (lanza InvalidCursorError si es inválido).
+    """
+    position = decode_cursor(after) if after else None
+    docs = await quote_repository.get_quotes_page(user_id, limit, position)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["created_at"], last["_id"])
+
+    # Referencias al catálogo: una consulta por colección para toda la página (o ninguna, si están en caché)
+    with span("catalog_resolve"):
+        await resolve_quote_documents(docs)
+
+    # Documentos crudos -> dicts de salida, sin construir Quote ni QuoteOutSchema por fila
+    items = [quote_document_to_dict(doc) for doc in docs]
+    return {"items": items, "next_cursor": next_cursor}
 
-# Editar una cotización
-async def update_quote(quote_id: str, data: QuoteUpdateSchema) -> Optional[Quote]:
+
+# Editar una cotización (reemplaza todas las secciones)
+async def update_quote(quote_id: str, user_id: ObjectId, data: QuoteUpdateSchema) -> Optional[Dict[str, Any]]:
     """
     1) Convierte quote_id a ObjectId
-    2) Obtiene la cotización (Quote) con Beanie
-    3) Asigna cada sección del payload a la instancia
-    3.1) Recalcula el summary
-    4) Actualiza updated_at y salva con .save()
-    5) Retorna la instancia actualizada (o None si no existe)
+    2) Completa las secciones referenciadas al catálogo, valida cada sección con los modelos
+       y recalcula el summary
+    3) Un solo find_one_and_update filtrado por _id + propietario ($set de las secciones + updated_at;
+       las referencias que no se envían se eliminan con $unset)
+    4) Retorna el documento actualizado como dict de salida (o None si no existe o no es del usuario)
     """
     try:
         oid = ObjectId(quote_id)
     except Exception:
         return None
 
-    # 1) Traer la cotización (instancia de Quote) por su _id
-    quote_obj = await Quote.get(oid)
-    if not quote_obj:
+    # 2) Validar secciones (mismas restricciones que al crear) y recalcular el summary
+    data, refs = await apply_catalog_references(data, user_id)
+    input_hash, summary = memoized_quote_summary(data)
+    payload = data.model_dump()
+    fields = {
+        "quote_name": payload["quote_name"],
+        **refs,
+        "printer": Printer(**payload["printer"]).model_dump(mode="json"),
+        "filament": Filament(**payload["filament"]).model_dump(mode="json"),
+        "energy": Energy(**payload["energy"]).model_dump(mode="json"),
+        "model": ModelData(**payload["model"]).model_dump(mode="json"),
+        "commercial": Commercial(**payload["commercial"]).model_dump(mode="json"),
+        "summary": summary.model_dump(mode="json"),
+        "input_hash": input_hash,
+        "pricing_version": PRICING_VERSION,
+        "updated_at": now_millis(),
+    }
+
+    # 3) Escribir en un solo viaje
+    update: Dict[str, Any] = {"$set": strip_catalog_fields(fields)}
+    unset = {ref_field: "" for _, ref_field, _ in CATALOGS.values() if ref_field not in refs}
+    if unset:
+        update["$unset"] = unset
+    doc = await quote_repository.update_owned_quote(oid, user_id, update)
+    if doc is None:
         return None
 
-    # 2) Convertir el payload a dict
-    payload = data.model_dump()
+    # 4) Las optimizaciones en caché de esta cotización quedan obsoletas
+    invalidate_quote_optimizations(quote_id)
+    await resolve_quote_documents([doc])
+    return quote_document_to_dict(doc)
 
-    # 3) Asignar valores uno a uno
-    quote_obj.quote_name = payload["quote_name"]
-    quote_obj.printer    = Printer(**payload["printer"])
-    quote_obj.filament   = Filament(**payload["filament"])
-    quote_obj.energy     = Energy(**payload["energy"])
-    quote_obj.model      = ModelData(**payload["model"])
-    quote_obj.commercial = Commercial(**payload["commercial"])
+# Actualización parcial (PATCH)
+async def _check_catalog_fields(oid: ObjectId, user_id: ObjectId, catalog_paths: Dict[str, List[str]]) -> None:
+    """
+    Lanza CatalogFieldPatchError si la cotización referencia la entrada del catálogo de alguno
+    de los campos enviados ('catalog_paths': campo de referencia -> rutas del PATCH).
+    """
+    if not catalog_paths:
+        return
+    refs = await quote_repository.get_owned_catalog_refs(oid, user_id)
+    if refs is None:
+        return
+    locked = [path for ref_field, paths in catalog_paths.items() if refs.get(ref_field) is not None for path in paths]
+    if locked:
+        raise CatalogFieldPatchError(
+            f"{', '.join(locked)}: la cotización lo toma del catálogo; modifique la entrada del catálogo"
+        )
 
-    # 3.1) Recalcular el summary usando calculate_quote_summary(data)
-    summary_data = calculate_quote_summary(data)
-    # Ya no intentamos generar “recommendation_summary” porque generate_optimization
-    # no retorna esa clave en este proyecto.
-    quote_obj.summary = Summary(**summary_data)
 
-    # 4) Actualizar fecha de modificación
-    quote_obj.updated_at = datetime.now(UTC)
+async def patch_quote(
+    quote_id: str,
+    user_id: ObjectId,
+    data: QuotePatchSchema,
+    expected_updated_at: Optional[List[datetime]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    $set de los campos enviados + updated_at en un find_one_and_update. Si cambia algún campo
+    de costo, el resumen se recalcula en Python (price_summary, la misma fórmula que el resto)
+    con las entradas guardadas y las enviadas, y el $set se condiciona al updated_at leído;
+    si otra escritura se adelanta, se vuelve a leer (hasta PATCH_RETRIES veces).
+    Retorna el documento actualizado como dict de salida, None si no existe o no es del usuario,
+    y lanza PreconditionFailedError si existe pero updated_at no coincide con If-Match.
+    Lanza CatalogFieldPatchError si modifica un campo que solo guarda el catálogo (p.ej.
+    printer.name) y la cotización referencia esa entrada (printer_id / filament_id).
+    """
+    try:
+        oid = ObjectId(quote_id)
+    except Exception:
+        return None
+
+    fields = data.to_set_fields()
+    if any(path != "quote_name" for path in fields):
+        # Las entradas cambiaron: el hash guardado ya no las describe
+        fields["input_hash"] = None
+    # Campos que solo guarda el catálogo: se aceptan únicamente si la cotización no referencia
+    # la entrada (si no, al leer se reemplazarían por los del catálogo)
+    catalog_paths = {
+        ref_field: [f"{section}.{field}" for field in catalog_only if f"{section}.{field}" in fields]
+        for section, (_, ref_field, catalog_only) in CATALOGS.items()
+    }
+    catalog_paths = {ref_field: paths for ref_field, paths in catalog_paths.items() if paths}
+
+    if not data.changes_cost():
+        fields["updated_at"] = now_millis()
+        doc = await quote_repository.update_owned_quote(
+            oid, user_id, {"$set": fields}, expected_updated_at, unreferenced=catalog_paths
+        )
+    else:
+        for _ in range(PATCH_RETRIES):
+            current = await quote_repository.get_owned_pricing_inputs(oid, user_id, expected_updated_at)
+            if current is None:
+                doc = None
+                break
+            values = {
+                name: fields.get(f"{section}.{field}", (current.get(section) or {}).get(field))
+                for name, (section, field) in INPUT_PATHS.items()
+            }
+            summary = price_summary(values)
+            update = {"$set": {
+                **fields,
+                **{f"summary.{key}": value for key, value in summary.items()},
+                "pricing_version": PRICING_VERSION,
+                "updated_at": now_millis(),
+            }}
+            doc = await quote_repository.update_owned_quote(
+                oid, user_id, update, [current["updated_at"]], unreferenced=catalog_paths
+            )
+            if doc is not None:
+                break
+            await _check_catalog_fields(oid, user_id, catalog_paths)
+        else:
+            raise PreconditionFailedError("La cotización fue modificada por otra petición")
 
-    # 5) Guardar cambios
-    await quote_obj.save()
+    if doc is None:
+        await _check_catalog_fields(oid, user_id, catalog_paths)
+        if expected_updated_at is not None and await quote_repository.owned_quote_exists(oid, user_id):
+            raise PreconditionFailedError("La cotización fue modificada por otra petición")
+        return None
+
+    invalidate_quote_optimizations(quote_id)
+    await resolve_quote_documents([doc])
+    return quote_document_to_dict(doc)
 
-    return quote_obj
+# Cotizaciones del usuario con las mismas entradas que quote_id (índice user_id + input_hash)
+async def get_duplicate_quotes(quote_id: str, user_id: ObjectId, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+    """
+    Retorna None si la cotización no existe o no es del usuario. Las cotizaciones modificadas
+    con PATCH dejan de tener hash hasta el siguiente PUT, así que no aparecen como duplicadas.
+    """
+    try:
+        oid = ObjectId(quote_id)
+    except Exception:
+        return None
+    input_hash = await quote_repository.get_owned_input_hash(oid, user_id)
+    if input_hash is None:
+        return None
+    if not input_hash:
+        return []
+    docs = await quote_repository.find_quotes_by_input_hash(user_id, input_hash, exclude_id=oid, limit=limit)
+    await resolve_quote_documents(docs)
+    return [quote_document_to_dict(doc) for doc in docs]
 
 # Eliminar una cotización
-async def delete_quote(quote_id: str) -> bool:
-    return await quote_repository.delete_quote(quote_id)
\ No newline at end of file
+async def delete_quote(quote_id: str, user_id: ObjectId) -> bool:
+    try:
+        oid = ObjectId(quote_id)
+    except Exception:
+        return False
+    deleted = await quote_repository.delete_owned_quote(oid, user_id)
+    if deleted:
+        invalidate_quote_optimizations(quote_id)
+    return deleted
\ No newline at end of file
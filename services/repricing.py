@@ -0,0 +1,277 @@
+# backend/services/repricing.py
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from core.config import settings
+from core.etag import now_millis
+from repositories import catalog_repository, job_repository, quote_repository
+from services.batch_pricing import INPUT_PATHS, SUMMARY_FIELDS, price_arrays, round_column
+from services.pricing_logic import PRICING_VERSION
+
+logger = logging.getLogger(__name__)
+
+JOB_ID = "repricing"
+
+# Identifica a este proceso en el lease del trabajo
+_owner = f"{socket.gethostname()}:{os.getpid()}"
+_run_lock = asyncio.Lock()
+_loop_task: Optional[asyncio.Task] = None
+_run_task: Optional[asyncio.Task] = None
+
+
+def reprice_chunk(docs: List[Dict[str, Any]], updated_at) -> Tuple[List[UpdateOne], int, int]:
+    """
+    Recalcula el summary del lote con la fórmula vectorizada (mismos números que
+    calculate_quote_summary). Retorna (operaciones, resúmenes distintos, cotizaciones sin resumen válido).
+    Cada escritura se condiciona al updated_at leído: si el usuario editó la cotización entre
+    medias, no se pisa (su edición ya trae el resumen de la versión actual o se recotiza en la
+    siguiente pasada). Solo se modifica updated_at si el resumen cambió. Las cotizaciones sin
+    resumen válido se marcan con -PRICING_VERSION para que la siguiente pasada no las relea.
+    """
+    arrays = {
+        name: np.array([float(doc[section].get(field) or 0.0) for doc in docs], dtype=np.float64)
+        for name, (section, field) in INPUT_PATHS.items()
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        results = price_arrays(arrays)
+    # Sin gramos usados calculate_quote_summary reporta 0 % de desecho
+    results["waste_percentage"] = np.where(arrays["model_weight"] + arrays["support_weight"] > 0,
+                                           results["waste_percentage"], 0.0)
+    valid = np.isfinite(results["estimated_total_cost"]).tolist()
+    rounded = {key: round_column(results[key]) for key in SUMMARY_FIELDS}
+
+    operations: List[UpdateOne] = []
+    changed = failed = 0
+    for i, doc in enumerate(docs):
+        if not valid[i]:
+            failed += 1
+            operations.append(UpdateOne({"_id": doc["_id"], "updated_at": doc["updated_at"]},
+                                        {"$set": {"pricing_version": -PRICING_VERSION}}))
+            continue
+        fields: Dict[str, Any] = {"pricing_version": PRICING_VERSION}
+        summary = doc.get("summary") or {}
+        if any(summary.get(key) != rounded[key][i] for key in SUMMARY_FIELDS):
+            fields.update({f"summary.{key}": rounded[key][i] for key in SUMMARY_FIELDS})
+            fields["updated_at"] = updated_at
+            changed += 1
+        operations.append(UpdateOne({"_id": doc["_id"], "updated_at": doc["updated_at"]}, {"$set": fields}))
+    return operations, changed, failed
+
+
+async def _next_stale_version(after: Optional[int]) -> Optional[int]:
+    """Siguiente versión vieja presente (ascendente) después de 'after'; None si no quedan."""
+    versions = await quote_repository.find_stale_pricing_versions(PRICING_VERSION)
+    return next((v for v in versions if after is None or v > after), None)
+
+
+async def _next_stale_chunk(progress: Dict[str, Any], chunk_size: int) -> List[Dict[str, Any]]:
+    """
+    Siguiente lote de la pasada en orden (versión vieja, _id): agotada una versión
+    sigue con la siguiente desde el principio. Actualiza 'stale_version' y 'last_id'.
+    """
+    while progress["stale_version"] is not None:
+        docs = await quote_repository.find_stale_pricing_documents(
+            progress["stale_version"], progress["last_id"], chunk_size,
+        )
+        if docs:
+            return docs
+        progress["stale_version"] = await _next_stale_version(progress["stale_version"])
+        progress["last_id"] = None
+    return []
+
+
+def _lease_until():
+    return now_millis() + timedelta(seconds=settings.REPRICING_LEASE_SECONDS)
+
+
+async def _throttle(start: float, done: int) -> None:
+    # Limita la ejecución a REPRICING_MAX_RATE cotizaciones por segundo (0 = sin límite)
+    if settings.REPRICING_MAX_RATE > 0:
+        ahead = done / settings.REPRICING_MAX_RATE - (time.monotonic() - start)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+
+async def apply_cost_changes(chunk_size: int, start: float, done: int = 0) -> Optional[int]:
+    """
+    Vacía la cola de costos del catálogo modificados (en orden): copia cada nuevo valor en las
+    cotizaciones que seguían con el anterior, por lotes de chunk_size, y las deja con
+    pricing_version 0 para la pasada de re-cotización. Un cambio sale de la cola cuando ya no
+    quedan cotizaciones por actualizar, así que una ejecución interrumpida se retoma donde quedó.
+    Retorna el total de cotizaciones de esta ejecución (para el límite de velocidad) o None si
+    se perdió el lease.
+    """
+    while True:
+        change = await catalog_repository.next_cost_change()
+        if change is None:
+            return done
+        while True:
+            ids = await catalog_repository.find_cost_change_targets(change, chunk_size)
+            if not ids:
+                break
+            await catalog_repository.apply_cost_change(change, ids, now_millis())
+            if not await job_repository.save_job_progress(JOB_ID, _owner, {}, _lease_until()):
+                return None
+            done += len(ids)
+            await _throttle(start, done)
+        await catalog_repository.delete_cost_change(change["_id"])
+
+
+async def run_repricing(chunk_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Una pasada de re-cotización: primero aplica los costos del catálogo pendientes
+    (apply_cost_changes) y luego recorre por lotes las cotizaciones con otra versión de la
+    fórmula, una versión vieja por vez (keyset sobre (pricing_version, _id), índice
+    pricing_version_id sin SORT en memoria), y escribe cada lote con un bulk_write.
+    - Reanudable: el progreso (versión y último _id, contadores) se guarda tras cada lote; si el proceso
+      se detiene, la siguiente ejecución continúa desde ahí.
+    - Un solo proceso a la vez: lease en background_jobs, renovado en cada lote.
+    - Limitada a REPRICING_MAX_RATE cotizaciones por segundo (0 = sin límite).
+    Memoria constante: solo se mantiene un lote de documentos.
+    """
+    chunk_size = chunk_size or settings.REPRICING_CHUNK_SIZE
+    async with _run_lock:
+        state = await job_repository.acquire_job_lease(JOB_ID, _owner, now_millis(), _lease_until())
+        if state is None:
+            return {**(await repricing_status()), "acquired": False}
+        try:
+            progress = {key: value for key, value in state.items() if key not in ("_id", "owner", "lease_until")}
+            start = time.monotonic()
+            done = await apply_cost_changes(chunk_size, start)  # cotizaciones de esta ejecución
+            if done is None:
+                logger.warning("Repricing lease lost; another worker continues the pass")
+                return {**progress, "acquired": False}
+
+            if (progress.get("status") != "running" or progress.get("pricing_version") != PRICING_VERSION
+                    or "stale_version" not in progress):
+                # Pasada nueva (la anterior terminó o cambió la versión de la fórmula);
+                # si no hay nada pendiente se conserva el reporte de la anterior
+                stale_version = await _next_stale_version(None)
+                if stale_version is None:
+                    await job_repository.release_job_lease(JOB_ID, _owner, {})
+                    return progress
+                progress = {
+                    "pricing_version": PRICING_VERSION,
+                    "status": "running",
+                    "stale_version": stale_version,  # versión vieja que se está recorriendo
+                    "last_id": None,
+                    "processed": 0,   # cotizaciones leídas
+                    "updated": 0,     # escritas (versión actual o marcadas como fallidas)
+                    "changed": 0,     # con un resumen distinto al guardado
+                    "skipped": 0,     # editadas por el usuario durante la pasada
+                    "failed": 0,      # con entradas que no permiten calcular el resumen
+                    "started_at": now_millis(),
+                    "finished_at": None,
+                }
+
+            while True:
+                docs = await _next_stale_chunk(progress, chunk_size)
+                if not docs:
+                    break
+                operations, changed, failed = await asyncio.to_thread(reprice_chunk, docs, now_millis())
+                matched = await quote_repository.bulk_update_quotes(operations)
+
+                progress["last_id"] = docs[-1]["_id"]
+                progress["processed"] += len(docs)
+                progress["updated"] += matched
+                progress["changed"] += changed
+                progress["skipped"] += len(operations) - matched
+                progress["failed"] += failed
+                progress["progress_at"] = now_millis()
+                if not await job_repository.save_job_progress(JOB_ID, _owner, progress, _lease_until()):
+                    logger.warning("Repricing lease lost; another worker continues the pass")
+                    return {**progress, "acquired": False}
+
+                done += len(docs)
+                await _throttle(start, done)
+        except BaseException:
+            # El progreso ya guardado permite reanudar la pasada en la próxima ejecución
+            await job_repository.release_job_lease(JOB_ID, _owner, {})
+            raise
+
+        progress["status"] = "done"
+        progress["finished_at"] = now_millis()
+        await job_repository.release_job_lease(JOB_ID, _owner, progress)
+        logger.info(
+            f"Repricing to version {PRICING_VERSION}: {progress['processed']} quotes "
+            f"({progress['changed']} changed, {progress['skipped']} skipped, {progress['failed']} failed)"
+        )
+        return progress
+
+
+async def repricing_status() -> Dict[str, Any]:
+    """Progreso de la última pasada y cuántas cotizaciones siguen pendientes."""
+    state = await job_repository.get_job_state(JOB_ID) or {}
+    state.pop("_id", None)
+    if state.get("last_id") is not None:
+        state["last_id"] = str(state["last_id"])
+    return {
+        **state,
+        "current_pricing_version": PRICING_VERSION,
+        "pending": await quote_repository.count_stale_pricing(PRICING_VERSION),
+        "failed_quotes": await quote_repository.count_failed_pricing(PRICING_VERSION),
+        "pending_cost_changes": await catalog_repository.count_cost_changes(),
+        "running_here": _run_lock.locked(),
+    }
+
+
+def start_repricing_run() -> bool:
+    """Lanza una pasada en segundo plano en este proceso; False si ya hay una en curso."""
+    global _run_task
+    if _run_lock.locked() or (_run_task is not None and not _run_task.done()):
+        return False
+    _run_task = asyncio.create_task(run_repricing())
+    return True
+
+
+async def _repricing_loop(interval: float) -> None:
+    while True:
+        try:
+            await run_repricing()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Repricing failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_repricing_job() -> None:
+    """Busca cotizaciones pendientes de re-cotizar cada REPRICING_INTERVAL segundos."""
+    global _loop_task
+    if settings.REPRICING_INTERVAL > 0 and _loop_task is None:
+        _loop_task = asyncio.create_task(_repricing_loop(settings.REPRICING_INTERVAL))
+
+
+async def stop_repricing_job() -> None:
+    global _loop_task, _run_task
+    for task in (_loop_task, _run_task):
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    _loop_task = _run_task = None
+
+
+async def _main() -> None:
+    from core.database import initiate_database
+
+    await initiate_database()
+    report = await run_repricing()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    # python -m services.repricing
+    asyncio.run(_main())
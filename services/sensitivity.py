@@ -0,0 +1,79 @@
+# backend/services/sensitivity.py
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from models.quote_model import Quote
+from services.batch_pricing import BATCH_COLUMNS, price_arrays
+
+DEFAULT_DELTA = 0.10   # perturbación relativa de cada entrada (±10 %)
+
+
+def quote_inputs(quote: Quote) -> Dict[str, float]:
+    """Entradas numéricas del modelo de costo de calculate_quote_summary para una cotización."""
+    return {
+        "price_per_kg": quote.filament.price_per_kg,
+        "model_weight": quote.model.model_weight,
+        "support_weight": quote.model.support_weight or 0.0,
+        "watts": quote.printer.watts,
+        "print_time": quote.model.print_time,
+        "kwh_cost": quote.energy.kwh_cost,
+        "hourly_cost": quote.printer.hourly_cost,
+        "labor": quote.commercial.labor or 0.0,
+        "post_processing": quote.commercial.post_processing or 0.0,
+        "margin": quote.commercial.margin,
+        "taxes": quote.commercial.taxes or 0.0,
+    }
+
+
+def sensitivity_analysis(quote: Quote, delta: float = DEFAULT_DELTA) -> Dict[str, Any]:
+    """
+    Perturba cada entrada a (1 - delta) y (1 + delta) manteniendo las demás fijas y evalúa
+    todos los escenarios en una sola llamada vectorizada (fila 0 = cotización original,
+    filas 2i+1 / 2i+2 = entrada i baja / alta).
+    Retorna la elasticidad del costo total respecto a cada entrada (diferencia central)
+    y los datos del gráfico de tornado, ordenados de mayor a menor variación.
+    Las entradas en 0 (p.ej. sin impuestos) no varían y tienen elasticidad 0.
+    """
+    inputs = quote_inputs(quote)
+    names = list(BATCH_COLUMNS)
+    base = np.array([inputs[name] for name in names], dtype=np.float64)
+    k = len(names)
+
+    # Matriz de escenarios (1 + 2k) x k: la base repetida con un factor distinto por fila
+    factors = np.ones((1 + 2 * k, k))
+    idx = np.arange(k)
+    factors[1 + 2 * idx, idx] = 1 - delta
+    factors[2 + 2 * idx, idx] = 1 + delta
+    scenarios = factors * base
+
+    results = price_arrays({name: scenarios[:, i] for i, name in enumerate(names)})
+    total = results["estimated_total_cost"]
+    base_cost = float(total[0])
+    low_cost = total[1::2]
+    high_cost = total[2::2]
+    elasticity = (high_cost - low_cost) / (2 * delta * base_cost) if base_cost > 0 else np.zeros(k)
+    swing = np.abs(high_cost - low_cost)
+
+    tornado: List[Dict[str, Any]] = [
+        {
+            "input": name,
+            "value": inputs[name],
+            "low_value": round(float(scenarios[1 + 2 * i, i]), 6),
+            "high_value": round(float(scenarios[2 + 2 * i, i]), 6),
+            "low_cost": round(float(low_cost[i]), 2),
+            "high_cost": round(float(high_cost[i]), 2),
+            "swing": round(float(swing[i]), 2),
+            "elasticity": round(float(elasticity[i]), 4),
+        }
+        for i, name in enumerate(names)
+    ]
+    tornado.sort(key=lambda row: row["swing"], reverse=True)
+
+    return {
+        "delta": delta,
+        "base_cost": round(base_cost, 2),
+        "elasticities": {row["input"]: row["elasticity"] for row in tornado},
+        "tornado": tornado,
+    }
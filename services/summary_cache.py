@@ -0,0 +1,54 @@
+# backend/services/summary_cache.py
+
+import hashlib
+import json
+from typing import Any, Mapping, Tuple
+
+from pydantic import BaseModel
+
+from core.cache import TTLCache
+from core.config import settings
+from models.quote_model import Summary
+from services.pricing_logic import calculate_quote_summary
+
+# Secciones de entrada de una cotización (todo QuoteCreateSchema salvo el nombre y las referencias)
+INPUT_SECTIONS = ("printer", "filament", "energy", "model", "commercial")
+
+# Resúmenes ya validados por hash de las entradas (pedidos repetidos de la misma pieza)
+summary_cache = TTLCache(maxsize=settings.SUMMARY_CACHE_SIZE, ttl=settings.SUMMARY_CACHE_TTL)
+
+
+def _canonical(value: Any) -> Any:
+    # 0 y 0.0 (valor por defecto vs. valor enviado) deben producir el mismo hash
+    if isinstance(value, dict):
+        return {key: _canonical(v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def quote_input_hash(sections: Mapping[str, BaseModel]) -> str:
+    """
+    Hash estable (sha256) de las secciones de entrada. Da el mismo resultado para
+    QuoteCreateSchema y para los subdocumentos ya validados de Quote con los mismos valores.
+    """
+    content = {section: _canonical(sections[section].model_dump(mode="json")) for section in INPUT_SECTIONS}
+    raw = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def memoized_quote_summary(data: Any) -> Tuple[str, Summary]:
+    """
+    (hash de las entradas, Summary): calculate_quote_summary y la validación de Summary
+    solo se ejecutan si las mismas entradas no se cotizaron hace poco.
+    'data' debe traer las secciones completas (referencias al catálogo ya aplicadas).
+    """
+    key = quote_input_hash({section: getattr(data, section) for section in INPUT_SECTIONS})
+    summary = summary_cache.get(key)
+    if summary is None:
+        summary = Summary(**calculate_quote_summary(data))
+        summary_cache.set(key, summary)
+    # Copia: cada cotización recibe su propia instancia
+    return key, summary.model_copy()
@@ -0,0 +1,23 @@
+from datetime import datetime, UTC
+
+from core.etag import encoded_etag, etag_matches, parse_if_match, updated_at_etag
+
+UPDATED_AT = datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=UTC)
+
+
+def test_compressed_representations_get_their_own_strong_etag():
+    etag = updated_at_etag(UPDATED_AT)
+    assert encoded_etag(etag, "br") != encoded_etag(etag, "gzip") != etag
+    # Los ETags débiles no distinguen representaciones
+    assert encoded_etag('W/"1-2"', "gzip") == 'W/"1-2"'
+
+
+def test_encoding_suffix_is_ignored_when_comparing():
+    etag = updated_at_etag(UPDATED_AT, catalog_version=4)
+    assert etag_matches(encoded_etag(etag, "br"), etag)
+    assert etag_matches(f'W/"0", {encoded_etag(etag, "gzip")}', etag)
+    assert not etag_matches(encoded_etag(updated_at_etag(datetime(2026, 1, 1, tzinfo=UTC)), "br"), etag)
+
+
+def test_if_match_accepts_the_compressed_etag():
+    assert parse_if_match(encoded_etag(updated_at_etag(UPDATED_AT), "gzip")) == [UPDATED_AT]
@@ -0,0 +1,71 @@
+"""
+Las dos versiones de la fórmula del resumen deben dar los mismos números:
+calculate_quote_summary (escalar) y price_arrays (vectorizada: importación, price-batch,
+re-cotización y, con price_summary, el recálculo del PATCH). Al cambiar una, se cambian
+ambas y se incrementa PRICING_VERSION.
+"""
+
+import random
+
+import numpy as np
+
+from benchmarks.quote_factory import make_payloads
+from schemas.quote_schema import QuoteCreateSchema
+from services.batch_pricing import INPUT_PATHS, price_arrays, price_summary, round_column
+from services.pricing_logic import calculate_quote_summary
+
+SUMMARY_FIELDS = ("estimated_total_cost", "grams_used", "grams_wasted", "waste_percentage")
+PARITY_SAMPLES = 2000
+HALF_CENT_VALUES = [0.005, 0.015, 0.125, 1.005, 2.675, 8.345, 10.555, 100.125]
+
+
+def _payloads():
+    payloads = make_payloads(PARITY_SAMPLES, seed=7)
+    rng = random.Random(11)
+    for payload in payloads[::3]:
+        # Valores con muchos decimales (no solo los redondeados de la fábrica) y opcionales en 0
+        payload["filament"]["price_per_kg"] = rng.uniform(1.0001, 100)
+        payload["model"]["print_time"] = rng.uniform(0.01, 200)
+        payload["commercial"]["labor"] = 0
+        payload["commercial"]["taxes"] = rng.random()
+    for payload, weight in zip(payloads[1::50], HALF_CENT_VALUES * 8):
+        # Valores cuyo redondeo a 2 decimales cae en (o junto a) un empate de medio centavo
+        payload["model"]["model_weight"] = weight
+        payload["commercial"]["labor"] = weight
+        payload["commercial"]["margin"] = 0.5
+    return payloads
+
+
+def _scalar_summaries(payloads):
+    return [calculate_quote_summary(QuoteCreateSchema.model_validate(p)) for p in payloads]
+
+
+def test_price_arrays_matches_calculate_quote_summary():
+    payloads = _payloads()
+    data = [QuoteCreateSchema.model_validate(p) for p in payloads]
+    arrays = {
+        "price_per_kg": [d.filament.price_per_kg for d in data],
+        "model_weight": [d.model.model_weight for d in data],
+        "support_weight": [d.model.support_weight for d in data],
+        "watts": [d.printer.watts for d in data],
+        "print_time": [d.model.print_time for d in data],
+        "kwh_cost": [d.energy.kwh_cost for d in data],
+        "hourly_cost": [d.printer.hourly_cost for d in data],
+        "labor": [d.commercial.labor or 0.0 for d in data],
+        "post_processing": [d.commercial.post_processing or 0.0 for d in data],
+        "margin": [d.commercial.margin for d in data],
+        "taxes": [d.commercial.taxes or 0.0 for d in data],
+    }
+    results = price_arrays({name: np.array(values, dtype=np.float64) for name, values in arrays.items()})
+    rounded = {key: round_column(results[key]) for key in SUMMARY_FIELDS}
+
+    for i, expected in enumerate(_scalar_summaries(payloads)):
+        assert {key: rounded[key][i] for key in SUMMARY_FIELDS} == {key: expected[key] for key in SUMMARY_FIELDS}
+
+
+def test_price_summary_matches_calculate_quote_summary():
+    payloads = _payloads()
+    for payload, expected in zip(payloads, _scalar_summaries(payloads)):
+        data = QuoteCreateSchema.model_validate(payload).model_dump()
+        values = {name: data[section][field] for name, (section, field) in INPUT_PATHS.items()}
+        assert price_summary(values) == {key: expected[key] for key in SUMMARY_FIELDS}
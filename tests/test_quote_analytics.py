@@ -0,0 +1,23 @@
+import pytest
+from fastapi import HTTPException
+
+from api.quote_analytics import parse_cost_buckets
+
+
+def test_cost_buckets_are_parsed_in_order():
+    assert parse_cost_buckets("0,10,50.5,100") == [0.0, 10.0, 50.5, 100.0]
+    assert parse_cost_buckets(None) is None
+
+
+@pytest.mark.parametrize("value", ["0,nan", "nan,0", "0,inf", "-inf,0", "0,10,Infinity", "0,NaN,10"])
+def test_non_finite_cost_buckets_are_rejected(value):
+    with pytest.raises(HTTPException) as error:
+        parse_cost_buckets(value)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("value", ["0", "10,0", "0,0", "0,abc"])
+def test_invalid_cost_buckets_are_rejected(value):
+    with pytest.raises(HTTPException) as error:
+        parse_cost_buckets(value)
+    assert error.value.status_code == 400
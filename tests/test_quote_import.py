@@ -0,0 +1,83 @@
+import asyncio
+import csv
+import io
+import json
+import random
+
+from benchmarks.quote_factory import make_payload
+from schemas.quote_schema import QuoteCreateSchema
+from services.pricing_logic import calculate_quote_summary
+from services.quote_import import _validate_chunk, iter_csv_rows, iter_ndjson_rows, spool_upload
+
+SUMMARY_FIELDS = ("estimated_total_cost", "grams_used", "grams_wasted", "waste_percentage")
+
+
+async def _body(data: bytes):
+    yield data
+
+
+def _spool(data: bytes):
+    return asyncio.run(spool_upload(_body(data)))
+
+
+def _payload(index: int, **model):
+    payload = make_payload(random.Random(index), index)
+    payload["model"].update(model)
+    return payload
+
+
+def _assert_priced_like_scalar(summary, payload):
+    expected = calculate_quote_summary(QuoteCreateSchema.model_validate(payload))
+    for key in SUMMARY_FIELDS:
+        assert getattr(summary, key) == expected[key]
+
+
+def test_mixed_ndjson_chunk_reports_bad_rows_and_prices_the_rest():
+    first, last = _payload(1), _payload(5)
+    lines = [
+        json.dumps(first).encode(),
+        # Pasa la validación del modelo (supports=False) pero está fuera del rango del motor
+        json.dumps(_payload(2, supports=False, support_type=None, support_weight=-5)).encode(),
+        json.dumps(_payload(3, print_time=float("inf"))).encode(),
+        json.dumps(_payload(4)).encode().replace(b"Pieza", b"Pi\xffza"),
+        json.dumps(last).encode(),
+    ]
+    chunk = list(iter_ndjson_rows(_spool(b"\n".join(lines) + b"\n")))
+
+    sections, rows, summaries, errors = _validate_chunk(chunk)
+
+    assert rows == [1, 5]
+    assert [s["quote_name"] for s in sections] == [first["quote_name"], last["quote_name"]]
+    _assert_priced_like_scalar(summaries[0], first)
+    _assert_priced_like_scalar(summaries[1], last)
+    assert [e["row"] for e in errors] == [2, 3, 4]
+    assert "support_weight" in errors[0]["error"]
+    assert "Infinity" in errors[1]["error"]
+    assert "UTF-8" in errors[2]["error"]
+
+
+def test_mixed_csv_chunk_reports_non_finite_values_per_row():
+    payloads = [_payload(1), _payload(2, model_weight="inf"), _payload(3)]
+    flat = [
+        {f"{section}.{field}": value for section, fields in p.items() if isinstance(fields, dict)
+         for field, value in fields.items()} | {"quote_name": p["quote_name"]}
+        for p in payloads
+    ]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(flat[0]))
+    writer.writeheader()
+    writer.writerows(flat)
+    chunk = list(iter_csv_rows(_spool(out.getvalue().encode())))
+
+    _, rows, summaries, errors = _validate_chunk(chunk)
+
+    assert rows == [1, 3]
+    assert len(summaries) == 2
+    assert errors == [{"row": 2, "error": "model.model_weight: valor fuera de rango"}]
+
+
+def test_chunk_without_valid_rows_has_no_summaries():
+    _, rows, summaries, errors = _validate_chunk([(1, ValueError("JSON inválido: x"))])
+
+    assert rows == [] and summaries == []
+    assert errors == [{"row": 1, "error": "JSON inválido: x"}]
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from repositories import quote_repository
+from schemas.quote_patch_schema import QuotePatchSchema
+from services import quote_service
+from services.quote_service import CatalogFieldPatchError, patch_quote
+
+
+def _fake_repository(monkeypatch, refs):
+    calls = []
+
+    async def update_owned_quote(oid, user_id, update, expected=None, unreferenced=()):
+        calls.append(list(unreferenced))
+        # El filtro exige la referencia vacía: si la cotización la tiene, no coincide
+        if any(refs.get(ref_field) is not None for ref_field in unreferenced):
+            return None
+        return {"_id": oid, "user_id": user_id, **update["$set"]}
+
+    async def get_owned_catalog_refs(oid, user_id):
+        return refs
+
+    async def resolve_quote_documents(docs):
+        return None
+
+    monkeypatch.setattr(quote_repository, "update_owned_quote", update_owned_quote)
+    monkeypatch.setattr(quote_repository, "get_owned_catalog_refs", get_owned_catalog_refs)
+    monkeypatch.setattr(quote_service, "resolve_quote_documents", resolve_quote_documents)
+    monkeypatch.setattr(quote_service, "quote_document_to_dict", lambda doc: doc)
+    return calls
+
+
+def test_patch_catalog_only_field_of_referencing_quote_is_rejected(monkeypatch):
+    calls = _fake_repository(monkeypatch, {"printer_id": ObjectId()})
+    data = QuotePatchSchema.model_validate({"printer": {"name": "Otra"}})
+
+    with pytest.raises(CatalogFieldPatchError, match="printer.name"):
+        asyncio.run(patch_quote(str(ObjectId()), ObjectId(), data))
+    assert calls == [["printer_id"]]
+
+
+def test_patch_catalog_only_field_without_reference_is_applied(monkeypatch):
+    _fake_repository(monkeypatch, {"filament_id": ObjectId()})
+    data = QuotePatchSchema.model_validate({"printer": {"name": "Otra"}})
+
+    patched = asyncio.run(patch_quote(str(ObjectId()), ObjectId(), data))
+
+    assert patched["printer.name"] == "Otra"
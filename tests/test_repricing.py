@@ -0,0 +1,10 @@
+from bson import ObjectId
+
+from repositories.quote_repository import stale_pricing_query
+
+
+def test_stale_pricing_query_is_an_equality_on_the_version():
+    # Igualdad sobre pricing_version: el índice (pricing_version, _id) entrega el orden por _id
+    after = ObjectId()
+    assert stale_pricing_query(0) == {"pricing_version": 0}
+    assert stale_pricing_query(1, after) == {"pricing_version": 1, "_id": {"$gt": after}}